@@ -1,23 +1,36 @@
-import asyncio
 from datetime import datetime
+from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from app.core.security import get_current_user
-from app.services.templates import send_template_message
+from app.core.security import get_current_user, get_current_user_readonly
 from app.db.mongo import get_db
-from models import BroadcastRequest, TemplateRequest, UserPublic
+from app.db.pagination import paginate, set_next_cursor
+from app.services.broadcast_recipients import insert_recipients, list_recipients
+from config import settings
+from models import BroadcastRequest, UserPublic
 
 router = APIRouter(tags=["broadcasts"])
 
-RATE_LIMIT_PER_SECOND = 1
+SUMMARY_FIELDS = {
+    field: 1
+    for field in (
+        "id", "name", "template_name", "total", "sent", "failed", "pending",
+        "status", "created_at", "sent_at", "completed_at",
+    )
+}
 
 
-@router.post("/broadcasts")
+@router.post("/broadcasts", status_code=202)
 async def create_broadcast(req: BroadcastRequest, current_user: UserPublic = Depends(get_current_user), db = Depends(get_db)):
-    if not req.phones or not req.template_name:
-        raise HTTPException(status_code=400, detail="Phones and template_name are required")
+    if not (req.phones or req.list_ids or req.segment) or not req.template_name:
+        raise HTTPException(status_code=400, detail="Phones, list_ids or segment, and template_name are required")
+
+    audience = None
+    if req.list_ids or req.segment:
+        audience = await _build_audience(req, current_user, db)
 
     broadcast_id = str(uuid4())
     now = datetime.utcnow()
@@ -32,88 +45,81 @@ async def create_broadcast(req: BroadcastRequest, current_user: UserPublic = Dep
         "created_at": now.isoformat(),
         "sent_at": None,
         "completed_at": None,
-        "status": "pending",
-        "recipients": [{"phone": phone, "status": "pending", "details": None} for phone in req.phones],
+        "status": "queued",
+        "body_parameters": req.body_parameters,
+        "header_parameters": req.header_parameters,
+        "header_type": req.header_type,
         "total": len(req.phones),
         "sent": 0,
         "failed": 0,
         "pending": len(req.phones),
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "attempts": 0,
     }
-
-    # Insert broadcast into database
+    if audience is not None:
+        # The worker streams matching contacts into recipients before sending
+        broadcast["audience"] = audience
+        broadcast["literal_count"] = len(req.phones)
+        broadcast["recipients_resolved"] = False
+
+    # Recipients go to their own collection first; inserting the broadcast already
+    # "queued" enqueues it in one write, so a crash can't leave it half-created
+    await insert_recipients(db, broadcast_id, req.phones)
+    # A broadcast worker claims it and does the sending
     await db.broadcasts.insert_one(broadcast)
 
-    # Update status to sending
-    await db.broadcasts.update_one(
-        {"_id": broadcast_id},
-        {"$set": {"status": "sending", "sent_at": datetime.utcnow().isoformat()}}
-    )
+    return {
+        "id": broadcast_id,
+        "status": "queued",
+        "total": len(req.phones),
+        "sent": 0,
+        "failed": 0,
+        "resolving_audience": audience is not None,
+        "broadcast": broadcast,
+    }
 
-    for idx, recipient in enumerate(broadcast["recipients"]):
-        try:
-            template_req = TemplateRequest(
-                phone=recipient["phone"],
-                template_name=req.template_name,
-                template_id=req.template_id,
-                language_code=req.language_code,
-                body_parameters=req.body_parameters,
-                header_parameters=req.header_parameters,
-                header_type=req.header_type,
-            )
-
-            res = await send_template_message(template_req, db=db, user_id=current_user.id)
-
-            if isinstance(res, dict) and res.get("success"):
-                recipient["status"] = "sent"
-                recipient["details"] = res.get("whatsapp_response")
-            else:
-                recipient["status"] = "failed"
-                recipient["details"] = res.get("details") if isinstance(res, dict) else {"error": "Unknown error"}
-        except Exception as exc:
-            print(f"Unexpected error sending to {recipient['phone']}: {str(exc)}")
-            recipient["status"] = "failed"
-            recipient["details"] = {"error": str(exc)}
-
-        # Update database after each recipient
-        sent = sum(1 for r in broadcast["recipients"] if r["status"] == "sent")
-        failed = sum(1 for r in broadcast["recipients"] if r["status"] == "failed")
-        pending = sum(1 for r in broadcast["recipients"] if r["status"] == "pending")
-        
-        await db.broadcasts.update_one(
-            {"_id": broadcast_id},
-            {"$set": {
-                "recipients": broadcast["recipients"],
-                "sent": sent,
-                "failed": failed,
-                "pending": pending
-            }}
-        )
 
-        await asyncio.sleep(1.0 / RATE_LIMIT_PER_SECOND)
+def _list_oids(ids) -> list:
+    try:
+        return [ObjectId(lid) for lid in ids]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid list id")
 
-    # Final update with completed status
-    sent = sum(1 for r in broadcast["recipients"] if r["status"] == "sent")
-    failed = sum(1 for r in broadcast["recipients"] if r["status"] == "failed")
-    
-    await db.broadcasts.update_one(
-        {"_id": broadcast_id},
-        {"$set": {
-            "status": "completed",
-            "completed_at": datetime.utcnow().isoformat(),
-            "sent": sent,
-            "failed": failed,
-            "pending": 0
-        }}
-    )
 
-    return {"id": broadcast_id, "total": len(broadcast["recipients"]), "sent": sent, "failed": failed, "broadcast": broadcast}
+async def _build_audience(req: BroadcastRequest, current_user: UserPublic, db) -> dict:
+    """Validate list ownership and return the audience stored on the broadcast for the worker to resolve."""
+    list_oids = _list_oids(req.list_ids)
+    segment = req.segment
+    exclude_oids = _list_oids(segment.exclude_list_ids) if segment else []
+
+    referenced = set(list_oids) | set(exclude_oids)
+    if referenced:
+        owned = await db["contact_lists"].count_documents({"_id": {"$in": list(referenced)}, "user_id": ObjectId(current_user.id)})
+        if owned != len(referenced):
+            raise HTTPException(status_code=404, detail="List not found")
+
+    return {
+        "list_ids": [str(lid) for lid in list_oids],
+        "exclude_list_ids": [str(lid) for lid in exclude_oids],
+        "created_after": segment.created_after if segment else None,
+        "created_before": segment.created_before if segment else None,
+    }
 
 
 @router.get("/broadcasts")
-async def list_broadcasts(current_user: UserPublic = Depends(get_current_user), db = Depends(get_db)):
-    # Fetch broadcasts for the current user, sorted by created_at descending
-    cursor = db.broadcasts.find({"user_id": current_user.id}).sort("created_at", -1)
-    broadcasts = await cursor.to_list(length=None)
+async def list_broadcasts(
+    response: Response,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
+    db = Depends(get_db),
+):
+    # Fetch one page of broadcasts for the current user, sorted by created_at descending
+    broadcasts, next_cursor = await paginate(
+        db.broadcasts, {"user_id": current_user.id}, "created_at", limit, after, SUMMARY_FIELDS
+    )
+    set_next_cursor(response, next_cursor)
     
     summaries = []
     for broadcast in broadcasts:
@@ -135,9 +141,46 @@ async def list_broadcasts(current_user: UserPublic = Depends(get_current_user),
     return summaries
 
 
+async def _legacy_recipients_page(db, query: dict, after: Optional[int], limit: int, status: Optional[str]) -> list:
+    """Up to limit + 1 embedded recipients after `after`, numbered by array position and filtered by status."""
+    match = {"seq": {"$gt": -1 if after is None else after}}
+    if status:
+        match["recipients.status"] = status
+    pipeline = [
+        {"$match": query},
+        {"$project": {"_id": 0, "recipients": 1}},
+        {"$unwind": {"path": "$recipients", "includeArrayIndex": "seq"}},
+        {"$match": match},
+        {"$limit": limit + 1},
+    ]
+    docs = await db.broadcasts.aggregate(pipeline).to_list(length=None)
+    return [{"seq": doc["seq"], **doc["recipients"]} for doc in docs]
+
+
 @router.get("/broadcasts/{broadcast_id}")
-async def get_broadcast(broadcast_id: str, current_user: UserPublic = Depends(get_current_user), db = Depends(get_db)):
-    broadcast = await db.broadcasts.find_one({"_id": broadcast_id, "user_id": current_user.id})
+async def get_broadcast(
+    broadcast_id: str,
+    recipients_after: Optional[int] = None,
+    recipients_limit: int = Query(100, ge=1, le=1000),
+    recipients_status: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
+    db = Depends(get_db),
+):
+    query = {"_id": broadcast_id, "user_id": current_user.id}
+    broadcast = await db.broadcasts.find_one(query, {"recipients": {"$slice": 1}})
     if not broadcast:
         raise HTTPException(status_code=404, detail="Broadcast not found")
+
+    # Page through recipients; pass next_recipients_after back as recipients_after for the next page
+    if broadcast.get("recipients"):
+        # Legacy broadcast that still embeds its recipients array
+        page = await _legacy_recipients_page(db, query, recipients_after, recipients_limit, recipients_status)
+        next_after = page[recipients_limit - 1]["seq"] if len(page) > recipients_limit else None
+        recipients = page[:recipients_limit]
+    else:
+        recipients, next_after = await list_recipients(
+            db, broadcast_id, after=recipients_after, limit=recipients_limit, status=recipients_status
+        )
+    broadcast["recipients"] = recipients
+    broadcast["next_recipients_after"] = next_after
     return broadcast
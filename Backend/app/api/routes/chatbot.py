@@ -1,11 +1,17 @@
 """
 Chatbot API Routes
-Handles chatbot interactions via Gemini AI
+Handles chatbot interactions via Gemini AI, and knowledge-base (RAG)
+answers via the async RAG service
 """
 
 from fastapi import APIRouter, HTTPException
-from models import ChatbotRequest, ChatbotResponse
-from app.services.gemini import get_gemini_service, GeminiServiceError
+from fastapi.responses import StreamingResponse
+from models import ChatbotRequest, ChatbotResponse, RAGChatbotRequest, RAGChatbotResponse, RAGSource
+from app.services.chat_cache import get_chat_cache
+from app.services.chat_context import get_chat_context
+from app.services.gemini import EMPTY_RESPONSE_MESSAGE, get_gemini_service, GeminiServiceError
+from config import settings
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,14 +19,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
 
-@router.post("/chat", response_model=ChatbotResponse)
-async def chat(request: ChatbotRequest):
-    """
-    Process a chat message and return AI response.
-    
-    This endpoint accepts a user message and optional conversation history,
-    then returns an AI-generated response focused on WhatsApp Business API topics.
-    """
+def _prepare_history(request: ChatbotRequest):
+    """Validate the request and return the conversation history as dicts for the service"""
     # Validate input
     if not request.message or not request.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
@@ -28,26 +28,49 @@ async def chat(request: ChatbotRequest):
     if len(request.message) > 4000:
         raise HTTPException(status_code=400, detail="Message too long. Maximum 4000 characters allowed.")
     
-    # Limit conversation history to prevent context overflow
+    # Hard cap on what we read; the token budget is applied later by the context manager
     conversation_history = request.conversation_history or []
-    if len(conversation_history) > 20:
-        # Keep only the last 20 messages for context
-        conversation_history = conversation_history[-20:]
+    if len(conversation_history) > settings.CHAT_HISTORY_MAX_TURNS:
+        conversation_history = conversation_history[-settings.CHAT_HISTORY_MAX_TURNS:]
+    
+    # Convert ChatMessage objects to dicts for the service
+    return [
+        {"role": msg.role, "content": msg.content}
+        for msg in conversation_history
+    ]
+
+
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat", response_model=ChatbotResponse)
+async def chat(request: ChatbotRequest):
+    """
+    Process a chat message and return AI response.
+    
+    This endpoint accepts a user message and optional conversation history,
+    then returns an AI-generated response focused on WhatsApp Business API topics.
+    """
+    history_dicts = _prepare_history(request)
     
     try:
         gemini_service = get_gemini_service()
         
-        # Convert ChatMessage objects to dicts for the service
-        history_dicts = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation_history
-        ]
+        # Repeated questions are answered from the cache
+        chat_cache = get_chat_cache()
+        cached = await chat_cache.lookup(request.message, history_dicts)
+        if cached.response is not None:
+            return ChatbotResponse(response=cached.response, success=True)
         
-        # Generate response
+        # Generate response, with older turns folded into a summary once over the token budget
         ai_response = await gemini_service.generate_response(
             user_message=request.message.strip(),
-            conversation_history=history_dicts
+            conversation_history=await get_chat_context().build(history_dicts)
         )
+        if ai_response != EMPTY_RESPONSE_MESSAGE:
+            chat_cache.store(cached, ai_response)
         
         return ChatbotResponse(
             response=ai_response,
@@ -69,6 +92,122 @@ async def chat(request: ChatbotRequest):
         )
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatbotRequest):
+    """
+    Stream the AI response as Server-Sent Events.
+    
+    Emits `data: {"text": ...}` for each chunk as Gemini produces it, then
+    `event: done`. Failures after the stream has started arrive as
+    `event: error` with the same fallback message as /chat.
+    """
+    history_dicts = _prepare_history(request)
+    gemini_service = get_gemini_service()
+    chat_cache = get_chat_cache()
+    chat_context = get_chat_context()
+    
+    async def events():
+        try:
+            cached = await chat_cache.lookup(request.message, history_dicts)
+            if cached.response is not None:
+                yield _sse({"text": cached.response})
+                yield _sse({}, event="done")
+                return
+            
+            chunks = []
+            async for text in gemini_service.stream_response(
+                user_message=request.message.strip(),
+                conversation_history=await chat_context.build(history_dicts)
+            ):
+                chunks.append(text)
+                yield _sse({"text": text})
+            if chunks:
+                chat_cache.store(cached, "".join(chunks).strip())
+            yield _sse({}, event="done")
+        except GeminiServiceError as e:
+            logger.error(f"Gemini service error: {str(e)}")
+            yield _sse(
+                {
+                    "response": "I'm sorry, I encountered an error processing your request. Please try again.",
+                    "error": str(e),
+                },
+                event="error",
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error in chatbot stream: {str(e)}", exc_info=True)
+            yield _sse(
+                {
+                    "response": "I'm sorry, I encountered an error processing your request. Please try again.",
+                    "error": "An unexpected error occurred. Please try again later.",
+                },
+                event="error",
+            )
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _get_rag_service():
+    """The shared RAG service with its vector store loaded, or 503 if the knowledge base isn't available"""
+    try:
+        # Imported here so the app starts without chromadb when RAG isn't used
+        from app.services.rag import get_rag_service
+        rag_service = get_rag_service()
+        await rag_service.aload_vector_store()
+        return rag_service
+    except (ImportError, ValueError) as e:
+        logger.error(f"RAG service unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Knowledge base is not available")
+
+
+@router.post("/rag", response_model=RAGChatbotResponse)
+async def rag_chat(request: RAGChatbotRequest):
+    """
+    Answer a question from the knowledge base.
+    
+    Retrieves the most relevant knowledge-base chunks and asks Gemini to
+    answer from them. Embedding, search and generation all run off the
+    event loop, so one worker serves many questions concurrently.
+    """
+    if not request.message or not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    if len(request.message) > 4000:
+        raise HTTPException(status_code=400, detail="Message too long. Maximum 4000 characters allowed.")
+    
+    rag_service = await _get_rag_service()
+    
+    try:
+        result = await rag_service.aquery(request.message.strip(), top_k=request.top_k)
+        return RAGChatbotResponse(
+            response=result.answer or EMPTY_RESPONSE_MESSAGE,
+            sources=[
+                RAGSource(
+                    source=chunk.metadata.get("filename") or chunk.metadata.get("source", "Unknown"),
+                    score=chunk.score
+                )
+                for chunk in result.context_chunks
+            ],
+            success=True
+        )
+    except RuntimeError as e:
+        logger.error(f"RAG generation error: {str(e)}")
+        return RAGChatbotResponse(
+            response="I'm sorry, I encountered an error processing your request. Please try again.",
+            success=False,
+            error=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in RAG chatbot: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, 
+            detail="An unexpected error occurred. Please try again later."
+        )
+
+
 @router.get("/health")
 async def chatbot_health():
     """Check if the chatbot service is properly configured"""
@@ -78,5 +217,7 @@ async def chatbot_health():
     return {
         "status": "ok" if is_configured else "error",
         "gemini_configured": is_configured,
-        "service": "chatbot"
+        "service": "chatbot",
+        "cache": get_chat_cache().stats(),
+        "context": get_chat_context().stats(),
     }
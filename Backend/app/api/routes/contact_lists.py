@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_readonly
 from app.db.mongo import get_db
+from app.db.pagination import paginate, set_next_cursor
+from config import settings
 from models import ContactListCreate, ContactListUpdate, UserPublic
 
 
@@ -48,22 +50,35 @@ async def create_list(payload: ContactListCreate, current_user: UserPublic = Dep
 
 
 @router.get("", response_model=dict)
-async def list_lists(current_user: UserPublic = Depends(get_current_user), db=Depends(get_db)):
+async def list_lists(
+    response: Response,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
+    db=Depends(get_db),
+):
     user_oid = _oid(current_user.id)
-    lists_cursor = db["contact_lists"].find({"user_id": user_oid}).sort("created_at", -1)
-    lists = [l async for l in lists_cursor]
-    # Counts per list via aggregation on contacts
+    lists, next_cursor = await paginate(
+        db["contact_lists"], {"user_id": user_oid}, "created_at", limit, after, {"name": 1, "created_at": 1}
+    )
+    set_next_cursor(response, next_cursor)
+
+    # Counts per list via aggregation on contacts, only for the lists on this page
     counts = {}
+    page_ids = [l["_id"] for l in lists]
     pipeline = [
-        {"$match": {"user_id": user_oid}},
+        {"$match": {"user_id": user_oid, "list_ids": {"$in": page_ids}}},
         {"$unwind": "$list_ids"},
+        {"$match": {"list_ids": {"$in": page_ids}}},
         {"$group": {"_id": "$list_ids", "count": {"$sum": 1}}},
     ]
-    async for row in db["contacts"].aggregate(pipeline):
-        counts[str(row["_id"])] = row["count"]
+    if page_ids:
+        async for row in db["contacts"].aggregate(pipeline):
+            counts[str(row["_id"])] = row["count"]
 
     return {
         "lists": [{**_sanitize_list(l), "contact_count": counts.get(str(l["_id"]), 0)} for l in lists],
+        "next_cursor": next_cursor,
     }
 
 
@@ -104,11 +119,21 @@ async def delete_list(list_id: str, current_user: UserPublic = Depends(get_curre
 
 
 @router.get("/{list_id}/contacts", response_model=List[dict])
-async def get_list_contacts(list_id: str, current_user: UserPublic = Depends(get_current_user), db=Depends(get_db)):
+async def get_list_contacts(
+    list_id: str,
+    response: Response,
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
+    db=Depends(get_db),
+):
     user_oid = _oid(current_user.id)
     lid = _oid(list_id)
-    cursor = db["contacts"].find({"user_id": user_oid, "list_ids": lid})
-    docs = [d async for d in cursor]
+    docs, next_cursor = await paginate(
+        db["contacts"], {"user_id": user_oid, "list_ids": lid}, "created_at", limit, after,
+        {"name": 1, "phone": 1, "created_at": 1},
+    )
+    set_next_cursor(response, next_cursor)
     return [{
         "id": str(d["_id"]),
         "name": d.get("name", ""),
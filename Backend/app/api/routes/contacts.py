@@ -1,15 +1,29 @@
+import json
 from typing import List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from pymongo.errors import DuplicateKeyError
 
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_readonly
 from app.db.mongo import get_db
+from app.db.pagination import paginate, set_next_cursor
+from app.services.contacts import (
+    InvalidPhoneError,
+    detect_import_format,
+    export_contacts,
+    import_contacts,
+    normalize_phone,
+)
+from config import settings
 from models import ContactCreate, ContactPublic, ContactUpdate, UserPublic
 
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+CONTACT_FIELDS = {"name": 1, "phone": 1, "list_ids": 1, "created_at": 1}
+
 
 def _oid(id_str: str) -> ObjectId:
     try:
@@ -18,6 +32,13 @@ def _oid(id_str: str) -> ObjectId:
         raise HTTPException(status_code=400, detail="Invalid id")
 
 
+def _normalize_phone(raw: str) -> str:
+    try:
+        return normalize_phone(raw)
+    except InvalidPhoneError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 def _sanitize_contact(doc) -> ContactPublic:
     return ContactPublic(
         id=str(doc["_id"]),
@@ -42,10 +63,9 @@ async def create_contact(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid list id")
 
-    # Basic phone normalization (keep digits and leading '+')
-    phone = payload.phone.strip()
-    if not phone:
+    if not payload.phone.strip():
         raise HTTPException(status_code=400, detail="Phone is required")
+    phone = _normalize_phone(payload.phone)
 
     doc = {
         "user_id": user_oid,
@@ -54,15 +74,73 @@ async def create_contact(
         "list_ids": list_oids,
         "created_at": __import__("datetime").datetime.utcnow().isoformat(),
     }
-    res = await db["contacts"].insert_one(doc)
+    try:
+        res = await db["contacts"].insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A contact with this phone already exists")
     doc["_id"] = res.inserted_id
     return _sanitize_contact(doc)
 
 
+@router.post("/import")
+async def import_contacts_file(
+    file: UploadFile = File(...),
+    list_id: Optional[str] = Query(None),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    batch_size: Optional[int] = Query(None, ge=1, le=settings.CONTACT_IMPORT_MAX_BATCH_SIZE),
+    current_user: UserPublic = Depends(get_current_user),
+    db=Depends(get_db),
+):
+    """
+    Bulk import contacts from a CSV (header with a phone column, optional name)
+    or NDJSON ({"phone", "name"} per line) upload.
+
+    Streams NDJSON progress: one line per rejected row, one per written batch
+    and a final summary. Existing phones are updated, not duplicated.
+    """
+    user_oid = _oid(current_user.id)
+    list_oid = None
+    if list_id:
+        list_oid = _oid(list_id)
+        if not await db["contact_lists"].find_one({"_id": list_oid, "user_id": user_oid}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="List not found")
+
+    fmt = format or detect_import_format(file.filename, file.content_type)
+
+    async def progress():
+        async for event in import_contacts(db, user_oid, file.file, fmt, list_oid, batch_size):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/export")
+async def export_contacts_file(
+    list_id: Optional[str] = Query(None),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: UserPublic = Depends(get_current_user_readonly),
+    db=Depends(get_db),
+):
+    """Stream all of the user's contacts (optionally one list's) as CSV or NDJSON."""
+    user_oid = _oid(current_user.id)
+    list_oid = _oid(list_id) if list_id else None
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"contacts.{format}"
+    return StreamingResponse(
+        export_contacts(db, user_oid, format, list_oid),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("", response_model=List[ContactPublic])
 async def list_contacts(
+    response: Response,
     list_id: Optional[str] = Query(None),
-    current_user: UserPublic = Depends(get_current_user),
+    limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
     db=Depends(get_db),
 ):
     user_oid = _oid(current_user.id)
@@ -70,19 +148,19 @@ async def list_contacts(
     if list_id:
         query["list_ids"] = _oid(list_id)
 
-    cursor = db["contacts"].find(query).sort("created_at", -1)
-    docs = [d async for d in cursor]
+    docs, next_cursor = await paginate(db["contacts"], query, "created_at", limit, after, CONTACT_FIELDS)
+    set_next_cursor(response, next_cursor)
     return [_sanitize_contact(d) for d in docs]
 
 
 @router.get("/stats")
-async def contacts_stats(current_user: UserPublic = Depends(get_current_user), db=Depends(get_db)):
+async def contacts_stats(current_user: UserPublic = Depends(get_current_user_readonly), db=Depends(get_db)):
     user_oid = _oid(current_user.id)
     total = await db["contacts"].count_documents({"user_id": user_oid})
     return {"total": total}
 
 @router.get("/dashboard/stats")
-async def dashboard_stats(current_user: UserPublic = Depends(get_current_user), db=Depends(get_db)):
+async def dashboard_stats(current_user: UserPublic = Depends(get_current_user_readonly), db=Depends(get_db)):
     """
     Aggregate endpoint that returns all dashboard statistics.
     Returns counts for: contacts, contact lists, templates, and broadcasts
@@ -117,7 +195,7 @@ async def update_contact(
     if payload.name is not None:
         updates["name"] = payload.name.strip()
     if payload.phone is not None:
-        updates["phone"] = payload.phone.strip()
+        updates["phone"] = _normalize_phone(payload.phone)
     if payload.list_ids is not None:
         try:
             updates["list_ids"] = [ObjectId(lid) for lid in payload.list_ids]
@@ -127,11 +205,14 @@ async def update_contact(
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    doc = await db["contacts"].find_one_and_update(
-        {"_id": cid, "user_id": user_oid},
-        {"$set": updates},
-        return_document=True,
-    )
+    try:
+        doc = await db["contacts"].find_one_and_update(
+            {"_id": cid, "user_id": user_oid},
+            {"$set": updates},
+            return_document=True,
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A contact with this phone already exists")
     if not doc:
         raise HTTPException(status_code=404, detail="Contact not found")
     return _sanitize_contact(doc)
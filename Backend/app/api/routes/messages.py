@@ -2,30 +2,43 @@ from datetime import datetime
 from typing import Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_readonly
 from app.db.mongo import get_db
+from app.db.pagination import paginate, set_next_cursor
+from app.services.graph_api import get_graph_client
 from app.sockets import get_socket_for_user, sio
 from config import settings
 from models import MessageRequest, UserPublic
 
 router = APIRouter(tags=["messages"])
 
+MESSAGE_FIELDS = {
+    field: 1
+    for field in (
+        "chatId", "senderId", "receiverId", "direction", "text", "status",
+        "messageType", "templateName", "createdAt", "updatedAt", "whatsappMessageId",
+    )
+}
+
 
 @router.get("/messages")
 async def get_messages(
+    response: Response,
     chatId: Optional[str] = None,
-    limit: int = 50,
-    current_user: UserPublic = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=settings.PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    current_user: UserPublic = Depends(get_current_user_readonly),
     db=Depends(get_db),
 ):
     query = {}
     if chatId:
         query["chatId"] = chatId
 
-    cursor = db["messages"].find(query).sort("createdAt", -1).limit(limit)
-    messages = await cursor.to_list(length=limit)
+    # Newest page first; `after` walks back to older messages
+    messages, next_cursor = await paginate(db["messages"], query, "createdAt", limit, after, MESSAGE_FIELDS)
+    set_next_cursor(response, next_cursor)
 
     for msg in messages:
         msg["id"] = str(msg.pop("_id"))
@@ -35,7 +48,7 @@ async def get_messages(
 
 
 @router.get("/messages/legacy")
-async def get_messages_legacy(current_user: UserPublic = Depends(get_current_user)):
+async def get_messages_legacy(current_user: UserPublic = Depends(get_current_user_readonly)):
     from app.api.routes.webhook import RECEIVED_MESSAGES
 
     return RECEIVED_MESSAGES
@@ -62,7 +75,7 @@ async def send_message(
         "whatsappMessageId": None,
     }
 
-    url = f"https://graph.facebook.com/{settings.WHATSAPP_API_VERSION}/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"/{settings.WHATSAPP_API_VERSION}/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
     headers = {
         "Authorization": f"Bearer {settings.WHATSAPP_ACCESS_TOKEN}",
         "Content-Type": "application/json",
@@ -75,60 +88,60 @@ async def send_message(
         "text": {"preview_url": False, "body": req.message},
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            whatsapp_response = response.json()
-
-            if whatsapp_response.get("messages"):
-                message_doc["whatsappMessageId"] = whatsapp_response["messages"][0].get("id")
-
-            result = await db["messages"].insert_one(message_doc)
-            message_id = str(result.inserted_id)
-
-            response_message = {
-                "id": message_id,
-                "chatId": message_doc["chatId"],
-                "senderId": message_doc["senderId"],
-                "receiverId": message_doc["receiverId"],
-                "text": message_doc["text"],
-                "status": message_doc["status"],
-                "createdAt": message_doc["createdAt"],
-                "updatedAt": message_doc["updatedAt"],
-                "whatsappMessageId": message_doc["whatsappMessageId"],
-            }
-
-            sender_socket = get_socket_for_user(current_user.id)
-            if sender_socket:
-                await sio.emit("new_message", response_message, to=sender_socket)
-                print(f"📨 Emitted new_message to sender {current_user.id}")
-
-            return {"success": True, "message": response_message, "whatsapp_response": whatsapp_response}
-        except httpx.HTTPStatusError as e:
-            print(f"Error sending message: {e.response.text}")
-            message_doc["status"] = "failed"
-            result = await db["messages"].insert_one(message_doc)
-            message_id = str(result.inserted_id)
-
-            response_message = {
-                "id": message_id,
-                "chatId": message_doc["chatId"],
-                "senderId": message_doc["senderId"],
-                "receiverId": message_doc["receiverId"],
-                "text": message_doc["text"],
-                "status": message_doc["status"],
-                "createdAt": message_doc["createdAt"],
-                "updatedAt": message_doc["updatedAt"],
-                "whatsappMessageId": message_doc["whatsappMessageId"],
-            }
-
-            return {
-                "success": False,
-                "message": response_message,
-                "error": "Failed to send message",
-                "details": e.response.json(),
-            }
-        except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            return {"success": False, "error": "Unexpected error", "details": {"message": str(e)}}
+    client = get_graph_client()
+    try:
+        response = await client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        whatsapp_response = response.json()
+
+        if whatsapp_response.get("messages"):
+            message_doc["whatsappMessageId"] = whatsapp_response["messages"][0].get("id")
+
+        result = await db["messages"].insert_one(message_doc)
+        message_id = str(result.inserted_id)
+
+        response_message = {
+            "id": message_id,
+            "chatId": message_doc["chatId"],
+            "senderId": message_doc["senderId"],
+            "receiverId": message_doc["receiverId"],
+            "text": message_doc["text"],
+            "status": message_doc["status"],
+            "createdAt": message_doc["createdAt"],
+            "updatedAt": message_doc["updatedAt"],
+            "whatsappMessageId": message_doc["whatsappMessageId"],
+        }
+
+        sender_socket = get_socket_for_user(current_user.id)
+        if sender_socket:
+            await sio.emit("new_message", response_message, to=sender_socket)
+            print(f"📨 Emitted new_message to sender {current_user.id}")
+
+        return {"success": True, "message": response_message, "whatsapp_response": whatsapp_response}
+    except httpx.HTTPStatusError as e:
+        print(f"Error sending message: {e.response.text}")
+        message_doc["status"] = "failed"
+        result = await db["messages"].insert_one(message_doc)
+        message_id = str(result.inserted_id)
+
+        response_message = {
+            "id": message_id,
+            "chatId": message_doc["chatId"],
+            "senderId": message_doc["senderId"],
+            "receiverId": message_doc["receiverId"],
+            "text": message_doc["text"],
+            "status": message_doc["status"],
+            "createdAt": message_doc["createdAt"],
+            "updatedAt": message_doc["updatedAt"],
+            "whatsappMessageId": message_doc["whatsappMessageId"],
+        }
+
+        return {
+            "success": False,
+            "message": response_message,
+            "error": "Failed to send message",
+            "details": e.response.json(),
+        }
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return {"success": False, "error": "Unexpected error", "details": {"message": str(e)}}
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 import httpx
 from app.db.mongo import get_db
+from app.services.graph_api import GRAPH_API_HOST, get_graph_client
 from app.core.security import get_current_user
 from models import UserPublic, WhatsAppCredential
 from config import settings
@@ -36,74 +37,76 @@ async def whatsapp_signup(
         extra={"flow_id": flow_id, "user_id": user_id, "waba_id": payload.waba_id}
     )
 
-    async with httpx.AsyncClient() as client:
-        # 1. Exchange code for access token
-        token_url = f"https://graph.facebook.com/{settings.WHATSAPP_API_VERSION}/oauth/access_token"
-        token_params = {
-            "client_id": settings.WHATSAPP_APP_ID,
-            "client_secret": settings.WHATSAPP_APP_SECRET,
-            "code": payload.code
-        }
-        
-        try:
-            logger.debug("Exchanging code for token", extra={"flow_id": flow_id})
-            token_res = await client.get(token_url, params=token_params)
-            token_res.raise_for_status()
-            token_data = token_res.json()
-            access_token = token_data.get("access_token")
-            logger.info("Token exchange successful", extra={"flow_id": flow_id})
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Token exchange failed: {e.response.text}", extra={"flow_id": flow_id})
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail=f"Failed to exchange token: {e.response.text}"
-            )
+    client = get_graph_client()
+    # 1. Exchange code for access token
+    # OAuth stays on Meta's host even when GRAPH_API_BASE_URL points at a stub
+    token_url = f"{GRAPH_API_HOST}/{settings.WHATSAPP_API_VERSION}/oauth/access_token"
+    token_params = {
+        "client_id": settings.WHATSAPP_APP_ID,
+        "client_secret": settings.WHATSAPP_APP_SECRET,
+        "code": payload.code
+    }
+    
+    try:
+        logger.debug("Exchanging code for token", extra={"flow_id": flow_id})
+        # Codes are single-use, so the exchange is never resent
+        token_res = await client.get(token_url, params=token_params, retry=False)
+        token_res.raise_for_status()
+        token_data = token_res.json()
+        access_token = token_data.get("access_token")
+        logger.info("Token exchange successful", extra={"flow_id": flow_id})
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Token exchange failed: {e.response.text}", extra={"flow_id": flow_id})
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail=f"Failed to exchange token: {e.response.text}"
+        )
 
-        waba_id = payload.waba_id
-        phone_number_id = payload.phone_number_id
+    waba_id = payload.waba_id
+    phone_number_id = payload.phone_number_id
 
-        # 2. Register phone number - REMOVED
-        logger.info("Skipping explicit PIN registration (handled by Embedded Signup)", extra={"flow_id": flow_id})
+    # 2. Register phone number - REMOVED
+    logger.info("Skipping explicit PIN registration (handled by Embedded Signup)", extra={"flow_id": flow_id})
 
-        # 3. Subscribe to webhooks
-        subscribe_url = f"https://graph.facebook.com/{settings.WHATSAPP_API_VERSION}/{waba_id}/subscribed_apps"
-        sub_headers = {"Authorization": f"Bearer {access_token}"}
-        
-        try:
-            sub_res = await client.post(subscribe_url, headers=sub_headers)
-            if sub_res.status_code != 200:
-                logger.warning(f"Webhook subscription returned non-200: {sub_res.text}", extra={"flow_id": flow_id})
-            else:
-                logger.info("Webhook subscription successful", extra={"flow_id": flow_id})
-        except Exception as e:
-            logger.error(f"Webhook subscription error: {e}", extra={"flow_id": flow_id}, exc_info=True)
+    # 3. Subscribe to webhooks
+    subscribe_url = f"{GRAPH_API_HOST}/{settings.WHATSAPP_API_VERSION}/{waba_id}/subscribed_apps"
+    sub_headers = {"Authorization": f"Bearer {access_token}"}
+    
+    try:
+        sub_res = await client.post(subscribe_url, headers=sub_headers)
+        if sub_res.status_code != 200:
+            logger.warning(f"Webhook subscription returned non-200: {sub_res.text}", extra={"flow_id": flow_id})
+        else:
+            logger.info("Webhook subscription successful", extra={"flow_id": flow_id})
+    except Exception as e:
+        logger.error(f"Webhook subscription error: {e}", extra={"flow_id": flow_id}, exc_info=True)
 
-        # 4. Save credentials
-        try:
-            credential = WhatsAppCredential(
-                user_id=user_id,
-                waba_id=waba_id,
-                phone_number_id=phone_number_id,
-                access_token=access_token,
-                created_at=datetime.utcnow()
-            )
-            
-            await db["whatsapp_credentials"].update_one(
-                {"user_id": user_id},
-                {"$set": credential.model_dump()},
-                upsert=True
-            )
-            logger.info("Credentials saved to database", extra={"flow_id": flow_id, "user_id": user_id})
-        except Exception as e:
-            logger.error(f"Database save error: {e}", extra={"flow_id": flow_id}, exc_info=True)
-            raise HTTPException(status_code=500, detail="Failed to save credentials")
+    # 4. Save credentials
+    try:
+        credential = WhatsAppCredential(
+            user_id=user_id,
+            waba_id=waba_id,
+            phone_number_id=phone_number_id,
+            access_token=access_token,
+            created_at=datetime.utcnow()
+        )
         
-        return {
-            "status": "success", 
-            "waba_id": waba_id, 
-            "phone_number_id": phone_number_id,
-            "flow_id": flow_id
-        }
+        await db["whatsapp_credentials"].update_one(
+            {"user_id": user_id},
+            {"$set": credential.model_dump()},
+            upsert=True
+        )
+        logger.info("Credentials saved to database", extra={"flow_id": flow_id, "user_id": user_id})
+    except Exception as e:
+        logger.error(f"Database save error: {e}", extra={"flow_id": flow_id}, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to save credentials")
+    
+    return {
+        "status": "success", 
+        "waba_id": waba_id, 
+        "phone_number_id": phone_number_id,
+        "flow_id": flow_id
+    }
 
 @router.get("/whatsapp/status")
 async def get_whatsapp_status(
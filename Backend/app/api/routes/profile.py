@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
 from app.db.mongo import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_readonly
 from models import UserPublic
 
 router = APIRouter(prefix="/profile", tags=["profile"])
@@ -19,7 +19,7 @@ class ProfileResponse(BaseModel):
 
 @router.get("", response_model=ProfileResponse)
 async def get_profile(
-    current_user: UserPublic = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user_readonly),
     db=Depends(get_db)
 ):
     """Get user profile with WhatsApp integration status"""
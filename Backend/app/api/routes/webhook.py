@@ -1,11 +1,12 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.db.mongo import get_db
-from app.sockets import get_socket_for_user, sio
+from app.core.security import get_current_user_readonly
+from app.services.webhook_ingest import WebhookQueueFullError, get_webhook_ingestor
 from config import settings
+from models import UserPublic
 
 router = APIRouter(tags=["webhook"])
 
@@ -23,102 +24,94 @@ async def verify(request: Request):
     return PlainTextResponse("Error, wrong token", status_code=403)
 
 
+def parse_webhook_events(data: dict) -> list:
+    """Turn a webhook payload into ("message", doc) / ("status", update) events for the ingestor."""
+    events = []
+    for entry in data.get("entry") or []:
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+
+            for msg in value.get("messages") or []:
+                message_data = {
+                    "type": "message",
+                    "direction": "incoming",
+                    "from": msg.get("from"),
+                    "id": msg.get("id"),
+                    "timestamp": msg.get("timestamp"),
+                    "text": msg.get("text", {}).get("body"),
+                    "msg_type": msg.get("type"),
+                    "raw": msg,
+                }
+                if value.get("contacts"):
+                    message_data["contact"] = value["contacts"][0]
+
+                RECEIVED_MESSAGES.append(message_data)
+
+                events.append(("message", {
+                    "chatId": msg.get("from"),
+                    "senderId": msg.get("from"),
+                    "receiverId": settings.WHATSAPP_PHONE_NUMBER_ID,
+                    "direction": "incoming",
+                    "text": msg.get("text", {}).get("body", ""),
+                    "status": "delivered",
+                    "createdAt": datetime.utcnow().isoformat(),
+                    "updatedAt": datetime.utcnow().isoformat(),
+                    "whatsappMessageId": msg.get("id"),
+                }))
+
+            for status_update in value.get("statuses") or []:
+                status_data = {
+                    "type": "status",
+                    "id": status_update.get("id"),
+                    "status": status_update.get("status"),
+                    "timestamp": status_update.get("timestamp"),
+                    "recipient_id": status_update.get("recipient_id"),
+                    "raw": status_update,
+                }
+                RECEIVED_MESSAGES.append(status_data)
+
+                if status_update.get("id") and status_update.get("status"):
+                    events.append(("status", {
+                        "whatsappMessageId": status_update.get("id"),
+                        "status": status_update.get("status"),
+                        "timestamp": status_update.get("timestamp"),
+                    }))
+
+    del RECEIVED_MESSAGES[:-100]
+    return events
+
+
 @router.post("/webhook")
-async def webhook_received(request: Request, db=Depends(get_db)):
+async def webhook_received(request: Request):
+    # Writes happen in the ingestor; this only parses and queues so Meta gets its ack quickly
     try:
         data = await request.json()
         print("RAW DATA =", data)
-
-        if data.get("entry"):
-            for entry in data["entry"]:
-                for change in entry.get("changes", []):
-                    value = change.get("value", {})
-
-                    if value.get("messages"):
-                        for msg in value["messages"]:
-                            message_data = {
-                                "type": "message",
-                                "direction": "incoming",
-                                "from": msg.get("from"),
-                                "id": msg.get("id"),
-                                "timestamp": msg.get("timestamp"),
-                                "text": msg.get("text", {}).get("body"),
-                                "msg_type": msg.get("type"),
-                                "raw": msg,
-                            }
-                            if value.get("contacts"):
-                                message_data["contact"] = value["contacts"][0]
-
-                            RECEIVED_MESSAGES.append(message_data)
-
-                            incoming_msg_doc = {
-                                "chatId": msg.get("from"),
-                                "senderId": msg.get("from"),
-                                "receiverId": settings.WHATSAPP_PHONE_NUMBER_ID,
-                                "direction": "incoming",
-                                "text": msg.get("text", {}).get("body", ""),
-                                "status": "delivered",
-                                "createdAt": datetime.utcnow().isoformat(),
-                                "updatedAt": datetime.utcnow().isoformat(),
-                                "whatsappMessageId": msg.get("id"),
-                            }
-                            await db["messages"].insert_one(incoming_msg_doc)
-                            incoming_msg_doc["id"] = str(incoming_msg_doc.pop("_id"))
-
-                            await sio.emit("new_message", incoming_msg_doc)
-                            print("📨 Emitted incoming message to all users")
-
-                    if value.get("statuses"):
-                        for status_update in value["statuses"]:
-                            status_data = {
-                                "type": "status",
-                                "id": status_update.get("id"),
-                                "status": status_update.get("status"),
-                                "timestamp": status_update.get("timestamp"),
-                                "recipient_id": status_update.get("recipient_id"),
-                                "raw": status_update,
-                            }
-                            RECEIVED_MESSAGES.append(status_data)
-
-                            whatsapp_msg_id = status_update.get("id")
-                            new_status = status_update.get("status")
-
-                            if whatsapp_msg_id and new_status:
-                                result = await db["messages"].find_one_and_update(
-                                    {"whatsappMessageId": whatsapp_msg_id},
-                                    {
-                                        "$set": {
-                                            "status": new_status,
-                                            "updatedAt": datetime.utcnow().isoformat(),
-                                        }
-                                    },
-                                    return_document=True,
-                                )
-
-                                if result:
-                                    sender_id = result.get("senderId")
-                                    sender_socket = get_socket_for_user(sender_id)
-
-                                    status_event = {
-                                        "messageId": str(result["_id"]),
-                                        "whatsappMessageId": whatsapp_msg_id,
-                                        "status": new_status,
-                                        "timestamp": status_update.get("timestamp"),
-                                    }
-
-                                    if sender_socket:
-                                        await sio.emit("message_status_update", status_event, to=sender_socket)
-                                        print(f"✅ Emitted status update to user {sender_id}: {new_status}")
-                                    else:
-                                        print(f"⚠️ User {sender_id} not connected, DB updated with status: {new_status}")
-
-                    if len(RECEIVED_MESSAGES) > 100:
-                        RECEIVED_MESSAGES.pop(0)
-
+        events = parse_webhook_events(data)
     except Exception as exc:  # pragma: no cover - safety net logging
         print(f"⚠️ Error processing webhook: {exc}")
         import traceback
 
         traceback.print_exc()
+        return {"status": "ok"}
+
+    if events:
+        ingestor = get_webhook_ingestor()
+        if ingestor is None:
+            return JSONResponse({"status": "unavailable"}, status_code=503)
+        try:
+            await ingestor.submit(events)
+        except WebhookQueueFullError:
+            # Meta redelivers on non-2xx, so shed load instead of dropping events
+            print(f"⚠️ Webhook queue full, rejected {len(events)} event(s)")
+            return JSONResponse({"status": "busy"}, status_code=503)
 
     return {"status": "ok"}
+
+
+@router.get("/webhook/metrics")
+async def webhook_metrics(current_user: UserPublic = Depends(get_current_user_readonly)):
+    ingestor = get_webhook_ingestor()
+    if ingestor is None:
+        return {"running": False}
+    return ingestor.get_metrics()
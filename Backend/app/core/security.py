@@ -1,5 +1,8 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 
 from bson import ObjectId
 from fastapi import Depends, HTTPException, Request, status
@@ -10,13 +13,23 @@ from passlib.context import CryptContext
 
 from config import settings
 from models import UserPublic
+from app.core.cache import TTLCache
 from app.db.mongo import get_db
 from app.services.users import get_user_by_email
 
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer(auto_error=False)
 TOKEN_COOKIE_NAME = "access_token"
 
+# pbkdf2 releases the GIL, so a few threads keep hashing off the event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_stats = {"pending": 0, "max_pending": 0, "completed": 0, "rejected": 0}
+
+# Sanitized users keyed by id, so authenticated requests skip the users lookup
+_user_cache: TTLCache[UserPublic] = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
 
 def sanitize_user(user_doc) -> UserPublic:
     return UserPublic(
@@ -34,9 +47,52 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
-def create_access_token(subject: str, email: str) -> str:
+async def _run_hash(fn: Callable, *args):
+    if _hash_stats["pending"] >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        _hash_stats["rejected"] += 1
+        logger.warning(f"Password hash pool full, rejecting with 503: {get_password_hash_stats()}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many sign-in attempts, try again shortly")
+    _hash_stats["pending"] += 1
+    _hash_stats["max_pending"] = max(_hash_stats["max_pending"], _hash_stats["pending"])
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_stats["pending"] -= 1
+        _hash_stats["completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await _run_hash(verify_password, password, hashed_password)
+
+
+def get_password_hash_stats() -> dict:
+    """Hashes in the pool right now; queue_depth counts the ones waiting for a thread."""
+    return {
+        **_hash_stats,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "queue_depth": max(_hash_stats["pending"] - settings.PASSWORD_HASH_WORKERS, 0),
+    }
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached user; call after any write to that user's document."""
+    _user_cache.invalidate(str(user_id))
+
+
+def get_user_cache_stats() -> dict:
+    return _user_cache.stats()
+
+
+def create_access_token(subject: str, email: str, created_at: Optional[str] = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRES_IN_MINUTES)
     to_encode = {"sub": subject, "email": email, "exp": expire}
+    if created_at:
+        # Lets read-only routes build UserPublic from the claims alone
+        to_encode["created_at"] = created_at
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
@@ -60,12 +116,12 @@ async def authenticate_user(email: str, password: str, db):
     user = await get_user_by_email(email, db)
     if not user:
         return None
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password_async(password, user["hashed_password"]):
         return None
     return user
 
 
-async def get_current_user(request: Request, token: Optional[HTTPAuthorizationCredentials] = Depends(security), db=Depends(get_db)) -> UserPublic:
+def _decode_token(request: Request, token: Optional[HTTPAuthorizationCredentials]) -> dict:
     token_str = token.credentials if token else None
     raw_token = token_str or request.cookies.get(TOKEN_COOKIE_NAME)
 
@@ -80,14 +136,42 @@ async def get_current_user(request: Request, token: Optional[HTTPAuthorizationCr
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
+
+async def _load_user(user_id: str, db) -> UserPublic:
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
 
     try:
         object_id = ObjectId(user_id)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = await db["users"].find_one({"_id": object_id})
+    user = await db["users"].find_one({"_id": object_id}, {"email": 1, "created_at": 1})
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return sanitize_user(user)
+    public = sanitize_user(user)
+    _user_cache.set(user_id, public)
+    return public
+
+
+async def get_current_user(request: Request, token: Optional[HTTPAuthorizationCredentials] = Depends(security), db=Depends(get_db)) -> UserPublic:
+    payload = _decode_token(request, token)
+    return await _load_user(payload["sub"], db)
+
+
+async def get_current_user_readonly(request: Request, token: Optional[HTTPAuthorizationCredentials] = Depends(security), db=Depends(get_db)) -> UserPublic:
+    """
+    Like get_current_user, for routes that only read data.
+
+    With AUTH_TRUST_TOKEN_CLAIMS the user comes straight from the signed
+    claims, with no cache or database lookup. Tokens issued before
+    created_at was added to the claims fall back to the normal path.
+    """
+    payload = _decode_token(request, token)
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and payload.get("created_at"):
+        return UserPublic(id=payload["sub"], email=payload["email"], created_at=payload["created_at"])
+    return await _load_user(payload["sub"], db)
@@ -0,0 +1,95 @@
+"""
+MongoDB indexes
+Every index the app relies on, declared in one place and ensured at startup
+by `connect_to_mongo`. Indexes use MongoDB's default names, so creating one
+that already exists is a no-op and running this on every start is cheap.
+
+Data fixes an index depends on are run by hand, never at startup: on a
+database holding contacts saved before phones were normalized, run
+`scripts/migrate_contact_phones.py` so the unique (user_id, phone) index
+can be built.
+
+`scripts/audit_query_plans.py` explains the hot query shapes against these
+indexes and fails on any collection scan.
+"""
+
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "messages": [
+        # Every status webhook, and the upsert that dedupes redelivered incoming messages
+        IndexModel([("whatsappMessageId", ASCENDING)]),
+        # One stored copy of each incoming message, even when two workers handle the same redelivery
+        # (outgoing messages keep whatsappMessageId null until sent, so they are left out)
+        IndexModel(
+            [("whatsappMessageId", ASCENDING), ("direction", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"direction": "incoming", "whatsappMessageId": {"$type": "string"}},
+        ),
+        # GET /messages?chatId=... (list routes page on (sort field, _id), see app/db/pagination.py)
+        IndexModel([("chatId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        # GET /messages without a chat
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "contacts": [
+        # One contact per phone per user; bulk import upserts on this
+        # (fails on legacy duplicate phones until scripts/migrate_contact_phones.py has run)
+        IndexModel([("user_id", ASCENDING), ("phone", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("list_ids", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "contact_lists": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("name", ASCENDING)]),
+    ],
+    "broadcasts": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Job queue claim: oldest queued/expired broadcast first
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+    "broadcast_recipients": [
+        IndexModel([("broadcast_id", ASCENDING), ("seq", ASCENDING)], unique=True),
+        IndexModel([("broadcast_id", ASCENDING), ("status", ASCENDING), ("seq", ASCENDING)]),
+    ],
+    "templates": [
+        IndexModel([("meta_id", ASCENDING)]),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("facebook_id", ASCENDING)], sparse=True),
+    ],
+    "whatsapp_credentials": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+}
+
+
+async def ensure_indexes(db) -> List[str]:
+    """
+    Create any missing declared index.
+
+    A failure on one index (e.g. existing duplicate emails blocking a unique
+    index) is logged and skipped so the app still starts; the failures are
+    returned so /health can report them.
+    """
+    errors: List[str] = []
+    for collection, models in INDEXES.items():
+        for model in models:
+            name = model.document["name"]
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as exc:
+                error = f"Could not create index {collection}.{name}: {exc.details.get('errmsg', exc)}"
+                logger.error(error)
+                errors.append(error)
+    if errors:
+        logger.error(f"{len(errors)} MongoDB index(es) missing; queries relying on them are slow or unguarded")
+    else:
+        logger.info("MongoDB indexes ensured")
+    return errors
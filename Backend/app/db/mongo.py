@@ -1,12 +1,14 @@
 from fastapi import HTTPException, Request
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from app.db.indexes import ensure_indexes
 from config import settings
 
 
 async def connect_to_mongo(app):
     app.state.mongo_client = AsyncIOMotorClient(settings.MONGODB_URI)
     app.state.db = app.state.mongo_client[settings.MONGODB_DB_NAME]
+    app.state.index_errors = await ensure_indexes(app.state.db)
 
 
 async def close_mongo(app):
@@ -0,0 +1,76 @@
+"""
+Keyset pagination
+List routes page newest-first on (sort field, _id) instead of skip/offset or
+loading the whole cursor. The `after` cursor handed to clients is opaque:
+URL-safe base64 of the last document's sort value and _id (BSON extended JSON,
+so ObjectId and string ids both round-trip).
+
+Routes keep their existing response body and return the next cursor in the
+`X-Next-Cursor` header; it is absent on the last page.
+"""
+
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(doc: dict, field: str) -> str:
+    raw = json_util.dumps([doc.get(field), doc["_id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(after: str) -> Tuple[Any, Any]:
+    try:
+        padded = after + "=" * (-len(after) % 4)
+        value, last_id = json_util.loads(base64.urlsafe_b64decode(padded).decode())
+        return value, last_id
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query: Dict[str, Any], field: str, after: Optional[str]) -> Dict[str, Any]:
+    """Restrict a query to documents after the cursor in (field, _id) descending order."""
+    if not after:
+        return query
+    value, last_id = decode_cursor(after)
+    return {
+        **query,
+        "$or": [
+            {field: {"$lt": value}},
+            {field: value, "_id": {"$lt": last_id}},
+        ],
+    }
+
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    field: str,
+    limit: int,
+    after: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one newest-first page.
+
+    Reads limit + 1 documents to tell whether another page exists, so the
+    next cursor is None exactly on the last page.
+    """
+    cursor = (
+        collection.find(keyset_query(query, field, after), projection)
+        .sort([(field, -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    docs = await cursor.to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1], field) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,157 @@
+"""
+Broadcast dispatch engine
+Sends a template to many recipients with bounded concurrency behind a
+per phone number token bucket, so throughput follows Meta's messaging tier
+instead of a fixed sleep between sends.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from app.services.templates import send_template_message
+from config import settings
+from models import BroadcastRequest, TemplateRequest
+
+logger = logging.getLogger(__name__)
+
+# (recipient key, phone) - the key is handed back to the result callback untouched
+Recipient = Tuple[Any, str]
+ResultCallback = Callable[[Any, str, Optional[dict]], Awaitable[None]]
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it. Waiters are served in arrival order."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# phone_number_id -> TokenBucket, shared by every broadcast sending from that number
+_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(phone_number_id: str) -> TokenBucket:
+    """Get the token bucket for a phone number, creating it from settings on first use."""
+    bucket = _rate_limiters.get(phone_number_id)
+    if bucket is None:
+        rate = settings.BROADCAST_PHONE_RATE_LIMITS.get(phone_number_id, settings.BROADCAST_RATE_LIMIT_PER_SECOND)
+        burst = max(settings.BROADCAST_RATE_LIMIT_BURST, 1)
+        bucket = TokenBucket(rate=rate, capacity=min(burst, max(int(rate), 1)))
+        _rate_limiters[phone_number_id] = bucket
+    return bucket
+
+
+def build_template_request(req: BroadcastRequest, phone: str) -> TemplateRequest:
+    return TemplateRequest(
+        phone=phone,
+        template_name=req.template_name,
+        template_id=req.template_id,
+        language_code=req.language_code,
+        body_parameters=req.body_parameters,
+        header_parameters=req.header_parameters,
+        header_type=req.header_type,
+    )
+
+
+async def _send_one(req: BroadcastRequest, phone: str, send, db, user_id) -> Tuple[str, Optional[dict]]:
+    """Send to a single recipient and classify the outcome as ("sent" | "failed", details)."""
+    try:
+        res = await send(build_template_request(req, phone), db=db, user_id=user_id)
+    except Exception as exc:
+        logger.warning(f"Unexpected error sending to {phone}: {str(exc)}")
+        return "failed", {"error": str(exc)}
+
+    if isinstance(res, dict) and res.get("success"):
+        return "sent", res.get("whatsapp_response")
+    return "failed", res.get("details") if isinstance(res, dict) else {"error": "Unknown error"}
+
+
+async def dispatch_broadcast(
+    req: BroadcastRequest,
+    recipients: Union[Iterable[Recipient], AsyncIterable[Recipient]],
+    db=None,
+    user_id: Optional[str] = None,
+    on_result: Optional[ResultCallback] = None,
+    phone_number_id: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    send=send_template_message,
+) -> Dict[str, int]:
+    """
+    Send `req`'s template to every recipient.
+
+    Recipients are pulled lazily from a sync or async iterable of (key, phone)
+    pairs, so callers can stream them from a cursor. At most `concurrency`
+    sends are in flight, and each send first takes a token from the phone
+    number's bucket. All sends go through the shared pooled Graph API client.
+    `on_result(key, status, details)` is awaited after every send; it runs
+    concurrently with other sends and must not assume ordering.
+
+    Returns:
+        Dict with 'sent' and 'failed' counts.
+    """
+    phone_number_id = phone_number_id or settings.WHATSAPP_PHONE_NUMBER_ID
+    concurrency = max(1, concurrency or settings.BROADCAST_MAX_CONCURRENCY)
+    bucket = get_rate_limiter(phone_number_id)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"sent": 0, "failed": 0}
+
+    async def producer():
+        if hasattr(recipients, "__aiter__"):
+            async for item in recipients:
+                await queue.put(item)
+        else:
+            for item in recipients:
+                await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            key, phone = item
+            await bucket.acquire()
+            status, details = await _send_one(req, phone, send, db, user_id)
+            counts[status] += 1
+            if on_result is not None:
+                try:
+                    await on_result(key, status, details)
+                except Exception as exc:
+                    logger.error(f"Broadcast result callback failed for {phone}: {str(exc)}", exc_info=True)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await producer()
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+    return counts
@@ -0,0 +1,264 @@
+"""
+Broadcast recipient storage
+Recipients live in their own `broadcast_recipients` collection, one document
+per recipient keyed by (broadcast_id, seq), so a broadcast document stays
+small no matter the audience size. Send results are buffered and applied with
+batched bulk_write, and the broadcast's sent/failed/pending counters are kept
+with $inc instead of being recounted.
+
+Broadcasts that target contact lists store only the audience query. The
+worker resolves it by streaming the contacts cursor into this collection
+before sending, deduplicating phones with a set of ints.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.services.contacts import InvalidPhoneError, normalize_phone
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RECIPIENTS_COLLECTION = "broadcast_recipients"
+
+# Raises if the caller no longer owns the broadcast; checked before recipient rows are deleted or written
+LeaseCheck = Callable[[], Awaitable[None]]
+
+
+async def _no_lease_check() -> None:
+    return None
+
+
+def _recipient_doc(broadcast_id: str, seq: int, phone: str, status: str = "pending", details=None) -> dict:
+    return {
+        "broadcast_id": broadcast_id,
+        "seq": seq,
+        "phone": phone,
+        "status": status,
+        "details": details,
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def insert_recipients(db, broadcast_id: str, phones: Iterable[str], batch_size: Optional[int] = None) -> int:
+    """Insert pending recipients in insert_many batches. Returns the number inserted."""
+    batch_size = batch_size or settings.BROADCAST_RESULT_BATCH_SIZE
+    batch: List[dict] = []
+    total = 0
+    for phone in phones:
+        batch.append(_recipient_doc(broadcast_id, total, phone))
+        total += 1
+        if len(batch) >= batch_size:
+            await db[RECIPIENTS_COLLECTION].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db[RECIPIENTS_COLLECTION].insert_many(batch, ordered=False)
+    return total
+
+
+def audience_query(broadcast: dict) -> Dict:
+    """Build the contacts query for a broadcast's stored audience (list_ids plus segment filters)."""
+    audience = broadcast.get("audience") or {}
+    query: Dict = {"user_id": ObjectId(broadcast["user_id"])}
+    list_filter: Dict = {}
+    if audience.get("list_ids"):
+        list_filter["$in"] = [ObjectId(lid) for lid in audience["list_ids"]]
+    if audience.get("exclude_list_ids"):
+        list_filter["$nin"] = [ObjectId(lid) for lid in audience["exclude_list_ids"]]
+    if list_filter:
+        query["list_ids"] = list_filter
+    created_filter: Dict = {}
+    if audience.get("created_after"):
+        created_filter["$gte"] = audience["created_after"]
+    if audience.get("created_before"):
+        created_filter["$lt"] = audience["created_before"]
+    if created_filter:
+        query["created_at"] = created_filter
+    return query
+
+
+def _phone_key(phone: str) -> Optional[int]:
+    """Compact dedup key: the normalized number as an int (far smaller in a set than the string)."""
+    try:
+        return int(normalize_phone(phone))
+    except InvalidPhoneError:
+        return None
+
+
+async def resolve_audience(
+    db,
+    broadcast: dict,
+    batch_size: Optional[int] = None,
+    ensure_lease: LeaseCheck = _no_lease_check,
+) -> int:
+    """
+    Stream the broadcast's audience from `contacts` into pending recipients.
+
+    Recipients already stored for the broadcast (phones given literally in
+    the request) come first and are never duplicated. Safe to re-run after a
+    crash: rows from an interrupted resolution are removed first, which is
+    fine because sending only starts once resolution has finished.
+    `ensure_lease` runs before the delete and before every insert, so a
+    worker that lost the broadcast to another one stops writing rows.
+    Returns the broadcast's total recipient count.
+    """
+    batch_size = batch_size or settings.BROADCAST_RESULT_BATCH_SIZE
+    broadcast_id = broadcast["_id"]
+    base = broadcast.get("literal_count", 0)
+    await ensure_lease()
+    await db[RECIPIENTS_COLLECTION].delete_many({"broadcast_id": broadcast_id, "seq": {"$gte": base}})
+
+    seen = set()
+    async for doc in db[RECIPIENTS_COLLECTION].find({"broadcast_id": broadcast_id}, {"_id": 0, "phone": 1}):
+        seen.add(_phone_key(doc["phone"]))
+
+    seq = base
+    batch: List[dict] = []
+    cursor = db["contacts"].find(audience_query(broadcast), {"_id": 0, "phone": 1}, batch_size=batch_size)
+    async for contact in cursor:
+        phone = contact.get("phone")
+        key = _phone_key(phone)
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        batch.append(_recipient_doc(broadcast_id, seq, phone))
+        seq += 1
+        if len(batch) >= batch_size:
+            await ensure_lease()
+            await db[RECIPIENTS_COLLECTION].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await ensure_lease()
+        await db[RECIPIENTS_COLLECTION].insert_many(batch, ordered=False)
+
+    await ensure_lease()
+    await db.broadcasts.update_one(
+        {"_id": broadcast_id},
+        {"$set": {"total": seq, "pending": seq, "recipients_resolved": True}},
+    )
+    logger.info(f"Resolved {seq - base} contact recipient(s) for broadcast {broadcast_id} ({seq} total)")
+    return seq
+
+
+async def migrate_embedded_recipients(db, broadcast: dict, ensure_lease: LeaseCheck = _no_lease_check) -> None:
+    """Move a legacy `recipients` array off the broadcast document into the collection."""
+    embedded = broadcast.get("recipients")
+    if not embedded:
+        return
+    await ensure_lease()
+    docs = [
+        _recipient_doc(broadcast["_id"], seq, r["phone"], r.get("status", "pending"), r.get("details"))
+        for seq, r in enumerate(embedded)
+    ]
+    try:
+        await db[RECIPIENTS_COLLECTION].insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        # Duplicate keys are rows a previous, interrupted migration already copied
+        if any(err.get("code") != 11000 for err in exc.details.get("writeErrors", [])):
+            raise
+    await db.broadcasts.update_one({"_id": broadcast["_id"]}, {"$unset": {"recipients": ""}})
+
+
+async def iter_pending_recipients(db, broadcast_id: str, batch_size: Optional[int] = None) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (recipient _id, phone) for pending recipients in seq order, paging by seq."""
+    batch_size = batch_size or settings.BROADCAST_RESULT_BATCH_SIZE
+    last_seq = -1
+    while True:
+        cursor = (
+            db[RECIPIENTS_COLLECTION]
+            .find(
+                {"broadcast_id": broadcast_id, "status": "pending", "seq": {"$gt": last_seq}},
+                {"phone": 1, "seq": 1},
+            )
+            .sort("seq", ASCENDING)
+            .limit(batch_size)
+        )
+        page = await cursor.to_list(length=batch_size)
+        if not page:
+            return
+        for doc in page:
+            yield doc["_id"], doc["phone"]
+        last_seq = page[-1]["seq"]
+
+
+async def list_recipients(
+    db,
+    broadcast_id: str,
+    after: Optional[int] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+) -> Tuple[List[dict], Optional[int]]:
+    """Return one page of recipients ordered by seq and the `after` value for the next page."""
+    query: Dict = {"broadcast_id": broadcast_id}
+    if after is not None:
+        query["seq"] = {"$gt": after}
+    if status:
+        query["status"] = status
+
+    cursor = (
+        db[RECIPIENTS_COLLECTION]
+        .find(query, {"_id": 0, "seq": 1, "phone": 1, "status": 1, "details": 1, "updated_at": 1})
+        .sort("seq", ASCENDING)
+        .limit(limit + 1)
+    )
+    docs = await cursor.to_list(length=limit + 1)
+    next_after = docs[limit - 1]["seq"] if len(docs) > limit else None
+    return docs[:limit], next_after
+
+
+class RecipientResultWriter:
+    """
+    Buffers per-recipient results and applies them in bulk.
+
+    Each flush issues one bulk_write per outcome, conditional on the recipient
+    still being pending, and one $inc on the broadcast counters for the rows
+    actually modified, so replays after a crash never double count.
+    """
+
+    def __init__(self, db, broadcast_id: str, batch_size: Optional[int] = None):
+        self.db = db
+        self.broadcast_id = broadcast_id
+        self.batch_size = batch_size or settings.BROADCAST_RESULT_BATCH_SIZE
+        self._pending: Dict[str, List[UpdateOne]] = {"sent": [], "failed": []}
+        self._lock = asyncio.Lock()
+
+    def _buffered(self) -> int:
+        return sum(len(ops) for ops in self._pending.values())
+
+    async def add(self, recipient_id, status: str, details) -> None:
+        self._pending[status].append(
+            UpdateOne(
+                {"_id": recipient_id, "status": "pending"},
+                {"$set": {"status": status, "details": details, "updated_at": datetime.utcnow().isoformat()}},
+            )
+        )
+        if self._buffered() >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batches, self._pending = self._pending, {"sent": [], "failed": []}
+            increments = {}
+            for status, ops in batches.items():
+                if not ops:
+                    continue
+                result = await self.db[RECIPIENTS_COLLECTION].bulk_write(ops, ordered=False)
+                if result.modified_count:
+                    increments[status] = result.modified_count
+            if increments:
+                increments["pending"] = -sum(increments.values())
+                await self.db.broadcasts.update_one({"_id": self.broadcast_id}, {"$inc": increments})
+
+    async def run_periodic_flush(self, interval: Optional[float] = None) -> None:
+        """Flush on a timer so progress stays visible while batches are filling."""
+        interval = interval or settings.BROADCAST_RESULT_FLUSH_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            if self._buffered():
+                await self.flush()
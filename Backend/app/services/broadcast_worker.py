@@ -0,0 +1,225 @@
+"""
+Broadcast job worker
+Claims queued broadcasts from MongoDB under a lease and streams their pending
+recipients from `broadcast_recipients` through the dispatch engine. A
+broadcast whose worker dies keeps its lease only until `lease_expires_at`;
+after that any worker can claim it and resume from the recipients that are
+still pending.
+
+Delivery is at-least-once: a recipient that was sent but not yet recorded
+when a worker crashed is sent again on resume.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import uuid4
+
+from pymongo import ReturnDocument
+
+from app.services.broadcast_dispatch import dispatch_broadcast
+from app.services.broadcast_recipients import (
+    RecipientResultWriter,
+    iter_pending_recipients,
+    migrate_embedded_recipients,
+    resolve_audience,
+)
+from config import settings
+from models import BroadcastRequest
+
+logger = logging.getLogger(__name__)
+
+# Broadcast statuses a worker may claim (an expired "sending" lease means its worker died)
+CLAIMABLE_STATUSES = ["queued", "sending"]
+
+
+class LeaseLostError(Exception):
+    """Raised when another worker has taken over the broadcast this worker was sending"""
+    pass
+
+
+class BroadcastWorker:
+    """Polls for claimable broadcasts and sends them one at a time"""
+
+    def __init__(self, db, worker_id: Optional[str] = None):
+        self.db = db
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.lease_seconds = settings.BROADCAST_LEASE_SECONDS
+        self.poll_interval = settings.BROADCAST_POLL_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name=f"broadcast-worker-{self.worker_id}")
+
+    async def stop(self) -> None:
+        """Stop polling and cancel the broadcast in progress; its lease expires and another worker resumes it."""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        logger.info(f"Broadcast worker {self.worker_id} started")
+        while not self._stopping.is_set():
+            try:
+                job = await self.claim()
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self.process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error(f"Broadcast worker {self.worker_id} error: {str(exc)}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    async def claim(self) -> Optional[dict]:
+        """Atomically take the oldest claimable broadcast whose lease is free or expired."""
+        now = datetime.utcnow()
+        return await self.db.broadcasts.find_one_and_update(
+            {
+                "status": {"$in": CLAIMABLE_STATUSES},
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}],
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _renew_lease(self, broadcast_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            result = await self.db.broadcasts.update_one(
+                {"_id": broadcast_id, "lease_owner": self.worker_id},
+                {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}},
+            )
+            if result.matched_count == 0:
+                raise LeaseLostError(f"Lease on broadcast {broadcast_id} was taken over")
+
+    async def _ensure_lease(self, broadcast_id: str) -> None:
+        owned = await self.db.broadcasts.count_documents(
+            {"_id": broadcast_id, "lease_owner": self.worker_id}, limit=1
+        )
+        if not owned:
+            raise LeaseLostError(f"Lease on broadcast {broadcast_id} was taken over")
+
+    async def _while_leased(self, task: asyncio.Task, lease_task: asyncio.Task):
+        """Wait for task; if the lease is lost first, cancel it and raise LeaseLostError."""
+        try:
+            done, _ = await asyncio.wait({task, lease_task}, return_when=asyncio.FIRST_COMPLETED)
+            if task not in done:
+                lease_task.result()
+            return task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def _prepare(self, job: dict) -> None:
+        """Move legacy embedded recipients and resolve a list audience into broadcast_recipients."""
+        ensure_lease = lambda: self._ensure_lease(job["_id"])
+        await migrate_embedded_recipients(self.db, job, ensure_lease=ensure_lease)
+        if job.get("recipients_resolved") is False:
+            job["total"] = job["pending"] = await resolve_audience(self.db, job, ensure_lease=ensure_lease)
+
+    async def process(self, job: dict) -> None:
+        broadcast_id = job["_id"]
+        # Renew from the start: resolving a large audience can outlast one lease
+        lease_task = asyncio.create_task(self._renew_lease(broadcast_id))
+        try:
+            counts = await self._send(job, lease_task)
+        finally:
+            lease_task.cancel()
+            await asyncio.gather(lease_task, return_exceptions=True)
+
+        await self.db.broadcasts.update_one(
+            {"_id": broadcast_id, "lease_owner": self.worker_id},
+            {
+                "$set": {
+                    "status": "completed",
+                    "completed_at": datetime.utcnow().isoformat(),
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                }
+            },
+        )
+        logger.info(
+            f"Worker {self.worker_id} completed broadcast {broadcast_id}: "
+            f"sent={counts['sent']} failed={counts['failed']}"
+        )
+
+    async def _send(self, job: dict, lease_task: asyncio.Task) -> dict:
+        broadcast_id = job["_id"]
+        await self._while_leased(asyncio.create_task(self._prepare(job)), lease_task)
+        logger.info(
+            f"Worker {self.worker_id} claimed broadcast {broadcast_id} "
+            f"(attempt {job.get('attempts', 1)}, {job.get('pending', 0)} pending)"
+        )
+
+        if job.get("sent_at") is None:
+            await self.db.broadcasts.update_one(
+                {"_id": broadcast_id}, {"$set": {"sent_at": datetime.utcnow().isoformat()}}
+            )
+
+        req = BroadcastRequest(
+            name=job.get("name", ""),
+            phones=[],
+            template_name=job["template_name"],
+            template_id=job.get("template_id"),
+            language_code=job.get("language_code", "en"),
+            body_parameters=job.get("body_parameters", []),
+            header_parameters=job.get("header_parameters", []),
+            header_type=job.get("header_type"),
+        )
+
+        writer = RecipientResultWriter(self.db, broadcast_id)
+        send_task = asyncio.create_task(
+            dispatch_broadcast(
+                req,
+                iter_pending_recipients(self.db, broadcast_id),
+                db=self.db,
+                user_id=job.get("user_id"),
+                on_result=writer.add,
+            )
+        )
+        flush_task = asyncio.create_task(writer.run_periodic_flush())
+        try:
+            return await self._while_leased(send_task, lease_task)
+        finally:
+            flush_task.cancel()
+            await asyncio.gather(flush_task, return_exceptions=True)
+            # Record whatever finished, even when stopping early
+            await writer.flush()
+
+
+async def start_broadcast_workers(db, count: Optional[int] = None) -> List[BroadcastWorker]:
+    count = settings.BROADCAST_WORKERS if count is None else count
+    if count <= 0:
+        return []
+    workers = [BroadcastWorker(db) for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+async def stop_broadcast_workers(workers: List[BroadcastWorker]) -> None:
+    await asyncio.gather(*(worker.stop() for worker in workers))
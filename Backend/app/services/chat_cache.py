@@ -0,0 +1,165 @@
+"""
+Chatbot response cache
+Caches Gemini replies so repeated FAQ questions are answered from memory
+instead of spending API quota and seconds of latency.
+
+Entries are keyed on the normalized message plus a hash of the last few
+history turns, so the same question in a different conversation context is
+not served a mismatched answer. With CHAT_CACHE_SEMANTIC enabled, a miss on
+the exact key also compares the message's embedding against cached messages
+with the same history tail and reuses a reply whose similarity clears
+CHAT_CACHE_SIMILARITY_THRESHOLD, which catches paraphrases.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.cache import TTLCache
+from app.services.gemini import get_gemini_service
+from config import settings
+
+# Optional: vectorized similarity scan
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[str], Awaitable[List[float]]]
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_message(message: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing ?!. so trivial variants share a key."""
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", message.strip().lower()))
+
+
+def history_tail_hash(history: Optional[List[Dict[str, str]]], turns: int) -> str:
+    tail = (history or [])[-turns:] if turns > 0 else []
+    raw = json.dumps([[m.get("role"), m.get("content")] for m in tail], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@dataclass
+class ChatCacheLookup:
+    """Result of a lookup; pass it back to `store` on a miss so the key and embedding are reused"""
+    key: str
+    history_hash: str
+    normalized: str
+    response: Optional[str] = None
+    vector: Optional[List[float]] = None
+
+
+class ChatResponseCache:
+    """TTL/LRU cache of chatbot replies with an optional embedding-similarity fallback"""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        history_turns: Optional[int] = None,
+        semantic: Optional[bool] = None,
+        threshold: Optional[float] = None,
+        embed: Optional[EmbedFn] = None,
+    ):
+        self._responses: TTLCache[str] = TTLCache(
+            settings.CHAT_CACHE_SIZE if maxsize is None else maxsize,
+            settings.CHAT_CACHE_TTL_SECONDS if ttl is None else ttl,
+        )
+        self.history_turns = settings.CHAT_CACHE_HISTORY_TURNS if history_turns is None else history_turns
+        self.semantic = (settings.CHAT_CACHE_SEMANTIC if semantic is None else semantic) and embed is not None
+        self.threshold = settings.CHAT_CACHE_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self._embed = embed
+        # key -> (history hash, unit vector), bounded like the responses
+        self._vectors: "OrderedDict[str, tuple]" = OrderedDict()
+        self.semantic_hits = 0
+        self.embedding_errors = 0
+
+    async def _embedding(self, text: str) -> Optional[List[float]]:
+        try:
+            return _unit(list(await self._embed(text)))
+        except Exception as exc:
+            # The exact-match cache still works without embeddings
+            self.embedding_errors += 1
+            logger.warning(f"Chat cache embedding failed: {str(exc)}")
+            return None
+
+    def _most_similar(self, history_hash: str, vector: List[float]) -> Optional[str]:
+        candidates = [(key, vec) for key, (h, vec) in self._vectors.items() if h == history_hash]
+        if not candidates:
+            return None
+        if NUMPY_AVAILABLE:
+            scores = np.asarray([vec for _, vec in candidates]) @ np.asarray(vector)
+            best = int(scores.argmax())
+            best_score = float(scores[best])
+        else:
+            scores = [sum(a * b for a, b in zip(vec, vector)) for _, vec in candidates]
+            best = max(range(len(scores)), key=scores.__getitem__)
+            best_score = scores[best]
+        return candidates[best][0] if best_score >= self.threshold else None
+
+    async def lookup(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> ChatCacheLookup:
+        normalized = normalize_message(message)
+        history_hash = history_tail_hash(history, self.history_turns)
+        key = f"{history_hash}:{normalized}"
+        result = ChatCacheLookup(key=key, history_hash=history_hash, normalized=normalized)
+
+        result.response = self._responses.get(key)
+        if result.response is not None or not self.semantic:
+            return result
+
+        result.vector = await self._embedding(normalized)
+        if result.vector is not None:
+            similar_key = self._most_similar(history_hash, result.vector)
+            if similar_key is not None:
+                result.response = self._responses.get(similar_key)
+                if result.response is not None:
+                    self.semantic_hits += 1
+                else:
+                    # Expired or evicted since; drop its vector too
+                    self._vectors.pop(similar_key, None)
+        return result
+
+    def store(self, lookup: ChatCacheLookup, response: str) -> None:
+        self._responses.set(lookup.key, response)
+        if self.semantic and lookup.vector is not None:
+            self._vectors[lookup.key] = (lookup.history_hash, lookup.vector)
+            self._vectors.move_to_end(lookup.key)
+            while len(self._vectors) > self._responses.maxsize:
+                self._vectors.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            **self._responses.stats(),
+            "semantic": self.semantic,
+            "semantic_hits": self.semantic_hits,
+            "semantic_entries": len(self._vectors),
+            "embedding_errors": self.embedding_errors,
+        }
+
+
+# Singleton instance
+_chat_cache: Optional[ChatResponseCache] = None
+
+
+def get_chat_cache() -> ChatResponseCache:
+    """Get the singleton chat cache, embedding with the Gemini service when semantic lookup is enabled"""
+    global _chat_cache
+    if _chat_cache is None:
+        _chat_cache = ChatResponseCache(embed=get_gemini_service().embed_text)
+    return _chat_cache
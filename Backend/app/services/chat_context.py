@@ -0,0 +1,150 @@
+"""
+Chatbot conversation context
+Keeps the history forwarded to Gemini within CHAT_HISTORY_TOKEN_BUDGET
+estimated tokens, however long the conversation gets.
+
+Recent turns are sent verbatim while they fit; everything older is folded
+into a rolling summary that is sent in their place. The cut between the two
+moves in blocks of CHAT_SUMMARY_STEP_TURNS, so consecutive requests of one
+conversation share the same summary instead of triggering a summarization
+call every turn. Summaries are cached under a chained hash of the turns they
+cover: the client resends the full history on each request, so that hash
+identifies the conversation prefix without a conversation id, and a longer
+prefix extends the newest cached summary rather than re-reading every turn.
+"""
+
+import hashlib
+import logging
+import math
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.cache import TTLCache
+from app.services.gemini import get_gemini_service
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SummarizeFn = Callable[[List[Dict[str, str]], Optional[str], int], Awaitable[str]]
+
+# Rough chars-per-token ratio for English text; a budget, not an exact count
+CHARS_PER_TOKEN = 4
+# Role marker and turn framing added by the API per message
+TURN_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def turn_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message.get("content", "")) + TURN_OVERHEAD_TOKENS
+
+
+def prefix_hashes(history: List[Dict[str, str]], upto: int) -> List[str]:
+    """hashes[i] identifies history[:i]; each hash chains the previous one"""
+    hashes = [""]
+    for msg in history[:upto]:
+        digest = hashlib.sha256()
+        digest.update(hashes[-1].encode())
+        digest.update(f"\x1e{msg.get('role')}\x1f{msg.get('content', '')}".encode())
+        hashes.append(digest.hexdigest()[:32])
+    return hashes
+
+
+class ChatContextManager:
+    """Fits conversation history into a token budget, summarizing older turns"""
+
+    def __init__(
+        self,
+        summarize: SummarizeFn,
+        budget: Optional[int] = None,
+        step: Optional[int] = None,
+        summary_tokens: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+    ):
+        self._summarize = summarize
+        self.budget = settings.CHAT_HISTORY_TOKEN_BUDGET if budget is None else budget
+        self.step = max(1, settings.CHAT_SUMMARY_STEP_TURNS if step is None else step)
+        self.summary_tokens = settings.CHAT_SUMMARY_MAX_TOKENS if summary_tokens is None else summary_tokens
+        self._summaries: TTLCache[str] = TTLCache(
+            settings.CHAT_SUMMARY_CACHE_SIZE if cache_size is None else cache_size,
+            settings.CHAT_SUMMARY_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl,
+        )
+        self.requests = 0
+        self.compressed = 0
+        self.summary_calls = 0
+        self.summary_errors = 0
+
+    def _cut(self, tokens: List[int]) -> int:
+        """Index of the first turn kept verbatim, rounded up to a summary block boundary"""
+        remaining = self.budget - self.summary_tokens - estimate_tokens(SUMMARY_PREFIX) - TURN_OVERHEAD_TOKENS
+        cut = len(tokens)
+        while cut > 0 and tokens[cut - 1] <= remaining:
+            remaining -= tokens[cut - 1]
+            cut -= 1
+        return min(len(tokens), math.ceil(cut / self.step) * self.step)
+
+    async def _summary(self, history: List[Dict[str, str]], cut: int) -> str:
+        hashes = prefix_hashes(history, cut)
+        cached = self._summaries.get(hashes[cut])
+        if cached is not None:
+            return cached
+
+        # Extend the newest summary of a shorter prefix of this conversation
+        start, previous = 0, None
+        boundary = (cut - 1) // self.step * self.step
+        while boundary > 0:
+            previous = self._summaries.get(hashes[boundary])
+            if previous is not None:
+                start = boundary
+                break
+            boundary -= self.step
+
+        self.summary_calls += 1
+        summary = await self._summarize(history[start:cut], previous, self.summary_tokens)
+        self._summaries.set(hashes[cut], summary)
+        return summary
+
+    async def build(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Return the history to send: as-is when it fits, else a summary turn plus the recent turns"""
+        self.requests += 1
+        tokens = [turn_tokens(msg) for msg in history]
+        if sum(tokens) <= self.budget:
+            return history
+
+        self.compressed += 1
+        cut = self._cut(tokens)
+        recent = history[cut:]
+        try:
+            summary = await self._summary(history, cut)
+        except Exception as exc:
+            # Still bounded without the summary; the model just loses the older turns
+            self.summary_errors += 1
+            logger.warning(f"Conversation summary failed, dropping {cut} older turns: {str(exc)}")
+            return recent
+        return [{"role": "user", "content": f"{SUMMARY_PREFIX}{summary}"}] + recent
+
+    def stats(self) -> Dict:
+        return {
+            "token_budget": self.budget,
+            "requests": self.requests,
+            "compressed": self.compressed,
+            "summary_calls": self.summary_calls,
+            "summary_errors": self.summary_errors,
+            "summary_cache": self._summaries.stats(),
+        }
+
+
+# Singleton instance
+_chat_context: Optional[ChatContextManager] = None
+
+
+def get_chat_context() -> ChatContextManager:
+    """Get the singleton context manager, summarizing with the Gemini service"""
+    global _chat_context
+    if _chat_context is None:
+        _chat_context = ChatContextManager(summarize=get_gemini_service().summarize_conversation)
+    return _chat_context
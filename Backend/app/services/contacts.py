@@ -0,0 +1,351 @@
+"""
+Contacts service
+Phone normalization, the streaming bulk import behind POST /contacts/import
+and the streaming export behind GET /contacts/export.
+
+Imports read the uploaded file a batch of rows at a time (parsing runs in a
+worker thread over the spooled upload), so memory stays bounded by the batch
+size. Each batch is one unordered bulk_write of upserts keyed on
+(user_id, phone), which the unique index makes the dedup point: re-importing
+the same file updates names and list membership instead of adding rows.
+
+`normalize_stored_phones` is the one-time migration (run by
+scripts/migrate_contact_phones.py) that brings contacts saved before phones
+were normalized into the same form, merging the duplicates that produces,
+so the unique index can be built over them.
+
+Exports stream straight from the Motor cursor with a fixed batch size and
+projection, yielding one chunk per cursor batch, so memory is constant
+whatever the contact count.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Separators people type inside phone numbers
+PHONE_SEPARATORS = re.compile(r"[\s\-().]")
+# E.164 allows at most 15 digits; anything shorter than 8 is not a dialable mobile number
+MIN_PHONE_DIGITS = 8
+MAX_PHONE_DIGITS = 15
+# A stored phone already in normalize_phone's output form
+NORMALIZED_PHONE = re.compile(rf"^\d{{{MIN_PHONE_DIGITS},{MAX_PHONE_DIGITS}}}$")
+
+# Accepted CSV header names per field (lower-cased)
+CSV_PHONE_COLUMNS = ("phone", "phone_number", "mobile", "number", "whatsapp")
+CSV_NAME_COLUMNS = ("name", "full_name", "contact_name")
+
+
+class InvalidPhoneError(ValueError):
+    pass
+
+
+def normalize_phone(raw: Any) -> str:
+    """
+    Normalize a phone number to the digits-only international form WhatsApp uses.
+
+    Accepts "+91 98765-43210", "0091 9876543210", "919876543210" and so on;
+    raises InvalidPhoneError when the result is not 8-15 digits.
+    """
+    phone = PHONE_SEPARATORS.sub("", str(raw or "").strip())
+    if phone.startswith("+"):
+        phone = phone[1:]
+    elif phone.startswith("00"):
+        phone = phone[2:]
+    if not phone.isdigit():
+        raise InvalidPhoneError(f"Invalid phone number: {raw!r}")
+    if not MIN_PHONE_DIGITS <= len(phone) <= MAX_PHONE_DIGITS:
+        raise InvalidPhoneError(f"Phone number must have {MIN_PHONE_DIGITS}-{MAX_PHONE_DIGITS} digits: {raw!r}")
+    return phone
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def _pick(row: Dict[str, Any], columns: Tuple[str, ...]) -> Any:
+    for column in columns:
+        if row.get(column) not in (None, ""):
+            return row[column]
+    return None
+
+
+def _iter_csv_rows(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    if not reader.fieldnames or not any(column in reader.fieldnames for column in CSV_PHONE_COLUMNS):
+        yield 1, None, f"CSV header must include one of: {', '.join(CSV_PHONE_COLUMNS)}"
+        return
+    for row in reader:
+        # Row numbers count the header as row 1, matching spreadsheet line numbers
+        yield reader.line_num, {"phone": _pick(row, CSV_PHONE_COLUMNS), "name": _pick(row, CSV_NAME_COLUMNS)}, None
+
+
+def _iter_ndjson_rows(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_num, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, None, "Each line must be a JSON object"
+            continue
+        yield line_num, {"phone": row.get("phone"), "name": row.get("name")}, None
+
+
+def iter_import_rows(fileobj, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, {"phone", "name"} or None, error or None) from a binary file object."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        if fmt == "ndjson":
+            yield from _iter_ndjson_rows(text)
+        else:
+            yield from _iter_csv_rows(text)
+    finally:
+        # Leave the upload itself open; FastAPI closes it
+        text.detach()
+
+
+def _contact_upsert(user_oid: ObjectId, phone: str, name: Optional[str], list_oid: Optional[ObjectId], now: str) -> UpdateOne:
+    update: Dict[str, Any] = {"$setOnInsert": {"created_at": now}}
+    if name:
+        update["$set"] = {"name": name}
+    else:
+        update["$setOnInsert"]["name"] = ""
+    if list_oid is not None:
+        update["$addToSet"] = {"list_ids": list_oid}
+    else:
+        update["$setOnInsert"]["list_ids"] = []
+    return UpdateOne({"user_id": user_oid, "phone": phone}, update, upsert=True)
+
+
+async def import_contacts(
+    db,
+    user_oid: ObjectId,
+    fileobj,
+    fmt: str = "csv",
+    list_oid: Optional[ObjectId] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    Import contacts from a CSV/NDJSON file object, yielding progress events.
+
+    Yields {"type": "error", "row", "error"} for each rejected row,
+    {"type": "progress", ...} after every batch and a final {"type": "done", ...}.
+    """
+    batch_size = batch_size or settings.CONTACT_IMPORT_BATCH_SIZE
+    rows = iter_import_rows(fileobj, fmt)
+    totals = {"rows": 0, "created": 0, "updated": 0, "duplicates": 0, "errors": 0}
+
+    while True:
+        # Parse the next batch off the event loop
+        batch = await asyncio.to_thread(lambda: list(islice(rows, batch_size)))
+        if not batch:
+            break
+
+        now = datetime.utcnow().isoformat()
+        ops: List[UpdateOne] = []
+        op_rows: List[int] = []
+        phones_in_batch = set()
+        for row_num, row, error in batch:
+            totals["rows"] += 1
+            if error is None:
+                try:
+                    phone = normalize_phone(row["phone"])
+                except InvalidPhoneError as exc:
+                    error = str(exc)
+            if error is not None:
+                totals["errors"] += 1
+                yield {"type": "error", "row": row_num, "error": error}
+                continue
+            if phone in phones_in_batch:
+                totals["duplicates"] += 1
+                continue
+            phones_in_batch.add(phone)
+            name = str(row["name"]).strip() if row.get("name") else None
+            ops.append(_contact_upsert(user_oid, phone, name, list_oid, now))
+            op_rows.append(row_num)
+
+        if ops:
+            try:
+                result = await db["contacts"].bulk_write(ops, ordered=False)
+                totals["created"] += result.upserted_count
+                totals["updated"] += result.matched_count
+            except BulkWriteError as exc:
+                details = exc.details
+                totals["created"] += details.get("nUpserted", 0)
+                totals["updated"] += details.get("nMatched", 0)
+                for write_error in details.get("writeErrors", []):
+                    totals["errors"] += 1
+                    yield {"type": "error", "row": op_rows[write_error["index"]], "error": write_error.get("errmsg")}
+
+        yield {"type": "progress", **totals}
+
+    logger.info(f"Contact import for user {user_oid} finished: {totals}")
+    yield {"type": "done", **totals}
+
+
+MERGE_FIELDS = {"user_id": 1, "phone": 1, "name": 1, "list_ids": 1, "created_at": 1}
+
+
+async def _merge_contacts(db, keep: dict, duplicates: List[dict]) -> Dict[str, Any]:
+    """
+    Fold duplicates into keep (list memberships unioned, first non-empty name kept) and delete them.
+
+    Returns an audit record of the merge: the kept contact and every deleted one as stored before.
+    """
+    name = keep.get("name") or next((doc["name"] for doc in duplicates if doc.get("name")), "")
+    list_ids = [lid for doc in duplicates for lid in doc.get("list_ids", [])]
+    await db["contacts"].update_one(
+        {"_id": keep["_id"]},
+        {"$set": {"name": name}, "$addToSet": {"list_ids": {"$each": list_ids}}},
+    )
+    await db["contacts"].delete_many({"_id": {"$in": [doc["_id"] for doc in duplicates]}})
+    record = {
+        "user_id": str(keep["user_id"]),
+        "kept_id": str(keep["_id"]),
+        "phone": keep.get("phone"),
+        "removed": [
+            {"id": str(doc["_id"]), "phone": doc.get("phone"), "name": doc.get("name", ""),
+             "list_ids": [str(lid) for lid in doc.get("list_ids", [])]}
+            for doc in duplicates
+        ],
+    }
+    logger.info(f"Merged contacts {[r['id'] for r in record['removed']]} into {record['kept_id']}")
+    return record
+
+
+async def normalize_stored_phones(db, on_merge: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+    """
+    Rewrite stored phones into normalize_phone form and merge contacts that share one.
+
+    Contacts created before phones were normalized can hold "+91 98765-43210"
+    next to "919876543210" (which imports would otherwise keep duplicating),
+    or exact duplicates that stop the unique (user_id, phone) index from
+    building. Duplicates are merged into the oldest contact and on_merge
+    receives each merge's audit record. Phones that cannot be normalized
+    are left as they are and counted as invalid.
+
+    This deletes contacts: run it only through the migration script, which
+    makes sure a single process runs it.
+    """
+    counts = {"normalized": 0, "merged": 0, "invalid": 0}
+
+    async for doc in db["contacts"].find({"phone": {"$not": NORMALIZED_PHONE}}, MERGE_FIELDS):
+        try:
+            phone = normalize_phone(doc.get("phone"))
+        except InvalidPhoneError:
+            counts["invalid"] += 1
+            continue
+        existing = await db["contacts"].find_one(
+            {"user_id": doc["user_id"], "phone": phone, "_id": {"$ne": doc["_id"]}}, MERGE_FIELDS
+        )
+        if existing is None:
+            try:
+                await db["contacts"].update_one({"_id": doc["_id"]}, {"$set": {"phone": phone}})
+                counts["normalized"] += 1
+                continue
+            except DuplicateKeyError:
+                existing = await db["contacts"].find_one({"user_id": doc["user_id"], "phone": phone}, MERGE_FIELDS)
+        record = await _merge_contacts(db, existing, [doc])
+        counts["merged"] += 1
+        if on_merge:
+            on_merge(record)
+
+    # Exact duplicates can only exist where the unique index was never built
+    duplicates = db["contacts"].aggregate(
+        [
+            {"$group": {"_id": {"user_id": "$user_id", "phone": "$phone"}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    async for group in duplicates:
+        docs = await db["contacts"].find({"_id": {"$in": group["ids"]}}, MERGE_FIELDS).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).to_list(length=None)
+        record = await _merge_contacts(db, docs[0], docs[1:])
+        counts["merged"] += len(docs) - 1
+        if on_merge:
+            on_merge(record)
+
+    logger.info(f"Normalized stored contact phones: {counts}")
+    return counts
+
+
+EXPORT_FIELDS = ("id", "name", "phone", "list_ids", "created_at")
+
+
+def _export_row(doc: dict) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "name": doc.get("name", ""),
+        "phone": doc.get("phone", ""),
+        "list_ids": [str(lid) for lid in doc.get("list_ids", [])],
+        "created_at": doc.get("created_at", ""),
+    }
+
+
+async def export_contacts(
+    db,
+    user_oid: ObjectId,
+    fmt: str = "csv",
+    list_oid: Optional[ObjectId] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream a user's contacts as CSV (list_ids joined with ";") or NDJSON.
+
+    The CSV header is yielded before the first query so the response starts
+    immediately; after that each chunk holds one cursor batch.
+    """
+    batch_size = batch_size or settings.CONTACT_EXPORT_BATCH_SIZE
+    query: Dict[str, Any] = {"user_id": user_oid}
+    if list_oid is not None:
+        query["list_ids"] = list_oid
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    cursor = db["contacts"].find(query, {"name": 1, "phone": 1, "list_ids": 1, "created_at": 1}, batch_size=batch_size)
+    rows = 0
+    async for doc in cursor:
+        row = _export_row(doc)
+        if fmt == "csv":
+            writer.writerow([row["id"], row["name"], row["phone"], ";".join(row["list_ids"]), row["created_at"]])
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,16 +1,21 @@
 """
 Gemini AI Service for WhatsApp Business API Chatbot
-Handles all interactions with the Gemini API
+Handles all interactions with the Gemini API.
+Calls go through the SDK's async client (`client.aio`) so a slow model
+response never blocks the event loop.
 """
 
 from google import genai
 from google.genai import types
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 import logging
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Returned when Gemini gives back no text (never cached)
+EMPTY_RESPONSE_MESSAGE = "I apologize, but I couldn't generate a response. Please try again."
+
 # System prompt that strictly defines the chatbot's domain
 WHATSAPP_BUSINESS_SYSTEM_PROMPT = """You are a WhatsApp Business API assistant. 
 You help businesses:
@@ -31,6 +36,12 @@ If a question is unrelated, politely refuse and redirect back to WhatsApp Busine
 Keep your responses concise, helpful, and professional. Use bullet points and formatting when explaining steps or lists.
 When providing code examples, use appropriate markdown formatting."""
 
+# Instruction for compressing older conversation turns into a rolling summary
+CONVERSATION_SUMMARY_PROMPT = """You summarize a conversation between a user and a WhatsApp Business API assistant.
+Write a compact summary of the conversation so far, merging in the previous summary if one is given.
+Keep the user's goals, their setup details (account, phone number, template and webhook facts), decisions made,
+and any open questions. Drop greetings and repetition. Write plain prose, no headings."""
+
 
 class GeminiChatService:
     """Service class for Gemini AI chat functionality"""
@@ -65,6 +76,30 @@ class GeminiChatService:
             ))
         return formatted
     
+    def _build_contents(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> List[types.Content]:
+        """Conversation history followed by the current user message"""
+        contents = []
+        if conversation_history and len(conversation_history) > 0:
+            contents = self._format_conversation_history(conversation_history)
+        contents.append(types.Content(
+            role="user",
+            parts=[types.Part(text=user_message)]
+        ))
+        return contents
+    
+    def _generation_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=WHATSAPP_BUSINESS_SYSTEM_PROMPT,
+            temperature=0.7,
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=1024,
+        )
+    
     async def generate_response(
         self, 
         user_message: str, 
@@ -83,39 +118,104 @@ class GeminiChatService:
         try:
             client = self._get_client()
             
-            # Build contents with history if provided
-            contents = []
-            if conversation_history and len(conversation_history) > 0:
-                contents = self._format_conversation_history(conversation_history)
-            
-            # Add current user message
-            contents.append(types.Content(
-                role="user",
-                parts=[types.Part(text=user_message)]
-            ))
-            
-            # Generate response with system instruction
-            response = client.models.generate_content(
+            # Generate response with system instruction (async client, so the loop keeps serving)
+            response = await client.aio.models.generate_content(
                 model=self._model_name,
-                contents=contents,
-                config=types.GenerateContentConfig(
-                    system_instruction=WHATSAPP_BUSINESS_SYSTEM_PROMPT,
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=1024,
-                )
+                contents=self._build_contents(user_message, conversation_history),
+                config=self._generation_config(),
             )
             
             if response and response.text:
                 return response.text.strip()
             else:
-                return "I apologize, but I couldn't generate a response. Please try again."
+                return EMPTY_RESPONSE_MESSAGE
                 
         except Exception as e:
             logger.error(f"Error generating Gemini response: {str(e)}", exc_info=True)
             raise GeminiServiceError(f"Failed to generate response: {str(e)}")
     
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Gemini as text chunks, as the model produces them
+        
+        Args:
+            user_message: The current user message
+            conversation_history: Optional list of previous messages with 'role' and 'content'
+            
+        Yields:
+            Text chunks of the AI-generated response
+        """
+        try:
+            client = self._get_client()
+            stream = await client.aio.models.generate_content_stream(
+                model=self._model_name,
+                contents=self._build_contents(user_message, conversation_history),
+                config=self._generation_config(),
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Error streaming Gemini response: {str(e)}", exc_info=True)
+            raise GeminiServiceError(f"Failed to generate response: {str(e)}")
+    
+    async def summarize_conversation(
+        self,
+        turns: List[Dict[str, str]],
+        previous_summary: Optional[str] = None,
+        max_output_tokens: int = 300
+    ) -> str:
+        """
+        Fold conversation turns into a rolling summary
+        
+        Args:
+            turns: Messages with 'role' and 'content' to add to the summary
+            previous_summary: Summary of the turns before these, if any
+            max_output_tokens: Upper bound on the summary length
+            
+        Returns:
+            The updated summary
+        """
+        lines = []
+        if previous_summary:
+            lines.append(f"Previous summary:\n{previous_summary}\n")
+        lines.append("New messages:")
+        for msg in turns:
+            speaker = "User" if msg.get("role") == "user" else "Assistant"
+            lines.append(f"{speaker}: {msg.get('content', '')}")
+        
+        try:
+            client = self._get_client()
+            response = await client.aio.models.generate_content(
+                model=self._model_name,
+                contents="\n".join(lines),
+                config=types.GenerateContentConfig(
+                    system_instruction=CONVERSATION_SUMMARY_PROMPT,
+                    temperature=0.2,
+                    max_output_tokens=max_output_tokens,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {str(e)}", exc_info=True)
+            raise GeminiServiceError(f"Failed to summarize conversation: {str(e)}")
+        
+        if not response or not response.text:
+            raise GeminiServiceError("Failed to summarize conversation: empty response")
+        return response.text.strip()
+    
+    async def embed_text(self, text: str) -> List[float]:
+        """Embed a single text (used by the chat response cache for paraphrase matching)"""
+        client = self._get_client()
+        result = await client.aio.models.embed_content(
+            model=settings.CHAT_CACHE_EMBEDDING_MODEL,
+            contents=text,
+        )
+        return result.embeddings[0].values
+    
     def validate_api_key(self) -> bool:
         """Validate that the Gemini API key is configured"""
         try:
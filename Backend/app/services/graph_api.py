@@ -0,0 +1,162 @@
+"""
+Graph API client
+One long-lived, app-scoped HTTP client for every outbound call to Meta's
+Graph API, so requests reuse pooled keep-alive connections (optionally over
+HTTP/2) instead of paying a TCP+TLS handshake per call. Retries and backoff
+are applied here once rather than at each call site.
+
+Relative URLs go to GRAPH_API_BASE_URL, which load tests point at a stub.
+OAuth code exchanges (which send the app secret) and the calls made with
+the tokens they return use absolute URLs on GRAPH_API_HOST instead, so that
+override never receives credentials.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+# Optional: HTTP/2 support
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Meta's Graph API host; httpx sends absolute URLs here regardless of the client's base_url
+GRAPH_API_HOST = "https://graph.facebook.com"
+
+# Meta returns these for throttling and transient outages
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only these are retried after the request may have reached Meta (a resent POST could double-send a message)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "DELETE"}
+# Errors raised before the request was sent, which are safe to retry for any method
+PRE_SEND_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class GraphAPIClient:
+    """Pooled httpx client with a shared retry/backoff policy for the Graph API"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http2: Optional[bool] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        http2 = settings.GRAPH_API_HTTP2 if http2 is None else http2
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("GRAPH_API_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+
+        self.max_retries = settings.GRAPH_API_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = settings.GRAPH_API_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.GRAPH_API_BASE_URL,
+            http2=http2,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=settings.GRAPH_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GRAPH_API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GRAPH_API_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.GRAPH_API_READ_TIMEOUT_SECONDS,
+                connect=settings.GRAPH_API_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    async def request(self, method: str, url: str, retry: bool = True, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying throttled and transient failures.
+
+        Returns the final response without raising for its status, like
+        httpx; callers keep using `raise_for_status()` as before. Pass
+        `retry=False` for requests that must reach Meta at most once even
+        though their method is idempotent (e.g. exchanging a single-use
+        OAuth code); only failures before the request was sent are retried.
+        """
+        method = method.upper()
+        idempotent = retry and method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except PRE_SEND_ERRORS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Graph API {method} {url} failed ({exc!r}), retrying in {delay:.2f}s")
+            except httpx.TransportError as exc:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Graph API {method} {url} failed ({exc!r}), retrying in {delay:.2f}s")
+            else:
+                retryable = retry and (response.status_code == 429 or (
+                    response.status_code in RETRY_STATUS_CODES and idempotent
+                ))
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                logger.warning(
+                    f"Graph API {method} {url} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+                await response.aclose()
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# Singleton instance, opened in the app lifespan
+_graph_client: Optional[GraphAPIClient] = None
+
+
+async def start_graph_client() -> GraphAPIClient:
+    """Create the shared client (called from the app lifespan)."""
+    global _graph_client
+    if _graph_client is None:
+        _graph_client = GraphAPIClient()
+    return _graph_client
+
+
+async def close_graph_client() -> None:
+    global _graph_client
+    if _graph_client is not None:
+        await _graph_client.aclose()
+        _graph_client = None
+
+
+def get_graph_client() -> GraphAPIClient:
+    """Get the shared Graph API client, creating it on first use outside the app (scripts, workers)."""
+    global _graph_client
+    if _graph_client is None:
+        _graph_client = GraphAPIClient()
+    return _graph_client
@@ -8,7 +8,7 @@ Components:
 -----------
 - RAGConfig: Configuration management for RAG
 - KnowledgeBaseBuilder: Ingests documents into ChromaDB
-- RAGService: Handles runtime query-response flow
+- RAGService: Handles runtime query-response flow (sync and async)
 
 Usage:
 ------
@@ -22,11 +22,14 @@ Usage:
     # Query at runtime
     rag = RAGService(config)
     response = rag.query("What is the main topic?")
+
+    # From async code, via the shared instance
+    response = await get_rag_service().aquery("What is the main topic?")
 """
 
 from .config import RAGConfig
 from .knowledge_base_builder import KnowledgeBaseBuilder, TextChunker
-from .service import RAGService, RAGResponse, RetrievedChunk
+from .service import RAGService, RAGResponse, RetrievedChunk, get_rag_service
 
 __all__ = [
     "RAGConfig",
@@ -35,4 +38,5 @@ __all__ = [
     "RAGService",
     "RAGResponse",
     "RetrievedChunk",
+    "get_rag_service",
 ]
@@ -0,0 +1,94 @@
+"""
+Collection Version
+==================
+
+A counter stored next to the Chroma data that changes whenever the
+knowledge base changes.
+
+`KnowledgeBaseBuilder` bumps it after every write to (or clear of) the
+collection, and `RAGService` checks it before serving a cached answer, so
+answers cached from older content are dropped automatically, even when
+ingestion runs in a different process from the API.
+
+Example Usage:
+--------------
+    from app.services.rag.collection_version import CollectionVersion
+
+    version = CollectionVersion.for_config(config)
+    version.bump()          # after mutating the collection
+    current = version.read()
+"""
+
+import os
+import threading
+import uuid
+from typing import Optional, Tuple
+
+from .config import RAGConfig
+
+
+class CollectionVersion:
+    """
+    File-backed collection version counter.
+
+    Reads are cheap: the file is only re-read when its inode, modification
+    time or size changed since the last read (bumps replace the file).
+
+    Attributes:
+        path: Location of the version file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the version file. Parent directories are created.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int, int]] = None
+        self._value = 0
+
+    @classmethod
+    def for_config(cls, config: RAGConfig) -> "CollectionVersion":
+        """The version file of the configured collection, inside chroma_path."""
+        return cls(os.path.join(config.chroma_path, f"{config.collection_name}.version"))
+
+    def read(self) -> int:
+        """
+        Get the current version.
+
+        Returns:
+            The version number, 0 if the collection was never versioned.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._stat:
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self._value = int(f.read().strip() or 0)
+                except (OSError, ValueError):
+                    # Mid-replace or corrupt; treat as changed
+                    self._value += 1
+                self._stat = signature
+            return self._value
+
+    def bump(self) -> int:
+        """
+        Increment the version, replacing the file atomically.
+
+        Returns:
+            The new version number.
+        """
+        with self._lock:
+            self._stat = None
+        value = self.read() + 1
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(value))
+        os.replace(tmp_path, self.path)
+        return value
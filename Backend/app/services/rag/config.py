@@ -8,13 +8,35 @@ RAG-specific overrides via environment variables.
 
 Environment Variables:
 ----------------------
-- RAG_CHROMA_PATH: Path to ChromaDB storage directory
+- RAG_CHROMA_PATH: Path to ChromaDB storage directory (also holds the other RAG data files)
 - RAG_COLLECTION_NAME: Name of the ChromaDB collection
 - RAG_CHUNK_SIZE: Size of text chunks for ingestion
 - RAG_CHUNK_OVERLAP: Overlap between consecutive chunks
 - RAG_EMBEDDING_MODEL: Gemini embedding model name
 - RAG_TOP_K: Number of chunks to retrieve for context
 - RAG_GEMINI_MODEL: Gemini model for RAG responses
+- RAG_VECTOR_BACKEND: Vector store backend, "chroma" or "numpy"
+- RAG_VECTOR_DTYPE: Matrix dtype of the numpy backend, "float32" or "float16"
+- RAG_QUERY_WORKERS: Threads running vector searches for the async query API
+- RAG_QUERY_CACHE_SIZE: Query embeddings kept in memory (0 disables)
+- RAG_QUERY_CACHE_TTL_SECONDS: Lifetime of a cached query embedding
+- RAG_QUERY_CACHE_PERSIST: Also keep query embeddings in the on-disk embedding cache
+- RAG_ANSWER_CACHE_SIZE: Generated answers kept in memory (0 disables)
+- RAG_ANSWER_CACHE_TTL_SECONDS: Lifetime of a cached answer
+- RAG_HYBRID_SEARCH: Build and use the BM25 keyword index alongside the vectors
+- RAG_HYBRID_CANDIDATES: Candidates taken from each ranking before fusion
+- RAG_RRF_K: Rank constant of reciprocal-rank fusion
+- RAG_KEYWORD_SHORTCUT_COVERAGE: Keyword match coverage that skips the embedding call (0 disables)
+- RAG_EMBEDDING_BATCH_SIZE: Texts per embedding request
+- RAG_EMBEDDING_CONCURRENCY: Embedding requests in flight during ingestion
+- RAG_EMBEDDING_MAX_RETRIES: Retries per embedding request on 429/503
+- RAG_EMBEDDING_RETRY_BASE_DELAY: Base delay in seconds for jittered backoff
+- RAG_CHROMA_BATCH_SIZE: Chunk IDs per duplicate lookup and chunks per upsert
+- RAG_PIPELINE_QUEUE_SIZE: Batches buffered between ingestion pipeline stages
+- RAG_FILE_SEGMENT_CHARS: Characters read from a file at a time during ingestion
+- RAG_INGEST_MANIFEST_PATH: File recording fully ingested files for resuming
+- RAG_EMBEDDING_CACHE_PATH: SQLite file caching embeddings by text hash
+  (set to an empty string to disable)
 - GEMINI_API_KEY: Google Gemini API key (shared with main config)
 """
 
@@ -33,6 +55,12 @@ def _get_default_chroma_path() -> str:
     return str(backend_dir / "data" / "chroma_db")
 
 
+def _get_default_embedding_cache_path() -> str:
+    """Get default embedding cache path relative to Backend directory."""
+    backend_dir = Path(__file__).parent.parent.parent.parent
+    return str(backend_dir / "data" / "embedding_cache.sqlite3")
+
+
 @dataclass
 class RAGConfig:
     """
@@ -66,6 +94,98 @@ class RAGConfig:
         
         gemini_model: Gemini model to use for generation.
                       Default: "gemini-1.5-flash" or RAG_GEMINI_MODEL env var.
+        
+        vector_backend: Where embeddings are stored and searched: "chroma"
+                        (ChromaDB HNSW index) or "numpy" (exact search over a
+                        memory-mapped matrix; needs numpy).
+                        Default: "chroma" or RAG_VECTOR_BACKEND env var.
+        
+        vector_dtype: Storage dtype of the numpy backend's matrix, "float32"
+                      or "float16" (half the memory and disk, but each search
+                      converts rows to float32, so it is several times slower).
+                      Default: "float32" or RAG_VECTOR_DTYPE env var.
+        
+        query_workers: Threads running vector searches for `aquery`/`aretrieve`.
+                       Default: 8 or RAG_QUERY_WORKERS env var.
+        
+        query_cache_size: Query embeddings kept in the in-memory LRU cache.
+                          0 disables it.
+                          Default: 1000 or RAG_QUERY_CACHE_SIZE env var.
+        
+        query_cache_ttl: Seconds a cached query embedding stays valid.
+                         Default: 86400 or RAG_QUERY_CACHE_TTL_SECONDS env var.
+        
+        query_cache_persist: Also store query embeddings in the on-disk
+                             embedding cache (embedding_cache_path), so they
+                             survive restarts.
+                             Default: False or RAG_QUERY_CACHE_PERSIST env var.
+        
+        answer_cache_size: Generated answers kept in memory, keyed by prompt
+                           template, query and retrieved chunk IDs; cleared
+                           when the collection changes. 0 disables it.
+                           Default: 500 or RAG_ANSWER_CACHE_SIZE env var.
+        
+        answer_cache_ttl: Seconds a cached answer stays valid.
+                          Default: 3600 or RAG_ANSWER_CACHE_TTL_SECONDS env var.
+        
+        hybrid_search: Keep a BM25 keyword index next to the vectors
+                       (<chroma_path>/<collection_name>.keywords.sqlite3) and
+                       fuse keyword and vector rankings at query time.
+                       Default: True or RAG_HYBRID_SEARCH env var.
+        
+        hybrid_candidates: Chunks taken from each ranking before fusion
+                           (at least top_k).
+                           Default: 20 or RAG_HYBRID_CANDIDATES env var.
+        
+        rrf_k: Constant k of reciprocal-rank fusion, score = sum(1 / (k + rank));
+               larger values flatten the advantage of top ranks.
+               Default: 60 or RAG_RRF_K env var.
+        
+        keyword_shortcut_coverage: When the query contains identifier-like
+                                   terms (codes, template names, phone
+                                   numbers), the best keyword match contains
+                                   all of them and at least this share of the
+                                   query's term weight, keyword results are
+                                   returned without embedding the query.
+                                   0 disables the shortcut.
+                                   Default: 0.9 or RAG_KEYWORD_SHORTCUT_COVERAGE env var.
+        
+        embedding_batch_size: Texts sent per embed_content request.
+                              Default: 100 or RAG_EMBEDDING_BATCH_SIZE env var.
+        
+        embedding_concurrency: Embedding requests in flight during ingestion.
+                               Default: 4 or RAG_EMBEDDING_CONCURRENCY env var.
+        
+        embedding_max_retries: Retries per request on rate-limit (429) or
+                               overload (503) errors.
+                               Default: 5 or RAG_EMBEDDING_MAX_RETRIES env var.
+        
+        embedding_retry_base_delay: Base delay in seconds for the jittered
+                                    exponential backoff between retries.
+                                    Default: 1.0 or RAG_EMBEDDING_RETRY_BASE_DELAY env var.
+        
+        chroma_batch_size: Chunk IDs per duplicate lookup and chunks per
+                           embed-and-upsert batch during ingestion.
+                           Default: 500 or RAG_CHROMA_BATCH_SIZE env var.
+        
+        pipeline_queue_size: Batches buffered between the read, embed and
+                             write stages of ingestion; with chroma_batch_size
+                             this bounds ingestion memory.
+                             Default: 4 or RAG_PIPELINE_QUEUE_SIZE env var.
+        
+        file_segment_chars: Characters read from a text file at a time, so
+                            huge files never load whole.
+                            Default: 1000000 or RAG_FILE_SEGMENT_CHARS env var.
+        
+        ingest_manifest_path: JSON lines file recording fully ingested files,
+                              used to resume interrupted file ingestion.
+                              Default: <chroma_path>/<collection_name>.ingest_manifest.jsonl
+                              or RAG_INGEST_MANIFEST_PATH env var.
+        
+        embedding_cache_path: SQLite file caching embeddings by (model, text hash),
+                              so unchanged text is never re-embedded. Empty disables it.
+                              Default: Backend/data/embedding_cache.sqlite3 or
+                              RAG_EMBEDDING_CACHE_PATH env var.
     
     Example:
         >>> config = RAGConfig(
@@ -99,6 +219,69 @@ class RAGConfig:
     gemini_model: str = field(
         default_factory=lambda: os.getenv("RAG_GEMINI_MODEL", "gemini-2.0-flash")
     )
+    vector_backend: str = field(
+        default_factory=lambda: os.getenv("RAG_VECTOR_BACKEND", "chroma").lower()
+    )
+    vector_dtype: str = field(
+        default_factory=lambda: os.getenv("RAG_VECTOR_DTYPE", "float32").lower()
+    )
+    query_workers: int = field(
+        default_factory=lambda: int(os.getenv("RAG_QUERY_WORKERS", "8"))
+    )
+    query_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("RAG_QUERY_CACHE_SIZE", "1000"))
+    )
+    query_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("RAG_QUERY_CACHE_TTL_SECONDS", "86400"))
+    )
+    query_cache_persist: bool = field(
+        default_factory=lambda: os.getenv("RAG_QUERY_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+    )
+    answer_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("RAG_ANSWER_CACHE_SIZE", "500"))
+    )
+    answer_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("RAG_ANSWER_CACHE_TTL_SECONDS", "3600"))
+    )
+    hybrid_search: bool = field(
+        default_factory=lambda: os.getenv("RAG_HYBRID_SEARCH", "true").lower() in ("1", "true", "yes")
+    )
+    hybrid_candidates: int = field(
+        default_factory=lambda: int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))
+    )
+    rrf_k: int = field(
+        default_factory=lambda: int(os.getenv("RAG_RRF_K", "60"))
+    )
+    keyword_shortcut_coverage: float = field(
+        default_factory=lambda: float(os.getenv("RAG_KEYWORD_SHORTCUT_COVERAGE", "0.9"))
+    )
+    embedding_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("RAG_EMBEDDING_BATCH_SIZE", "100"))
+    )
+    embedding_concurrency: int = field(
+        default_factory=lambda: int(os.getenv("RAG_EMBEDDING_CONCURRENCY", "4"))
+    )
+    embedding_max_retries: int = field(
+        default_factory=lambda: int(os.getenv("RAG_EMBEDDING_MAX_RETRIES", "5"))
+    )
+    embedding_retry_base_delay: float = field(
+        default_factory=lambda: float(os.getenv("RAG_EMBEDDING_RETRY_BASE_DELAY", "1.0"))
+    )
+    chroma_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("RAG_CHROMA_BATCH_SIZE", "500"))
+    )
+    pipeline_queue_size: int = field(
+        default_factory=lambda: int(os.getenv("RAG_PIPELINE_QUEUE_SIZE", "4"))
+    )
+    file_segment_chars: int = field(
+        default_factory=lambda: int(os.getenv("RAG_FILE_SEGMENT_CHARS", "1000000"))
+    )
+    ingest_manifest_path: Optional[str] = field(
+        default_factory=lambda: os.getenv("RAG_INGEST_MANIFEST_PATH")
+    )
+    embedding_cache_path: Optional[str] = field(
+        default_factory=lambda: os.getenv("RAG_EMBEDDING_CACHE_PATH", _get_default_embedding_cache_path())
+    )
     
     def validate(self) -> None:
         """
@@ -130,6 +313,53 @@ class RAGConfig:
         
         if not self.embedding_model:
             raise ValueError("embedding_model cannot be empty")
+        
+        if self.vector_backend not in ("chroma", "numpy"):
+            raise ValueError(f"vector_backend must be 'chroma' or 'numpy', got {self.vector_backend!r}")
+        
+        if self.vector_dtype not in ("float32", "float16"):
+            raise ValueError(f"vector_dtype must be 'float32' or 'float16', got {self.vector_dtype!r}")
+        
+        if self.query_workers <= 0:
+            raise ValueError(f"query_workers must be positive, got {self.query_workers}")
+        
+        if self.query_cache_size < 0:
+            raise ValueError(f"query_cache_size must be non-negative, got {self.query_cache_size}")
+        
+        if self.answer_cache_size < 0:
+            raise ValueError(f"answer_cache_size must be non-negative, got {self.answer_cache_size}")
+        
+        if self.hybrid_candidates <= 0:
+            raise ValueError(f"hybrid_candidates must be positive, got {self.hybrid_candidates}")
+        
+        if self.rrf_k < 0:
+            raise ValueError(f"rrf_k must be non-negative, got {self.rrf_k}")
+        
+        if not 0 <= self.keyword_shortcut_coverage <= 1:
+            raise ValueError(
+                f"keyword_shortcut_coverage must be between 0 and 1, got {self.keyword_shortcut_coverage}"
+            )
+        
+        if self.embedding_batch_size <= 0:
+            raise ValueError(f"embedding_batch_size must be positive, got {self.embedding_batch_size}")
+        
+        if self.embedding_concurrency <= 0:
+            raise ValueError(f"embedding_concurrency must be positive, got {self.embedding_concurrency}")
+        
+        if self.chroma_batch_size <= 0:
+            raise ValueError(f"chroma_batch_size must be positive, got {self.chroma_batch_size}")
+        
+        if self.pipeline_queue_size <= 0:
+            raise ValueError(f"pipeline_queue_size must be positive, got {self.pipeline_queue_size}")
+        
+        if self.file_segment_chars < self.chunk_size:
+            raise ValueError(
+                f"file_segment_chars ({self.file_segment_chars}) must be at least "
+                f"chunk_size ({self.chunk_size})"
+            )
+        
+        if self.embedding_max_retries < 0:
+            raise ValueError(f"embedding_max_retries must be non-negative, got {self.embedding_max_retries}")
     
     def require_gemini_key(self) -> str:
         """
@@ -0,0 +1,187 @@
+"""
+Embedding Cache
+===============
+
+Persistent, content-addressed cache of embedding vectors.
+
+Vectors are stored in a SQLite file keyed by ``(embedding_model,
+sha256(text))``, so the same text embedded with the same model is only ever
+paid for once: re-ingesting an edited document, or rebuilding the collection
+after ``clear_collection``, only sends genuinely new text to Gemini.
+Vectors are stored as float32 blobs (4 bytes per dimension).
+
+The cache is safe to share between threads; SQLite serializes writers and
+WAL mode lets readers proceed alongside them.
+
+Example Usage:
+--------------
+    from app.services.rag.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache("data/embedding_cache.sqlite3")
+    cached = cache.get_many("gemini-embedding-001", texts)   # None for misses
+    cache.put_many("gemini-embedding-001", new_texts, new_vectors)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Keeps each IN (...) lookup below SQLite's host-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of the text, used as the cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache keyed by model and text hash.
+
+    Attributes:
+        path: Location of the SQLite file.
+        hits: Vectors served from the cache.
+        misses: Lookups that had to be embedded.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: Location of the SQLite file. Parent directories are created.
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            model: Embedding model identifier.
+            texts: Texts to look up.
+
+        Returns:
+            One entry per text: the cached vector, or None on a miss.
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            for i in range(0, len(unique), LOOKUP_BATCH_SIZE):
+                batch = unique[i:i + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _from_blob(blob)
+
+        results = [found.get(key) for key in hashes]
+        hits = sum(1 for vector in results if vector is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up a single cached vector, or None."""
+        return self.get_many(model, [text])[0]
+
+    def put_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]]
+    ) -> None:
+        """
+        Store vectors for texts, replacing any existing entries.
+
+        Args:
+            model: Embedding model identifier.
+            texts: Texts that were embedded.
+            vectors: Their vectors, in the same order.
+        """
+        rows = [
+            (model, text_hash(text), len(vector), _to_blob(vector))
+            for text, vector in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dims, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        """Store a single vector."""
+        self.put_many(model, [text], [vector])
+
+    def count(self, model: Optional[str] = None) -> int:
+        """Number of cached vectors, optionally for one model."""
+        with self._lock:
+            if model is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+                ).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": self.count(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,196 @@
+"""
+Batched Embedding Generation
+============================
+
+Generates Gemini embeddings for many texts at once.
+
+Texts are sent as multi-content ``embed_content`` requests of up to
+``batch_size`` texts each, with up to ``concurrency`` requests in flight on a
+thread pool. Requests rejected with a rate-limit (429) or overload (503)
+error are retried with exponential backoff and full jitter, so concurrent
+workers don't retry in lockstep.
+
+The builder's public API is synchronous, so concurrency comes from threads
+rather than ``client.aio``; the Gemini SDK's sync client is safe to share
+between them.
+
+Example Usage:
+--------------
+    from app.services.rag.embeddings import BatchEmbedder
+
+    embedder = BatchEmbedder(genai_client, "gemini-embedding-001", concurrency=8)
+    vectors = embedder.embed(texts, progress_callback=lambda done, total: print(done, total))
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called with (texts embedded so far, total texts)
+ProgressCallback = Callable[[int, int], None]
+
+# HTTP status codes worth retrying: rate limited, model overloaded
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# Upper bound on a single backoff sleep, in seconds
+MAX_RETRY_DELAY = 60.0
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether an embedding error is a transient rate-limit or overload.
+
+    Args:
+        error: Exception raised by the Gemini client.
+
+    Returns:
+        True if the request should be retried.
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    return "RESOURCE_EXHAUSTED" in str(error)
+
+
+class BatchEmbedder:
+    """
+    Embeds texts with batched, concurrent Gemini requests.
+
+    Attributes:
+        model: Gemini embedding model identifier.
+        batch_size: Maximum texts per ``embed_content`` request.
+        concurrency: Maximum requests in flight.
+        max_retries: Retries per batch on retryable errors.
+        retry_base_delay: Base of the exponential backoff, in seconds.
+        retries: Number of retries performed so far (for monitoring).
+    """
+
+    def __init__(
+        self,
+        genai_client: Any,
+        model: str,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        retry_base_delay: float = 1.0
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            genai_client: Gemini client (anything exposing ``models.embed_content``).
+            model: Gemini embedding model identifier.
+            batch_size: Maximum texts per request.
+            concurrency: Maximum requests in flight.
+            max_retries: Retries per batch on 429/503 before giving up.
+            retry_base_delay: Base delay for exponential backoff, in seconds.
+        """
+        self._client = genai_client
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_base_delay = retry_base_delay
+        self.retries = 0
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter delay for the given retry attempt."""
+        return random.uniform(0, min(MAX_RETRY_DELAY, self.retry_base_delay * (2 ** attempt)))
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """
+        Embed one batch in a single request, retrying transient errors.
+
+        Args:
+            batch: Texts to embed.
+
+        Returns:
+            Embedding vectors in the same order as ``batch``.
+
+        Raises:
+            RuntimeError: If the response doesn't hold one embedding per text.
+            Exception: The client's error once retries are exhausted or if
+                       it isn't retryable.
+        """
+        attempt = 0
+        while True:
+            try:
+                result = self._client.models.embed_content(model=self.model, contents=batch)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"Embedding batch of {len(batch)} rate limited, "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s: {e}"
+                )
+                time.sleep(delay)
+
+        embeddings = result.embeddings or []
+        if len(embeddings) != len(batch):
+            raise RuntimeError(
+                f"Expected {len(batch)} embeddings from {self.model}, got {len(embeddings)}"
+            )
+        return [embedding.values for embedding in embeddings]
+
+    def embed(
+        self,
+        texts: List[str],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts with batched, concurrent requests.
+
+        Args:
+            texts: Texts to embed.
+            progress_callback: Optional callable receiving (embedded, total)
+                               after each batch completes.
+
+        Returns:
+            Embedding vectors in the same order as ``texts``.
+        """
+        total = len(texts)
+        if not total:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        done = 0
+
+        if self.concurrency == 1 or len(batches) == 1:
+            for index, batch in enumerate(batches):
+                results[index] = self._embed_batch(batch)
+                done += len(batch)
+                if progress_callback:
+                    progress_callback(done, total)
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(batches)),
+                thread_name_prefix="rag-embed"
+            )
+            try:
+                pending = {
+                    executor.submit(self._embed_batch, batch): index
+                    for index, batch in enumerate(batches)
+                }
+                while pending:
+                    # Report each batch as it lands rather than when all of them have
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index = pending.pop(future)
+                        # Re-raises the first failed batch; the finally drops queued ones
+                        results[index] = future.result()
+                        done += len(batches[index])
+                        if progress_callback:
+                            progress_callback(done, total)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return [vector for batch in results for vector in batch]
@@ -0,0 +1,124 @@
+"""
+Ingest Manifest
+===============
+
+Records which files have been fully ingested, so an interrupted directory
+ingestion can resume without re-reading them.
+
+A file is recorded only after every one of its chunks has been written to
+the collection, keyed by absolute path together with its size and
+modification time; a file that changed since is ingested again. Entries are
+appended as JSON lines and flushed as they are recorded, so a crash loses at
+most the entries being written.
+
+Example Usage:
+--------------
+    from app.services.rag.ingest_manifest import IngestManifest
+
+    manifest = IngestManifest("data/chroma_db/knowledge_base.ingest_manifest.jsonl")
+    if not manifest.is_complete(path):
+        ...  # ingest, then:
+        manifest.mark_complete([manifest.entry(path)])
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# (size in bytes, modification time in ns)
+FileSignature = Tuple[int, int]
+
+
+class IngestManifest:
+    """
+    Append-only record of fully ingested files.
+
+    Attributes:
+        path: Location of the JSON lines file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load the manifest, creating its directory if needed.
+
+        Args:
+            path: Location of the JSON lines file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: Dict[str, FileSignature] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._files[record["path"]] = (record["size"], record["mtime_ns"])
+                except (ValueError, KeyError):
+                    # Partial line from an interrupted write
+                    continue
+        logger.info(f"Loaded ingest manifest with {len(self._files)} completed files")
+
+    @staticmethod
+    def entry(path: Union[str, Path]) -> Tuple[str, FileSignature]:
+        """
+        Build the manifest entry for a file as it is on disk now.
+
+        Args:
+            path: File path.
+
+        Returns:
+            (absolute path, (size, mtime_ns)) tuple.
+        """
+        stat = os.stat(path)
+        return str(Path(path).absolute()), (stat.st_size, stat.st_mtime_ns)
+
+    def is_complete(self, path: Union[str, Path]) -> bool:
+        """
+        Check whether a file was fully ingested and hasn't changed since.
+
+        Args:
+            path: File path.
+
+        Returns:
+            True if the file can be skipped.
+        """
+        key, signature = self.entry(path)
+        return self._files.get(key) == signature
+
+    def mark_complete(self, entries: Iterable[Tuple[str, FileSignature]]) -> None:
+        """
+        Record files as fully ingested.
+
+        Args:
+            entries: Entries built with `entry` before the file was read.
+        """
+        lines = []
+        for key, (size, mtime_ns) in entries:
+            self._files[key] = (size, mtime_ns)
+            lines.append(json.dumps({"path": key, "size": size, "mtime_ns": mtime_ns}) + "\n")
+        if not lines:
+            return
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Forget all completed files."""
+        with self._lock:
+            self._files.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __len__(self) -> int:
+        return len(self._files)
@@ -0,0 +1,416 @@
+"""
+Keyword Index
+=============
+
+BM25 keyword search over the knowledge base chunks, alongside the dense
+vector search.
+
+Embeddings are good at paraphrases but miss strings that customers type
+verbatim: product codes, template names, phone numbers. This index keeps an
+inverted index (term -> chunks containing it, with term frequencies) in a
+SQLite file next to the Chroma data. `KnowledgeBaseBuilder` writes it
+together with every vector upsert, and chunks are scored with Okapi BM25.
+`RAGService` fuses its ranking with the vector ranking, and answers
+code-like queries from it alone when every distinctive term matches.
+
+Tokens are lowercased words. Compound tokens such as ``SKU-1042-B`` or
+``order_confirmation_v2`` are also indexed by their parts and shorter
+compounds (``sku-1042``, ``confirmation_v2``). Phone-number-like digit
+runs are also indexed as bare digits, so ``+1 (555) 010-4477`` matches
+``15550104477``.
+
+Example Usage:
+--------------
+    from app.services.rag.keyword_index import KeywordIndex
+
+    index = KeywordIndex.for_config(config)
+    index.upsert(ids, documents, metadatas)
+    matches = index.search("price of SKU-1042", k=5)
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from .config import RAGConfig
+
+# Okapi BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Keeps each IN (...) lookup below SQLite's host-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Query terms in more than this fraction of chunks are too common to score,
+# once the index holds at least COMMON_TERM_MIN_CHUNKS chunks
+COMMON_TERM_RATIO = 0.5
+COMMON_TERM_MIN_CHUNKS = 100
+
+# Parts of one compound token combined into sub-compounds, at most
+MAX_COMPOUND_PARTS = 6
+
+MIN_PHONE_DIGITS = 7
+
+_TOKEN_RE = re.compile(r"\w+(?:[-./:@+]\w+)*")
+_PART_RE = re.compile(r"[^\W_]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{5,}\d")
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Args:
+        text: Text to tokenize.
+
+    Returns:
+        Terms in order of appearance, repeated as often as they occur.
+    """
+    text = text.lower()
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        terms.append(token)
+        if token.isalnum():
+            continue
+        parts = [part.span() for part in _PART_RE.finditer(token)][:MAX_COMPOUND_PARTS]
+        if len(parts) > 1:
+            # Every contiguous run of parts: sku, 1042, b, sku-1042, 1042-b
+            for i in range(len(parts)):
+                for j in range(i, len(parts)):
+                    if (i, j) != (0, len(parts) - 1):
+                        terms.append(token[parts[i][0]:parts[j][1]])
+    for match in _PHONE_RE.finditer(text):
+        digits = _NON_DIGIT_RE.sub("", match.group())
+        if len(digits) >= MIN_PHONE_DIGITS and digits != match.group():
+            terms.append(digits)
+    return terms
+
+
+def is_exact_term(term: str) -> bool:
+    """
+    Check whether a term looks like an identifier rather than a word.
+
+    Codes, template names and numbers (terms with a digit or a joining
+    character such as ``-`` or ``_``) are what keyword search finds
+    reliably and embeddings don't.
+    """
+    return len(term) >= 4 and (any(c.isdigit() for c in term) or not term.isalnum())
+
+
+@dataclass
+class KeywordMatch:
+    """
+    A chunk returned by a keyword search.
+
+    Attributes:
+        id: Chunk identifier.
+        document: Chunk text.
+        metadata: Chunk metadata.
+        score: BM25 score (higher is more relevant).
+        coverage: Share of the query's term weight (IDF) found in the
+                  chunk, from 0 to 1, counting only terms that occur
+                  somewhere in the index.
+        exact: True if the query has identifier-like terms and the chunk
+               contains all of them.
+    """
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    score: float
+    coverage: float
+    exact: bool
+
+
+def _matches_filter(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    for key, value in where.items():
+        if isinstance(value, dict):
+            if set(value) != {"$eq"}:
+                raise ValueError("The keyword index only supports equality filters")
+            value = value["$eq"]
+        if key.startswith("$"):
+            raise ValueError("The keyword index only supports equality filters")
+        if metadata.get(key) != value:
+            return False
+    return True
+
+
+class KeywordIndex:
+    """
+    SQLite-backed inverted index with BM25 scoring.
+
+    Safe to share between threads, and between the ingestion process and
+    API workers: SQLite serializes writers and WAL mode lets readers
+    proceed alongside them.
+
+    Attributes:
+        path: Location of the SQLite file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: Location of the SQLite file. Parent directories are created.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                length INTEGER NOT NULL,
+                document TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, chunk_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_config(cls, config: RAGConfig) -> "KeywordIndex":
+        """The keyword index of the configured collection, inside chroma_path."""
+        return cls(os.path.join(config.chroma_path, f"{config.collection_name}.keywords.sqlite3"))
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _add_meta(self, key: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, delta)
+        )
+
+    def _existing(self, ids: Sequence[str]) -> Set[str]:
+        found: Set[str] = set()
+        ids = list(ids)
+        for i in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[i:i + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            found.update(row[0] for row in self._conn.execute(
+                f"SELECT id FROM chunks WHERE id IN ({placeholders})", batch
+            ))
+        return found
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        """
+        Find which of the given chunk IDs are indexed.
+
+        Args:
+            ids: Chunk identifiers to check.
+
+        Returns:
+            The subset of ids that are indexed.
+        """
+        with self._lock:
+            return self._existing(ids)
+
+    def _remove(self, chunk_id: str) -> None:
+        # Postings are found by re-tokenizing the stored text, which spares
+        # an index on postings.chunk_id that would slow down every insert
+        length, document = self._conn.execute(
+            "SELECT length, document FROM chunks WHERE id = ?", (chunk_id,)
+        ).fetchone()
+        terms = [(term,) for term in set(tokenize(document))]
+        self._conn.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", terms)
+        self._conn.executemany(
+            "DELETE FROM postings WHERE term = ? AND chunk_id = ?",
+            [(term, chunk_id) for (term,) in terms]
+        )
+        self._conn.execute("DELETE FROM chunks WHERE id = ?", (chunk_id,))
+        self._add_meta("chunks", -1)
+        self._add_meta("total_length", -length)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]]
+    ) -> None:
+        """
+        Index chunks, replacing any with the same ID.
+
+        Args:
+            ids: Chunk identifiers.
+            documents: Chunk texts, in the same order.
+            metadatas: Chunk metadata, in the same order.
+        """
+        # Later duplicates of an id in the same call win
+        latest = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        with self._lock:
+            for chunk_id in self._existing(list(latest)):
+                self._remove(chunk_id)
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+            postings = []
+            term_counts: Counter = Counter()
+            total_length = 0
+            for chunk_id, i in latest.items():
+                counts = Counter(tokenize(documents[i]))
+                length = sum(counts.values())
+                total_length += length
+                self._conn.execute(
+                    "INSERT INTO chunks (id, length, document, metadata) VALUES (?, ?, ?, ?)",
+                    (chunk_id, length, documents[i], json.dumps(metadatas[i] or {}))
+                )
+                postings.extend((term, chunk_id, tf) for term, tf in counts.items())
+                term_counts.update(counts.keys())
+
+            # In key order, so inserts walk the B-trees instead of jumping around
+            self._conn.executemany(
+                "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)", sorted(postings)
+            )
+            self._conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                sorted(term_counts.items())
+            )
+            self._add_meta("chunks", len(latest))
+            self._add_meta("total_length", total_length)
+            self._conn.commit()
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[KeywordMatch]:
+        """
+        Find the chunks that best match the query's terms.
+
+        Args:
+            query: Query text.
+            k: Maximum number of matches.
+            where: Optional metadata filter (equality only, as ChromaDB where clause).
+
+        Returns:
+            Matches ordered from highest to lowest BM25 score.
+
+        Raises:
+            ValueError: If the filter uses operators other than equality.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or k <= 0:
+            return []
+
+        with self._lock:
+            total_chunks = self._meta("chunks")
+            if total_chunks <= 0:
+                return []
+            avg_length = max(self._meta("total_length"), 1) / total_chunks
+
+            placeholders = ",".join("?" * len(query_terms))
+            dfs = dict(self._conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({placeholders}) AND df > 0",
+                query_terms
+            ).fetchall())
+
+            # Terms in most chunks say little and have the longest postings lists
+            scored_terms = [
+                term for term in query_terms
+                if total_chunks < COMMON_TERM_MIN_CHUNKS
+                or dfs.get(term, 0) <= total_chunks * COMMON_TERM_RATIO
+            ]
+            idf = {
+                term: math.log(1 + (total_chunks - dfs.get(term, 0) + 0.5) / (dfs.get(term, 0) + 0.5))
+                for term in scored_terms
+            }
+            total_weight = sum(idf[term] for term in scored_terms if term in dfs)
+            exact_terms = {term for term in scored_terms if is_exact_term(term)}
+
+            scores: Dict[str, float] = {}
+            matched_weight: Dict[str, float] = {}
+            matched_exact: Counter = Counter()
+            for term in scored_terms:
+                if term not in dfs:
+                    continue
+                for chunk_id, tf, length in self._conn.execute(
+                    "SELECT p.chunk_id, p.tf, c.length FROM postings p "
+                    "JOIN chunks c ON c.id = p.chunk_id WHERE p.term = ?",
+                    (term,)
+                ):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched_weight[chunk_id] = matched_weight.get(chunk_id, 0.0) + idf[term]
+                    if term in exact_terms:
+                        matched_exact[chunk_id] += 1
+
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            candidates = ranked if where else ranked[:k]
+            matches: List[KeywordMatch] = []
+            for i in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+                batch = candidates[i:i + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                stored = {
+                    chunk_id: (document, json.loads(metadata))
+                    for chunk_id, document, metadata in self._conn.execute(
+                        f"SELECT id, document, metadata FROM chunks WHERE id IN ({placeholders})",
+                        batch
+                    )
+                }
+                for chunk_id in batch:
+                    document, metadata = stored[chunk_id]
+                    if where and not _matches_filter(metadata, where):
+                        continue
+                    matches.append(KeywordMatch(
+                        id=chunk_id,
+                        document=document,
+                        metadata=metadata,
+                        score=scores[chunk_id],
+                        coverage=min(matched_weight[chunk_id] / total_weight, 1.0),
+                        exact=bool(exact_terms) and matched_exact[chunk_id] == len(exact_terms)
+                    ))
+                    if len(matches) >= k:
+                        return matches
+            return matches
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            return self._meta("chunks")
+
+    def stats(self) -> Dict[str, Any]:
+        """Size of the index."""
+        with self._lock:
+            terms = self._conn.execute("SELECT COUNT(*) FROM terms WHERE df > 0").fetchone()[0]
+            return {"path": self.path, "chunks": self._meta("chunks"), "terms": terms}
+
+    def clear(self) -> None:
+        """Delete all indexed chunks."""
+        with self._lock:
+            for table in ("meta", "chunks", "terms", "postings"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,13 +2,16 @@
 Knowledge Base Builder
 ======================
 
-Handles document ingestion into ChromaDB for RAG retrieval.
+Handles document ingestion into the vector store (ChromaDB by default) for RAG retrieval.
 
 This module is responsible for:
 - Reading documents from files or accepting raw text
 - Chunking text into manageable pieces
-- Generating embeddings using Gemini API
-- Storing embeddings in ChromaDB with deduplication
+- Generating embeddings using Gemini API (batched, concurrent requests)
+- Reusing embeddings of previously seen text from the on-disk embedding cache
+- Storing embeddings in the vector store with deduplication
+- Indexing chunk terms in the BM25 keyword index for hybrid retrieval
+- Streaming large corpora through a bounded-memory pipeline that can resume
 
 This module can be used independently for batch ingestion tasks.
 
@@ -28,15 +31,17 @@ Example Usage:
     ])
 """
 
+import codecs
 import hashlib
 import logging
 import os
+import queue
 import re
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-import chromadb
-from chromadb.config import Settings
 import google.genai as genai
 
 # Optional: docx support
@@ -46,10 +51,34 @@ try:
 except ImportError:
     DOCX_AVAILABLE = False
 
+from .collection_version import CollectionVersion
 from .config import RAGConfig
+from .embedding_cache import EmbeddingCache
+from .embeddings import BatchEmbedder, ProgressCallback
+from .ingest_manifest import FileSignature, IngestManifest
+from .keyword_index import KeywordIndex
+from .vector_store import VectorStore, create_vector_store
 
 logger = logging.getLogger(__name__)
 
+ManifestEntry = Tuple[str, FileSignature]
+
+# End-of-stream marker passed between pipeline stages
+_END = object()
+
+# How often a blocked pipeline stage checks whether another stage failed
+_QUEUE_POLL_SECONDS = 0.1
+
+
+@dataclass
+class _ChunkBatch:
+    """New chunks on their way through the ingestion pipeline."""
+    chunks: List[str] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    # Files whose last chunk is in this batch or an earlier one
+    completes: List[ManifestEntry] = field(default_factory=list)
+
 
 class TextChunker:
     """
@@ -150,7 +179,7 @@ class TextChunker:
 
 class KnowledgeBaseBuilder:
     """
-    Builds and updates the ChromaDB knowledge base.
+    Builds and updates the knowledge base in the configured vector store.
     
     Handles document ingestion with automatic chunking, embedding generation,
     and deduplication. Supports both file-based and direct text input.
@@ -159,8 +188,11 @@ class KnowledgeBaseBuilder:
         config: RAG configuration object.
         chunker: Text chunking instance.
         genai_client: Gemini client for embeddings.
-        client: ChromaDB client.
-        collection: ChromaDB collection.
+        embedding_cache: On-disk embedding cache, or None if disabled.
+        vector_store: Where chunks and embeddings are stored
+                      (backend chosen by config.vector_backend).
+        keyword_index: BM25 keyword index written alongside the vector
+                       store, or None if config.hybrid_search is off.
     
     Example:
         >>> config = RAGConfig(collection_name="docs")
@@ -190,54 +222,78 @@ class KnowledgeBaseBuilder:
                 "variable or configure it in the main settings."
             )
         self._genai_client = genai.Client(api_key=self.config.gemini_api_key)
+        self.embedder = BatchEmbedder(
+            self._genai_client,
+            self.config.embedding_model,
+            batch_size=self.config.embedding_batch_size,
+            concurrency=self.config.embedding_concurrency,
+            max_retries=self.config.embedding_max_retries,
+            retry_base_delay=self.config.embedding_retry_base_delay
+        )
+        self.embedding_cache = (
+            EmbeddingCache(self.config.embedding_cache_path)
+            if self.config.embedding_cache_path else None
+        )
+        
+        # Created on first file ingestion
+        self._ingest_manifest: Optional[IngestManifest] = None
         
-        # Initialize ChromaDB
-        self._init_chromadb()
+        # Bumped on every write so RAGService drops answers cached from older content
+        self.collection_version = CollectionVersion.for_config(self.config)
+        
+        # Initialize the vector store and the keyword index kept next to it
+        self.vector_store: VectorStore = create_vector_store(self.config)
+        self.keyword_index = (
+            KeywordIndex.for_config(self.config) if self.config.hybrid_search else None
+        )
         
         logger.info(
             f"KnowledgeBaseBuilder initialized: collection={self.config.collection_name}, "
             f"path={self.config.chroma_path}"
         )
     
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _generate_embeddings(
+        self,
+        texts: List[str],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[List[float]]:
         """
         Generate embeddings using Gemini API.
         
+        Texts already in the embedding cache are served from it; the rest go
+        out in batches of ``config.embedding_batch_size`` per request,
+        ``config.embedding_concurrency`` requests at a time, and are cached.
+        
         Args:
             texts: List of text strings to embed.
+            progress_callback: Optional callable receiving (embedded, total).
         
         Returns:
             List of embedding vectors.
         """
-        embeddings = []
-        # Process in batches (Gemini has limits)
-        batch_size = 100
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            for text in batch:
-                result = self._genai_client.models.embed_content(
-                    model=self.config.embedding_model,
-                    contents=text
-                )
-                embeddings.append(result.embeddings[0].values)
-        return embeddings
-    
-    def _init_chromadb(self) -> None:
-        """Initialize ChromaDB client and collection."""
-        # Ensure storage directory exists
-        os.makedirs(self.config.chroma_path, exist_ok=True)
-        
-        # Initialize persistent client
-        self.client = chromadb.PersistentClient(
-            path=self.config.chroma_path,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        if self.embedding_cache is None:
+            return self.embedder.embed(texts, progress_callback=progress_callback)
+        
+        model = self.config.embedding_model
+        embeddings = self.embedding_cache.get_many(model, texts)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        cached = len(texts) - len(missing)
+        if cached:
+            logger.info(f"Reusing {cached} cached embeddings, embedding {len(missing)} new chunks")
+            if progress_callback:
+                progress_callback(cached, len(texts))
+        
+        if missing:
+            new_texts = [texts[i] for i in missing]
+            report = None
+            if progress_callback:
+                report = lambda done, _total: progress_callback(cached + done, len(texts))
+            new_vectors = self.embedder.embed(new_texts, progress_callback=report)
+            self.embedding_cache.put_many(model, new_texts, new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                embeddings[i] = vector
         
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=self.config.collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        return embeddings
     
     def _read_docx(self, file_path: Path) -> str:
         """
@@ -281,34 +337,255 @@ class KnowledgeBaseBuilder:
         content = f"{source}:{text}"
         return hashlib.sha256(content.encode()).hexdigest()[:16]
     
-    def _chunk_exists(self, chunk_id: str) -> bool:
+    def _existing_ids(self, chunk_ids: List[str]) -> Set[str]:
         """
-        Check if a chunk already exists in the collection.
+        Find which chunk IDs already exist in the collection.
+        
+        Looks IDs up with one vector store lookup per
+        ``config.chroma_batch_size`` IDs instead of one per chunk.
         
         Args:
-            chunk_id: The chunk identifier.
+            chunk_ids: The chunk identifiers to check.
         
         Returns:
-            True if the chunk exists, False otherwise.
+            The subset of chunk_ids present in the collection.
         """
-        try:
-            result = self.collection.get(ids=[chunk_id])
-            return len(result['ids']) > 0
-        except Exception:
+        existing: Set[str] = set()
+        batch_size = self.config.chroma_batch_size
+        for i in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[i:i + batch_size]
+            try:
+                existing.update(self.vector_store.existing_ids(batch))
+            except Exception as e:
+                # Treat as new; the upsert overwrites rather than duplicates
+                logger.warning(f"Duplicate lookup failed for {len(batch)} chunks: {e}")
+        return existing
+    
+    def _iter_batches(
+        self,
+        documents: Iterable[Tuple[Dict[str, Any], Optional[ManifestEntry]]],
+        skip_duplicates: bool,
+        stats: Dict[str, int]
+    ) -> Iterator[_ChunkBatch]:
+        """
+        Chunk documents and group the new chunks into write batches.
+        
+        Existing chunks are detected with one batched lookup per document,
+        and chunks repeated within the same run are skipped in memory.
+        Existing chunks missing from the keyword index (ingested before it
+        was enabled) are indexed here, without embedding them again.
+        
+        Args:
+            documents: (document, manifest entry) pairs. The entry is set on
+                       the last document of a file and is passed on with the
+                       batch that holds (or follows) that file's last chunk.
+            skip_duplicates: If True, skip chunks that already exist.
+            stats: Counters updated in place ('skipped', 'total_chunks').
+        
+        Yields:
+            Batches of at most ``config.chroma_batch_size`` chunks.
+        """
+        batch_size = self.config.chroma_batch_size
+        # Chunk IDs queued in this run
+        seen: Set[str] = set()
+        batch = _ChunkBatch()
+        
+        for doc, completes in documents:
+            doc_id = doc.get("id", "unknown")
+            text = doc.get("text", "")
+            base_metadata = doc.get("metadata", {})
+            
+            if text.strip():
+                # Chunk the document
+                chunks = self.chunker.chunk(text)
+                stats["total_chunks"] += len(chunks)
+                chunk_ids = [self._generate_chunk_id(chunk, doc_id) for chunk in chunks]
+                
+                new_ids = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id not in seen]
+                existing = self._existing_ids(new_ids) if skip_duplicates else set()
+                unindexed = set()
+                if existing and self.keyword_index is not None:
+                    unindexed = existing - self.keyword_index.existing_ids(list(existing))
+                backfill = _ChunkBatch()
+                
+                for i, (chunk, chunk_id) in enumerate(zip(chunks, chunk_ids)):
+                    # Prepare metadata
+                    metadata = {
+                        **base_metadata,
+                        "source": doc_id,
+                        "chunk_index": i,
+                        "total_chunks": len(chunks)
+                    }
+                    
+                    if chunk_id in seen or chunk_id in existing:
+                        stats["skipped"] += 1
+                        if chunk_id in unindexed:
+                            # Already embedded; only the keyword index lacks it
+                            unindexed.discard(chunk_id)
+                            backfill.chunks.append(chunk)
+                            backfill.ids.append(chunk_id)
+                            backfill.metadatas.append(metadata)
+                        continue
+                    seen.add(chunk_id)
+                    
+                    batch.chunks.append(chunk)
+                    batch.ids.append(chunk_id)
+                    batch.metadatas.append(metadata)
+                    
+                    if len(batch.chunks) >= batch_size:
+                        yield batch
+                        batch = _ChunkBatch()
+                
+                if backfill.ids:
+                    self.keyword_index.upsert(backfill.ids, backfill.chunks, backfill.metadatas)
+                    self.collection_version.bump()
+            
+            if completes is not None:
+                batch.completes.append(completes)
+        
+        if batch.chunks or batch.completes:
+            yield batch
+    
+    def _run_pipeline(
+        self,
+        documents: Iterable[Tuple[Dict[str, Any], Optional[ManifestEntry]]],
+        skip_duplicates: bool,
+        progress_callback: Optional[ProgressCallback],
+        manifest: Optional[IngestManifest],
+        stats: Dict[str, int]
+    ) -> Dict[str, int]:
+        """
+        Run documents through the chunk -> embed -> write pipeline.
+        
+        A reader thread reads and chunks documents, the calling thread
+        embeds batches, and a writer thread upserts them into the vector
+        store. The stages are joined by queues of
+        ``config.pipeline_queue_size`` batches, so memory stays bounded
+        however large the corpus is. If any stage
+        fails (or the caller is interrupted) the others stop and the error
+        is raised here; everything written so far stays written.
+        
+        Args:
+            documents: (document, manifest entry) pairs, consumed lazily.
+            skip_duplicates: If True, skip chunks that already exist.
+            progress_callback: Optional callable receiving (embedded, queued).
+            manifest: Where completed files are recorded, if resuming is enabled.
+            stats: Counters to update in place.
+        
+        Returns:
+            The stats dict.
+        """
+        stats.update({"added": 0, "skipped": 0, "total_chunks": 0})
+        chunk_queue: "queue.Queue" = queue.Queue(maxsize=self.config.pipeline_queue_size)
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.config.pipeline_queue_size)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        
+        def put(q: "queue.Queue", item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_QUEUE_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
             return False
+        
+        def get(q: "queue.Queue") -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=_QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return _END
+        
+        def fail(error: BaseException) -> None:
+            errors.append(error)
+            stop.set()
+        
+        def read() -> None:
+            try:
+                for batch in self._iter_batches(documents, skip_duplicates, stats):
+                    stats["queued"] += len(batch.chunks)
+                    if not put(chunk_queue, batch):
+                        return
+                put(chunk_queue, _END)
+            except BaseException as e:
+                fail(e)
+        
+        def write() -> None:
+            try:
+                while True:
+                    item = get(write_queue)
+                    if item is _END:
+                        return
+                    batch, embeddings = item
+                    if batch.chunks:
+                        self.vector_store.upsert(
+                            ids=batch.ids,
+                            embeddings=embeddings,
+                            documents=batch.chunks,
+                            metadatas=batch.metadatas
+                        )
+                        if self.keyword_index is not None:
+                            self.keyword_index.upsert(batch.ids, batch.chunks, batch.metadatas)
+                        self.collection_version.bump()
+                        stats["added"] += len(batch.chunks)
+                        logger.info(f"Added {stats['added']} chunks to collection")
+                    if manifest is not None:
+                        manifest.mark_complete(batch.completes)
+            except BaseException as e:
+                fail(e)
+        
+        reader = threading.Thread(target=read, name="rag-ingest-read", daemon=True)
+        writer = threading.Thread(target=write, name="rag-ingest-write", daemon=True)
+        reader.start()
+        writer.start()
+        embedded = 0
+        try:
+            while True:
+                batch = get(chunk_queue)
+                if batch is _END:
+                    put(write_queue, _END)
+                    break
+                report = None
+                if progress_callback:
+                    report = lambda done, _total: progress_callback(embedded + done, stats["queued"])
+                embeddings = self._generate_embeddings(batch.chunks, progress_callback=report)
+                embedded += len(batch.chunks)
+                if not put(write_queue, (batch, embeddings)):
+                    break
+        except BaseException as e:
+            fail(e)
+        finally:
+            writer.join()
+            stop.set()
+            reader.join()
+        
+        if errors:
+            raise errors[0]
+        return stats
     
     def ingest_texts(
         self,
-        documents: List[Dict[str, str]],
-        skip_duplicates: bool = True
+        documents: Iterable[Dict[str, str]],
+        skip_duplicates: bool = True,
+        progress_callback: Optional[ProgressCallback] = None
     ) -> Dict[str, int]:
         """
         Ingest raw text documents into the knowledge base.
         
+        Documents are consumed lazily and streamed through the ingestion
+        pipeline; new chunks are embedded and upserted in batches of
+        ``config.chroma_batch_size``, so memory stays bounded by the batch
+        rather than the corpus.
+        
         Args:
-            documents: List of dicts with 'id' and 'text' keys.
+            documents: Iterable of dicts with 'id' and 'text' keys.
                        Optional 'metadata' key for additional metadata.
             skip_duplicates: If True, skip chunks that already exist.
+            progress_callback: Optional callable receiving (embedded, queued)
+                               chunk counts as embedding batches complete;
+                               queued grows as documents are read.
         
         Returns:
             Dict with 'added', 'skipped', and 'total_chunks' counts.
@@ -319,75 +596,168 @@ class KnowledgeBaseBuilder:
             ...     {"id": "doc2", "text": "More content...", "metadata": {"author": "John"}}
             ... ])
         """
-        stats = {"added": 0, "skipped": 0, "total_chunks": 0}
+        stats = {"queued": 0}
+        self._run_pipeline(
+            ((doc, None) for doc in documents), skip_duplicates, progress_callback, None, stats
+        )
+        stats.pop("queued")
+        return stats
+    
+    def _read_text_segments(self, path: Path, encoding: str) -> Iterator[str]:
+        """
+        Read a text file in segments of about ``config.file_segment_chars``.
         
-        all_chunks = []
-        all_ids = []
-        all_metadatas = []
+        Segments end at the last paragraph break (or whitespace) so chunks
+        don't straddle them; the remainder carries into the next segment.
         
-        for doc in documents:
-            doc_id = doc.get("id", "unknown")
-            text = doc.get("text", "")
-            base_metadata = doc.get("metadata", {})
-            
-            if not text.strip():
+        Args:
+            path: File to read.
+            encoding: Text encoding.
+        
+        Yields:
+            Consecutive segments of the file's text.
+        """
+        size = self.config.file_segment_chars
+        carry = ""
+        with open(path, encoding=encoding) as f:
+            while True:
+                block = f.read(size)
+                if not block:
+                    break
+                text = carry + block
+                cut = text.rfind("\n\n", len(text) // 2)
+                if cut < 0:
+                    cut = max(text.rfind(" ", len(text) // 2), text.rfind("\n", len(text) // 2))
+                if cut < 0:
+                    cut = len(text)
+                carry = text[cut:]
+                if text[:cut].strip():
+                    yield text[:cut]
+        if carry.strip():
+            yield carry
+    
+    def _read_file_segments(self, path: Path) -> Iterator[str]:
+        """
+        Read a file's text, segment by segment.
+        
+        Args:
+            path: File to read.
+        
+        Yields:
+            Text segments (a single one for .docx files).
+        
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            ValueError: If the file cannot be read.
+        """
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        
+        # Handle .docx files
+        if path.suffix.lower() == ".docx":
+            yield self._read_docx(path)
+            return
+        
+        try:
+            # Settle the encoding before any segment is yielded, so a
+            # non-UTF-8 byte late in the file can't restart it mid-stream
+            encoding = self._detect_encoding(path)
+            yield from self._read_text_segments(path, encoding)
+        except OSError as e:
+            raise ValueError(f"Could not read file {path}: {e}")
+    
+    def _detect_encoding(self, path: Path) -> str:
+        """
+        Return "utf-8" if the whole file decodes as UTF-8, else "latin-1".
+        
+        The probe decodes block by block, so it runs in constant memory.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with open(path, "rb") as f:
+            try:
+                while True:
+                    block = f.read(self.config.file_segment_chars)
+                    if not block:
+                        decoder.decode(b"", final=True)
+                        return "utf-8"
+                    decoder.decode(block)
+            except UnicodeDecodeError:
+                return "latin-1"
+    
+    def _iter_file_documents(
+        self,
+        file_paths: Iterable[Union[str, Path]],
+        manifest: Optional[IngestManifest],
+        stats: Dict[str, int]
+    ) -> Iterator[Tuple[Dict[str, Any], Optional[ManifestEntry]]]:
+        """
+        Turn file paths into (document, manifest entry) pairs, one per segment.
+        
+        Files the manifest records as complete and unchanged are skipped
+        without being read.
+        """
+        for file_path in file_paths:
+            path = Path(file_path)
+            if manifest is not None and path.exists() and manifest.is_complete(path):
+                stats["files_skipped"] += 1
                 continue
             
-            # Chunk the document
-            chunks = self.chunker.chunk(text)
-            stats["total_chunks"] += len(chunks)
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = self._generate_chunk_id(chunk, doc_id)
-                
-                if skip_duplicates and self._chunk_exists(chunk_id):
-                    stats["skipped"] += 1
-                    continue
-                
-                # Prepare metadata
-                metadata = {
-                    **base_metadata,
-                    "source": doc_id,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
+            entry = IngestManifest.entry(path) if path.exists() else None
+            stats["files"] += 1
+            previous = None
+            for segment_index, text in enumerate(self._read_file_segments(path)):
+                if previous is not None:
+                    yield previous, None
+                previous = {
+                    "id": str(path.absolute()),
+                    "text": text,
+                    "metadata": {
+                        "filename": path.name,
+                        "extension": path.suffix,
+                        "segment": segment_index
+                    }
                 }
-                
-                all_chunks.append(chunk)
-                all_ids.append(chunk_id)
-                all_metadatas.append(metadata)
-        
-        # Batch add to collection
-        if all_chunks:
-            logger.info(f"Generating embeddings for {len(all_chunks)} chunks using Gemini...")
-            embeddings = self._generate_embeddings(all_chunks)
-            
-            self.collection.add(
-                documents=all_chunks,
-                embeddings=embeddings,
-                ids=all_ids,
-                metadatas=all_metadatas
+            # The file's last segment carries its manifest entry
+            yield previous or {"id": str(path.absolute()), "text": ""}, entry
+    
+    def _manifest(self) -> IngestManifest:
+        """The ingest manifest for this collection."""
+        if self._ingest_manifest is None:
+            path = self.config.ingest_manifest_path or os.path.join(
+                self.config.chroma_path, f"{self.config.collection_name}.ingest_manifest.jsonl"
             )
-            stats["added"] = len(all_chunks)
-            logger.info(f"Added {stats['added']} chunks to collection")
-        
-        return stats
+            self._ingest_manifest = IngestManifest(path)
+        return self._ingest_manifest
     
     def ingest_files(
         self,
-        file_paths: List[Union[str, Path]],
-        skip_duplicates: bool = True
+        file_paths: Iterable[Union[str, Path]],
+        skip_duplicates: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        resume: bool = True
     ) -> Dict[str, int]:
         """
         Ingest documents from file paths.
         
         Supports plain text files (.txt, .md, .rst) and Word documents (.docx).
+        Files are streamed through the ingestion pipeline one segment at a
+        time, so large files and large file lists ingest in bounded memory.
+        Each segment is chunked on its own: a chunk's ``chunk_index`` and
+        ``total_chunks`` metadata count within its ``segment``, not the
+        whole file. Text files that aren't valid UTF-8 are read as latin-1.
+        Each file is recorded in the ingest manifest once all of its chunks
+        are written; with ``resume`` an interrupted run picks up where it
+        stopped, skipping recorded files that haven't changed.
         
         Args:
-            file_paths: List of file paths to ingest.
+            file_paths: File paths to ingest (any iterable, consumed lazily).
             skip_duplicates: If True, skip chunks that already exist.
+            progress_callback: Optional callable receiving (embedded, queued).
+            resume: If True, skip files already fully ingested.
         
         Returns:
-            Dict with ingestion statistics.
+            Dict with ingestion statistics, including 'files' read and
+            'files_skipped' by resume.
         
         Raises:
             FileNotFoundError: If a file doesn't exist.
@@ -396,54 +766,45 @@ class KnowledgeBaseBuilder:
         Example:
             >>> builder.ingest_files(["docs/readme.txt", "docs/guide.docx"])
         """
-        documents = []
-        
-        for file_path in file_paths:
-            path = Path(file_path)
-            
-            if not path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-            
-            # Handle .docx files
-            if path.suffix.lower() == ".docx":
-                text = self._read_docx(path)
-            else:
-                try:
-                    text = path.read_text(encoding="utf-8")
-                except UnicodeDecodeError:
-                    # Try with latin-1 as fallback
-                    text = path.read_text(encoding="latin-1")
-                except Exception as e:
-                    raise ValueError(f"Could not read file {file_path}: {e}")
-            
-            documents.append({
-                "id": str(path.absolute()),
-                "text": text,
-                "metadata": {
-                    "filename": path.name,
-                    "extension": path.suffix
-                }
-            })
-        
-        logger.info(f"Ingesting {len(documents)} files...")
-        return self.ingest_texts(documents, skip_duplicates=skip_duplicates)
+        manifest = self._manifest()
+        stats = {"queued": 0, "files": 0, "files_skipped": 0}
+        logger.info("Ingesting files...")
+        self._run_pipeline(
+            self._iter_file_documents(file_paths, manifest if resume else None, stats),
+            skip_duplicates,
+            progress_callback,
+            manifest,
+            stats
+        )
+        stats.pop("queued")
+        logger.info(
+            f"Ingested {stats['files']} files ({stats['files_skipped']} already complete)"
+        )
+        return stats
     
     def ingest_directory(
         self,
         directory: Union[str, Path],
         extensions: Optional[List[str]] = None,
         recursive: bool = True,
-        skip_duplicates: bool = True
+        skip_duplicates: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        resume: bool = True
     ) -> Dict[str, int]:
         """
         Ingest all matching files from a directory.
         
+        The directory is walked lazily and streamed through the ingestion
+        pipeline, so trees of any size ingest in bounded memory.
+        
         Args:
             directory: Path to the directory.
             extensions: List of file extensions to include (e.g., [".txt", ".md"]).
                        If None, includes common text file extensions.
             recursive: If True, search subdirectories.
             skip_duplicates: If True, skip chunks that already exist.
+            progress_callback: Optional callable receiving (embedded, queued).
+            resume: If True, skip files already fully ingested.
         
         Returns:
             Dict with ingestion statistics.
@@ -463,31 +824,37 @@ class KnowledgeBaseBuilder:
         
         # Find matching files
         pattern = "**/*" if recursive else "*"
-        file_paths = [
+        file_paths = (
             f for f in directory.glob(pattern)
             if f.is_file() and f.suffix.lower() in extensions
-        ]
+        )
         
-        if not file_paths:
+        logger.info(f"Ingesting matching files from {directory}")
+        stats = self.ingest_files(
+            file_paths,
+            skip_duplicates=skip_duplicates,
+            progress_callback=progress_callback,
+            resume=resume
+        )
+        if not stats["files"] and not stats["files_skipped"]:
             logger.warning(f"No matching files found in {directory}")
-            return {"added": 0, "skipped": 0, "total_chunks": 0}
-        
-        logger.info(f"Found {len(file_paths)} files to ingest from {directory}")
-        return self.ingest_files(file_paths, skip_duplicates=skip_duplicates)
+        return stats
     
     def clear_collection(self) -> None:
         """
         Delete all documents from the collection.
         
+        Also empties the keyword index and forgets the files recorded in
+        the ingest manifest, so a following ingestion reads them again.
+        
         Warning: This operation is irreversible.
         """
         logger.warning(f"Clearing collection: {self.config.collection_name}")
-        # Delete and recreate the collection
-        self.client.delete_collection(self.config.collection_name)
-        self.collection = self.client.get_or_create_collection(
-            name=self.config.collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        self._manifest().clear()
+        self.vector_store.clear()
+        # Even if hybrid search is off now, an index left from before must not outlive its chunks
+        (self.keyword_index or KeywordIndex.for_config(self.config)).clear()
+        self.collection_version.bump()
         logger.info("Collection cleared")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -499,9 +866,14 @@ class KnowledgeBaseBuilder:
         """
         return {
             "collection_name": self.config.collection_name,
-            "total_documents": self.collection.count(),
+            "total_documents": self.vector_store.count(),
+            "vector_backend": self.config.vector_backend,
             "chroma_path": self.config.chroma_path,
             "embedding_model": self.config.embedding_model,
             "chunk_size": self.config.chunk_size,
-            "chunk_overlap": self.config.chunk_overlap
+            "chunk_overlap": self.config.chunk_overlap,
+            "embedding_retries": self.embedder.retries,
+            "collection_version": self.collection_version.read(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "keyword_index": self.keyword_index.stats() if self.keyword_index else None
         }
@@ -5,13 +5,32 @@ RAG Service Module
 Provides the runtime RAG (Retrieval Augmented Generation) service.
 
 This module handles:
-- Loading existing ChromaDB collections
+- Loading the vector store (ChromaDB collection or NumPy index)
 - Converting queries to embeddings
-- Retrieving relevant context chunks
+- Retrieving relevant context chunks (vector and BM25 keyword search, fused)
 - Constructing grounded prompts
 - Generating responses via Gemini API
 
 The service is stateless and uses dependency injection for configuration.
+Besides the blocking API (`query`, `retrieve`) it offers an async one
+(`aquery`, `aretrieve`) for use inside the event loop: Gemini calls go
+through the SDK's async client and vector searches run on a dedicated
+thread pool, so a route can serve many concurrent questions per worker.
+
+Retrieval is hybrid when ``hybrid_search`` is on: the BM25 keyword index
+built next to the vectors is searched first, and its ranking is fused with
+the vector ranking by reciprocal-rank fusion, so product codes, template
+names and phone numbers typed verbatim are found even when their
+embeddings aren't close. When the query contains such identifiers and one
+chunk matches all of them, the keyword results are returned directly and
+the embedding call is skipped.
+
+Query embeddings are cached in memory (LRU with TTL) keyed by embedding
+model and normalized query, and optionally in the on-disk embedding cache
+so they survive restarts; repeated questions skip the embedding call.
+Answers are cached by prompt template, query and the IDs of the retrieved
+chunks, and dropped whenever the collection version changes (the builder
+bumps it on every write), so popular questions skip the LLM call too.
 
 Example Usage:
 --------------
@@ -21,21 +40,38 @@ Example Usage:
     rag = RAGService(config)
     response = rag.query("What is the main topic of the documents?")
     print(response.answer)
+    
+    # From async code (e.g. a FastAPI route)
+    response = await get_rag_service().aquery("How do I verify my number?")
 """
 
+import asyncio
+import hashlib
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import chromadb
-from chromadb.config import Settings
 import google.genai as genai
 
+from app.core.cache import TTLCache
+
+from .collection_version import CollectionVersion
 from .config import RAGConfig
+from .embedding_cache import EmbeddingCache
+from .keyword_index import KeywordIndex, KeywordMatch
+from .vector_store import VectorStore, create_vector_store
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share an embedding."""
+    return " ".join(query.split()).casefold()
+
+
 @dataclass
 class RetrievedChunk:
     """
@@ -44,13 +80,18 @@ class RetrievedChunk:
     Attributes:
         text: The chunk text content.
         score: Similarity score (lower is more similar for cosine distance).
+               Chunks found only by keyword search score 1 - their keyword
+               coverage (0 when every query term matched).
         metadata: Additional metadata about the chunk.
         chunk_id: Unique identifier for the chunk.
+        source: "vector" when score is a vector distance, "keyword" when
+                the chunk was found only by keyword search.
     """
     text: str
     score: float
     metadata: Dict[str, Any]
     chunk_id: str
+    source: str = "vector"
 
 
 @dataclass
@@ -78,7 +119,7 @@ class RAGService:
     
     Handles the full RAG pipeline:
     1. Query embedding generation
-    2. Relevant chunk retrieval from ChromaDB
+    2. Relevant chunk retrieval from the vector store
     3. Context-grounded prompt construction
     4. Response generation via Gemini API
     
@@ -155,8 +196,39 @@ RESPONSE:"""
         # Set custom system prompt if provided
         self.system_prompt = system_prompt or self.DEFAULT_SYSTEM_PROMPT
         
-        # Lazy-load ChromaDB collection
-        self._collection = None
+        # Lazy-load the vector store
+        self._vector_store: Optional[VectorStore] = None
+        self._vector_store_lock = threading.Lock()
+        
+        # BM25 index written by KnowledgeBaseBuilder next to the vectors
+        self.keyword_index: Optional[KeywordIndex] = (
+            KeywordIndex.for_config(self.config) if self.config.hybrid_search else None
+        )
+        self.keyword_shortcuts = 0
+        self._keyword_stats_lock = threading.Lock()
+        
+        # Query embeddings by (model, normalized query); optionally backed by disk
+        self._query_embeddings: TTLCache[List[float]] = TTLCache(
+            self.config.query_cache_size, self.config.query_cache_ttl
+        )
+        self._query_cache_lock = threading.Lock()
+        self._persistent_embeddings: Optional[EmbeddingCache] = None
+        if self.config.query_cache_persist and self.config.embedding_cache_path:
+            self._persistent_embeddings = EmbeddingCache(self.config.embedding_cache_path)
+        
+        # Answers by (template, query, retrieved chunk IDs), valid for one collection version
+        self._answers: TTLCache[str] = TTLCache(
+            self.config.answer_cache_size, self.config.answer_cache_ttl
+        )
+        self._answer_cache_lock = threading.Lock()
+        self._answers_version = 0
+        self.collection_version = CollectionVersion.for_config(self.config)
+        
+        # Vector searches for the async API run here, off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.query_workers,
+            thread_name_prefix="rag-query"
+        )
         
         logger.info(
             f"RAGService initialized: collection={self.config.collection_name}, "
@@ -164,34 +236,100 @@ RESPONSE:"""
         )
     
     @property
-    def collection(self):
-        """Lazy-load the ChromaDB collection."""
-        if self._collection is None:
-            client = chromadb.PersistentClient(
-                path=self.config.chroma_path,
-                settings=Settings(anonymized_telemetry=False)
-            )
-            self._collection = client.get_or_create_collection(
-                name=self.config.collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
-        return self._collection
+    def vector_store(self) -> VectorStore:
+        """Lazy-load the vector store (safe to call from several threads)."""
+        if self._vector_store is None:
+            with self._vector_store_lock:
+                if self._vector_store is None:
+                    self._vector_store = create_vector_store(self.config)
+        return self._vector_store
+    
+    async def aload_vector_store(self) -> VectorStore:
+        """
+        Load the vector store on the query thread pool, if not loaded yet.
+        
+        Raises:
+            ImportError: If the configured backend's package isn't installed.
+            ValueError: If the store can't be opened with this configuration.
+        """
+        if self._vector_store is not None:
+            return self._vector_store
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.vector_store)
+    
+    def _cached_query_embedding(self, text: str) -> Optional[List[float]]:
+        """
+        Look up a normalized query's embedding in memory, then on disk.
+        
+        Args:
+            text: The normalized query.
+        
+        Returns:
+            The cached embedding, or None on a miss.
+        """
+        key = (self.config.embedding_model, text)
+        with self._query_cache_lock:
+            vector = self._query_embeddings.get(key)
+        if vector is None and self._persistent_embeddings is not None:
+            vector = self._persistent_embeddings.get(self.config.embedding_model, text)
+            if vector is not None:
+                with self._query_cache_lock:
+                    self._query_embeddings.set(key, vector)
+        return vector
+    
+    def _store_query_embedding(self, text: str, vector: List[float]) -> None:
+        """Cache a normalized query's embedding in memory and, if enabled, on disk."""
+        with self._query_cache_lock:
+            self._query_embeddings.set((self.config.embedding_model, text), vector)
+        if self._persistent_embeddings is not None:
+            self._persistent_embeddings.put(self.config.embedding_model, text, vector)
     
     def _embed_query(self, query: str) -> List[float]:
         """
         Generate embedding for a query using Gemini API.
         
+        The normalized query is embedded, and served from the query
+        embedding cache when it was embedded before.
+        
         Args:
             query: The query text.
         
         Returns:
             Embedding vector as a list of floats.
         """
-        result = self._genai_client.models.embed_content(
-            model=self.config.embedding_model,
-            contents=query
-        )
-        return result.embeddings[0].values
+        text = normalize_query(query)
+        vector = self._cached_query_embedding(text)
+        if vector is None:
+            result = self._genai_client.models.embed_content(
+                model=self.config.embedding_model,
+                contents=text
+            )
+            vector = result.embeddings[0].values
+            self._store_query_embedding(text, vector)
+        return vector
+    
+    async def _aembed_query(self, query: str) -> List[float]:
+        """
+        Generate embedding for a query using the async Gemini client.
+        
+        Uses the same query embedding cache as `_embed_query`.
+        
+        Args:
+            query: The query text.
+        
+        Returns:
+            Embedding vector as a list of floats.
+        """
+        text = normalize_query(query)
+        vector = self._cached_query_embedding(text)
+        if vector is None:
+            result = await self._genai_client.aio.models.embed_content(
+                model=self.config.embedding_model,
+                contents=text
+            )
+            vector = result.embeddings[0].values
+            self._store_query_embedding(text, vector)
+        return vector
     
     def retrieve(
         self,
@@ -202,6 +340,11 @@ RESPONSE:"""
         """
         Retrieve relevant chunks for a query.
         
+        With hybrid search on, keyword matches are fused with the vector
+        matches. When they match the query's identifiers (see
+        `_is_keyword_shortcut`), the chunks containing all of them are
+        returned alone and the query is never embedded.
+        
         Args:
             query: The query text.
             top_k: Number of chunks to retrieve. Uses config default if not provided.
@@ -217,37 +360,219 @@ RESPONSE:"""
             ...     print(f"Text: {chunk.text[:100]}...")
         """
         k = top_k or self.config.top_k
+        keyword_matches = self._keyword_search(query, k, filter_metadata)
+        
+        if self._is_keyword_shortcut(keyword_matches):
+            chunks = [self._keyword_chunk(match) for match in keyword_matches[:k] if match.exact]
+        else:
+            # Generate query embedding
+            query_embedding = self._embed_query(query)
+            
+            # Execute query, with extra candidates when there is a keyword ranking to fuse
+            candidates = max(k, self.config.hybrid_candidates) if keyword_matches else k
+            chunks = self._search(query_embedding, candidates, filter_metadata)
+            chunks = self._fuse(chunks, keyword_matches, k)
+        
+        logger.debug(f"Retrieved {len(chunks)} chunks for query: {query[:50]}...")
+        return chunks
+    
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[RetrievedChunk]:
+        """
+        Retrieve relevant chunks for a query without blocking the event loop.
         
-        # Generate query embedding
-        query_embedding = self._embed_query(query)
+        The query is embedded with the async Gemini client, and the keyword
+        and vector searches run on the service's query thread pool. Results
+        are the same as `retrieve`.
         
-        # Build query parameters
-        query_params = {
-            "query_embeddings": [query_embedding],
-            "n_results": k,
-            "include": ["documents", "metadatas", "distances"]
-        }
+        Args:
+            query: The query text.
+            top_k: Number of chunks to retrieve. Uses config default if not provided.
+            filter_metadata: Optional metadata filter for ChromaDB where clause.
         
-        if filter_metadata:
-            query_params["where"] = filter_metadata
+        Returns:
+            List of RetrievedChunk objects ordered by relevance.
         
-        # Execute query
-        results = self.collection.query(**query_params)
+        Example:
+            >>> chunks = await rag.aretrieve("What is machine learning?", top_k=3)
+        """
+        k = top_k or self.config.top_k
+        loop = asyncio.get_running_loop()
+        keyword_matches = await loop.run_in_executor(
+            self._executor,
+            self._keyword_search,
+            query,
+            k,
+            filter_metadata
+        )
         
-        # Parse results into RetrievedChunk objects
-        chunks = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                chunks.append(RetrievedChunk(
-                    text=doc,
-                    score=results["distances"][0][i] if results["distances"] else 0.0,
-                    metadata=results["metadatas"][0][i] if results["metadatas"] else {},
-                    chunk_id=results["ids"][0][i] if results["ids"] else ""
-                ))
+        if self._is_keyword_shortcut(keyword_matches):
+            chunks = [self._keyword_chunk(match) for match in keyword_matches[:k] if match.exact]
+        else:
+            query_embedding = await self._aembed_query(query)
+            
+            candidates = max(k, self.config.hybrid_candidates) if keyword_matches else k
+            chunks = await loop.run_in_executor(
+                self._executor,
+                self._search,
+                query_embedding,
+                candidates,
+                filter_metadata
+            )
+            chunks = self._fuse(chunks, keyword_matches, k)
         
         logger.debug(f"Retrieved {len(chunks)} chunks for query: {query[:50]}...")
         return chunks
     
+    def _search(
+        self,
+        query_embedding: List[float],
+        k: int,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[RetrievedChunk]:
+        """
+        Run a nearest-neighbour search on the vector store.
+        
+        Args:
+            query_embedding: Embedding of the query.
+            k: Number of chunks to retrieve.
+            filter_metadata: Optional metadata filter (ChromaDB where clause).
+        
+        Returns:
+            List of RetrievedChunk objects ordered by relevance.
+        """
+        matches = self.vector_store.query(query_embedding, k, where=filter_metadata)
+        return [
+            RetrievedChunk(
+                text=match.document,
+                score=match.distance,
+                metadata=match.metadata,
+                chunk_id=match.id
+            )
+            for match in matches
+        ]
+    
+    def _keyword_search(
+        self,
+        query: str,
+        k: int,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[KeywordMatch]:
+        """
+        Search the keyword index for fusion candidates.
+        
+        Args:
+            query: The query text.
+            k: Number of chunks the caller will return.
+            filter_metadata: Optional metadata filter (ChromaDB where clause).
+        
+        Returns:
+            Keyword matches ordered by BM25 score; empty if hybrid search is
+            off, or if the index can't serve the query (retrieval then falls
+            back to vector search alone).
+        """
+        if self.keyword_index is None:
+            return []
+        try:
+            return self.keyword_index.search(
+                query, max(k, self.config.hybrid_candidates), where=filter_metadata
+            )
+        except (ValueError, sqlite3.Error) as e:
+            logger.debug(f"Keyword search skipped: {e}")
+            return []
+    
+    def _is_keyword_shortcut(self, matches: List[KeywordMatch]) -> bool:
+        """
+        Decide whether keyword matches alone answer the query.
+        
+        True when the query contains identifier-like terms (codes, template
+        names, phone numbers), the best match contains all of them, and it
+        covers at least ``config.keyword_shortcut_coverage`` of the query's
+        term weight. Vector search then adds little, so it is skipped
+        together with the embedding call.
+        
+        Args:
+            matches: Keyword matches, best first.
+        
+        Returns:
+            True if the matches should be returned without vector search.
+        """
+        threshold = self.config.keyword_shortcut_coverage
+        if not matches or threshold <= 0:
+            return False
+        best = matches[0]
+        if best.exact and best.coverage >= threshold:
+            # Runs on the query thread pool
+            with self._keyword_stats_lock:
+                self.keyword_shortcuts += 1
+            return True
+        return False
+    
+    @staticmethod
+    def _keyword_chunk(match: KeywordMatch) -> RetrievedChunk:
+        """Convert a keyword match, scored as 1 - coverage to read like a distance."""
+        return RetrievedChunk(
+            text=match.document,
+            score=1.0 - match.coverage,
+            metadata=match.metadata,
+            chunk_id=match.id,
+            source="keyword"
+        )
+    
+    @staticmethod
+    def _filter_relevant(chunks: List[RetrievedChunk], min_relevance_score: Optional[float]) -> List[RetrievedChunk]:
+        """
+        Drop vector chunks whose distance exceeds min_relevance_score.
+        
+        Keyword-only chunks have no vector distance (their score is on the
+        keyword coverage scale), so the threshold doesn't apply to them.
+        """
+        if min_relevance_score is None:
+            return chunks
+        return [c for c in chunks if c.source == "keyword" or c.score <= min_relevance_score]
+    
+    def _fuse(
+        self,
+        vector_chunks: List[RetrievedChunk],
+        keyword_matches: List[KeywordMatch],
+        k: int
+    ) -> List[RetrievedChunk]:
+        """
+        Merge vector and keyword rankings with reciprocal-rank fusion.
+        
+        Each chunk scores sum(1 / (rrf_k + rank)) over the rankings it
+        appears in, so chunks found by both rise to the top without
+        comparing cosine distances with BM25 scores. Chunks keep their
+        vector distance when they have one.
+        
+        Args:
+            vector_chunks: Vector search results, best first.
+            keyword_matches: Keyword search results, best first.
+            k: Number of chunks to return.
+        
+        Returns:
+            The top k chunks by fused score.
+        """
+        if not keyword_matches:
+            return vector_chunks[:k]
+        
+        fused: Dict[str, float] = {}
+        chunks: Dict[str, RetrievedChunk] = {}
+        for rank, chunk in enumerate(vector_chunks, 1):
+            fused[chunk.chunk_id] = fused.get(chunk.chunk_id, 0.0) + 1.0 / (self.config.rrf_k + rank)
+            chunks.setdefault(chunk.chunk_id, chunk)
+        for rank, match in enumerate(keyword_matches, 1):
+            fused[match.id] = fused.get(match.id, 0.0) + 1.0 / (self.config.rrf_k + rank)
+            if match.id not in chunks:
+                chunks[match.id] = self._keyword_chunk(match)
+        
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        return [chunks[chunk_id] for chunk_id in ranked[:k]]
+    
     def _build_prompt(
         self,
         query: str,
@@ -299,6 +624,68 @@ RESPONSE:"""
             logger.error(f"Gemini API error: {e}")
             raise RuntimeError(f"Gemini API error: {e}") from e
     
+    async def _agenerate_response(self, prompt: str) -> str:
+        """
+        Generate a response using the async Gemini client.
+        
+        Args:
+            prompt: The formatted prompt.
+        
+        Returns:
+            Generated response text.
+        
+        Raises:
+            RuntimeError: If Gemini API call fails.
+        """
+        try:
+            response = await self._genai_client.aio.models.generate_content(
+                model=self.config.gemini_model,
+                contents=prompt
+            )
+            return response.text
+        except Exception as e:
+            logger.error(f"Gemini API error: {e}")
+            raise RuntimeError(f"Gemini API error: {e}") from e
+    
+    def _answer_key(self, query: str, chunks: List[RetrievedChunk]) -> Tuple[str, ...]:
+        """
+        Cache key for an answer: model, prompt template, query and context.
+        
+        Args:
+            query: The user's query.
+            chunks: Retrieved context chunks the prompt is built from.
+        
+        Returns:
+            Hashable cache key.
+        """
+        template = self.system_prompt if chunks else self.NO_CONTEXT_PROMPT
+        template_hash = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+        chunk_ids = ",".join(sorted(chunk.chunk_id for chunk in chunks))
+        return (self.config.gemini_model, template_hash, normalize_query(query), chunk_ids)
+    
+    def _cached_answer(self, key: Tuple[str, ...]) -> Optional[str]:
+        """
+        Look up a cached answer, first dropping all answers if the collection changed.
+        
+        Args:
+            key: Key from `_answer_key`.
+        
+        Returns:
+            The cached answer, or None on a miss.
+        """
+        version = self.collection_version.read()
+        with self._answer_cache_lock:
+            if version != self._answers_version:
+                self._answers.clear()
+                self._answers_version = version
+            return self._answers.get(key)
+    
+    def _store_answer(self, key: Tuple[str, ...], answer: Optional[str]) -> None:
+        """Cache a generated answer (empty answers are not cached)."""
+        if answer:
+            with self._answer_cache_lock:
+                self._answers.set(key, answer)
+    
     def query(
         self,
         query: str,
@@ -313,15 +700,15 @@ RESPONSE:"""
         1. Retrieves relevant chunks from the knowledge base
         2. Optionally filters by relevance score
         3. Constructs a grounded prompt
-        4. Generates a response via Gemini
+        4. Generates a response via Gemini, or reuses the cached answer
+           for the same query, prompt template and retrieved chunks
         
         Args:
             query: The user's question.
             top_k: Number of chunks to retrieve.
             filter_metadata: Optional metadata filter.
-            min_relevance_score: Minimum similarity score threshold.
-                                Chunks with higher scores (less similar)
-                                are filtered out.
+            min_relevance_score: Maximum vector distance to keep; keyword-only
+                chunks are kept regardless.
         
         Returns:
             RAGResponse containing the answer and metadata.
@@ -338,12 +725,63 @@ RESPONSE:"""
         chunks = self.retrieve(query, top_k=top_k, filter_metadata=filter_metadata)
         
         # Filter by relevance score if specified
-        if min_relevance_score is not None:
-            chunks = [c for c in chunks if c.score <= min_relevance_score]
+        chunks = self._filter_relevant(chunks, min_relevance_score)
         
-        # Build prompt and generate response
-        prompt = self._build_prompt(query, chunks)
-        answer = self._generate_response(prompt)
+        # Build prompt and generate response, unless this context was answered before
+        answer_key = self._answer_key(query, chunks)
+        answer = self._cached_answer(answer_key)
+        if answer is None:
+            prompt = self._build_prompt(query, chunks)
+            answer = self._generate_response(prompt)
+            self._store_answer(answer_key, answer)
+        
+        return RAGResponse(
+            answer=answer,
+            context_chunks=chunks,
+            query=query,
+            has_context=len(chunks) > 0,
+            model_used=self.config.gemini_model
+        )
+    
+    async def aquery(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        min_relevance_score: Optional[float] = None
+    ) -> RAGResponse:
+        """
+        Execute a full RAG query pipeline without blocking the event loop.
+        
+        Same steps and arguments as `query`, using `aretrieve` and the
+        async Gemini client.
+        
+        Args:
+            query: The user's question.
+            top_k: Number of chunks to retrieve.
+            filter_metadata: Optional metadata filter.
+            min_relevance_score: Maximum vector distance to keep; keyword-only
+                chunks are kept regardless.
+        
+        Returns:
+            RAGResponse containing the answer and metadata.
+        
+        Example:
+            >>> response = await rag.aquery("How do I create a template?")
+            >>> print(response.answer)
+        """
+        logger.info(f"Processing RAG query: {query[:50]}...")
+        
+        chunks = await self.aretrieve(query, top_k=top_k, filter_metadata=filter_metadata)
+        
+        chunks = self._filter_relevant(chunks, min_relevance_score)
+        
+        answer_key = self._answer_key(query, chunks)
+        answer = self._cached_answer(answer_key)
+        if answer is None:
+            prompt = self._build_prompt(query, chunks)
+            answer = await self._agenerate_response(prompt)
+            self._store_answer(answer_key, answer)
         
         return RAGResponse(
             answer=answer,
@@ -385,17 +823,34 @@ RESPONSE:"""
     
     def get_collection_info(self) -> Dict[str, Any]:
         """
-        Get information about the loaded collection.
+        Get information about the loaded collection and vector store.
         
         Returns:
-            Dict with collection metadata.
+            Dict with collection metadata, query embedding and answer cache
+            stats, and keyword index stats.
         """
+        with self._query_cache_lock:
+            query_cache = self._query_embeddings.stats()
+        if self._persistent_embeddings is not None:
+            query_cache["persistent"] = self._persistent_embeddings.stats()
+        with self._answer_cache_lock:
+            answer_cache = self._answers.stats()
+        answer_cache["collection_version"] = self._answers_version
+        with self._keyword_stats_lock:
+            keyword_shortcuts = self.keyword_shortcuts
         return {
             "collection_name": self.config.collection_name,
-            "document_count": self.collection.count(),
+            "document_count": self.vector_store.count(),
+            "vector_backend": self.config.vector_backend,
             "chroma_path": self.config.chroma_path,
             "embedding_model": self.config.embedding_model,
-            "gemini_model": self.config.gemini_model
+            "gemini_model": self.config.gemini_model,
+            "query_embedding_cache": query_cache,
+            "answer_cache": answer_cache,
+            "keyword_index": (
+                {**self.keyword_index.stats(), "shortcuts": keyword_shortcuts}
+                if self.keyword_index else None
+            )
         }
     
     def health_check(self) -> Dict[str, Any]:
@@ -406,18 +861,18 @@ RESPONSE:"""
             Dict with health status of each component.
         """
         health = {
-            "chromadb": False,
+            "vector_store": False,
             "embeddings": False,
             "gemini": False,
             "errors": []
         }
         
-        # Check ChromaDB
+        # Check the vector store
         try:
-            _ = self.collection.count()
-            health["chromadb"] = True
+            _ = self.vector_store.count()
+            health["vector_store"] = True
         except Exception as e:
-            health["errors"].append(f"ChromaDB: {str(e)}")
+            health["errors"].append(f"Vector store ({self.config.vector_backend}): {str(e)}")
         
         # Check Gemini embeddings
         try:
@@ -438,9 +893,32 @@ RESPONSE:"""
             health["errors"].append(f"Gemini: {str(e)}")
         
         health["healthy"] = all([
-            health["chromadb"],
+            health["vector_store"],
             health["embeddings"],
             health["gemini"]
         ])
         
         return health
+    
+    def close(self) -> None:
+        """Shut down the query thread pool and close the keyword index."""
+        self._executor.shutdown(wait=False)
+        if self.keyword_index is not None:
+            self.keyword_index.close()
+
+
+# Singleton instance
+_rag_service: Optional[RAGService] = None
+
+
+def get_rag_service() -> RAGService:
+    """
+    Get the singleton RAG service, created with the default configuration.
+    
+    Raises:
+        ValueError: If the configuration is invalid or no Gemini API key is set.
+    """
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService()
+    return _rag_service
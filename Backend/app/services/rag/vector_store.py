@@ -0,0 +1,485 @@
+"""
+Vector Stores
+=============
+
+Storage and nearest-neighbour search for chunk embeddings, behind one
+interface shared by `KnowledgeBaseBuilder` and `RAGService`.
+
+Backends:
+---------
+- ChromaVectorStore: ChromaDB persistent collection with an HNSW index
+  (the default).
+- NumpyVectorStore: exact (brute-force) cosine search over a memory-mapped
+  float32 or float16 matrix of unit vectors, with chunk text and metadata
+  in SQLite. No index to build and no chromadb import, and search stays in
+  the low milliseconds up to a few hundred thousand chunks. Needs numpy.
+
+The backend is chosen with ``RAGConfig.vector_backend`` (RAG_VECTOR_BACKEND).
+Both report cosine distance (1 - cosine similarity), so scores and
+``min_relevance_score`` mean the same thing on either backend.
+
+Example Usage:
+--------------
+    from app.services.rag.vector_store import create_vector_store
+
+    store = create_vector_store(RAGConfig(vector_backend="numpy"))
+    store.upsert(ids, embeddings, documents, metadatas)
+    matches = store.query(query_embedding, k=5)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+# Optional: only the NumPy backend needs it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .config import RAGConfig
+
+logger = logging.getLogger(__name__)
+
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+# Keeps each IN (...) lookup below SQLite's host-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Rows scored per matrix product, bounding the float32 working copy of float16 data
+SCORE_BLOCK_ROWS = 65536
+
+
+@dataclass
+class VectorMatch:
+    """
+    A stored chunk returned by a similarity search.
+
+    Attributes:
+        id: Chunk identifier.
+        document: Chunk text.
+        metadata: Chunk metadata.
+        distance: Cosine distance to the query (lower is more similar).
+    """
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    distance: float
+
+
+class VectorStore(ABC):
+    """Interface for chunk embedding storage and similarity search."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    @abstractmethod
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        """
+        Find which of the given chunk IDs are stored.
+
+        Args:
+            ids: Chunk identifiers to check.
+
+        Returns:
+            The subset of ids that exist.
+        """
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]]
+    ) -> None:
+        """
+        Insert chunks, replacing any with the same ID.
+
+        Args:
+            ids: Chunk identifiers.
+            embeddings: Embedding vectors, in the same order.
+            documents: Chunk texts, in the same order.
+            metadatas: Chunk metadata, in the same order.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[VectorMatch]:
+        """
+        Find the chunks most similar to an embedding.
+
+        Args:
+            embedding: Query embedding.
+            k: Maximum number of matches.
+            where: Optional metadata filter (ChromaDB where clause).
+
+        Returns:
+            Matches ordered from most to least similar.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete all stored chunks."""
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Vector store backed by a ChromaDB persistent collection.
+
+    Attributes:
+        client: ChromaDB client.
+        collection: ChromaDB collection.
+    """
+
+    def __init__(self, config: RAGConfig):
+        """
+        Open (or create) the configured collection.
+
+        Args:
+            config: RAG configuration (chroma_path, collection_name).
+        """
+        # Imported here so the NumPy backend never pays chromadb's import cost
+        import chromadb
+        from chromadb.config import Settings
+
+        self.config = config
+        os.makedirs(config.chroma_path, exist_ok=True)
+        self.client = chromadb.PersistentClient(
+            path=config.chroma_path,
+            settings=Settings(anonymized_telemetry=False)
+        )
+        self.collection = self._get_collection()
+
+    def _get_collection(self):
+        return self.client.get_or_create_collection(
+            name=self.config.collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        return set(self.collection.get(ids=list(ids), include=[])["ids"])
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.upsert(
+            ids=list(ids),
+            embeddings=list(embeddings),
+            documents=list(documents),
+            metadatas=list(metadatas)
+        )
+
+    def query(self, embedding, k, where=None) -> List[VectorMatch]:
+        query_params = {
+            "query_embeddings": [list(embedding)],
+            "n_results": k,
+            "include": ["documents", "metadatas", "distances"]
+        }
+        if where:
+            query_params["where"] = where
+
+        results = self.collection.query(**query_params)
+
+        matches = []
+        if results["documents"] and results["documents"][0]:
+            for i, doc in enumerate(results["documents"][0]):
+                matches.append(VectorMatch(
+                    id=results["ids"][0][i] if results["ids"] else "",
+                    document=doc,
+                    metadata=results["metadatas"][0][i] if results["metadatas"] else {},
+                    distance=results["distances"][0][i] if results["distances"] else 0.0
+                ))
+        return matches
+
+    def clear(self) -> None:
+        self.client.delete_collection(self.config.collection_name)
+        self.collection = self._get_collection()
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact cosine search over a memory-mapped embedding matrix.
+
+    Files live in ``<chroma_path>/<collection_name>.vectors/``:
+    ``vectors-<generation>.bin`` holds one unit-normalized row per chunk
+    (float32 or float16, row i at offset i * dims * itemsize), and
+    ``index.sqlite3`` maps row numbers to chunk IDs, text and metadata. The
+    matrix is mapped read-only for search, so only the pages touched are
+    resident and the OS shares them between worker processes; it is
+    re-mapped when another process (e.g. an ingestion run) appends rows or
+    clears the store. Clearing starts a new generation file rather than
+    truncating the old one, which may still be mapped elsewhere.
+
+    Metadata filters support equality only: ``{"source": "a.md"}`` or
+    ``{"source": {"$eq": "a.md"}}``.
+
+    Attributes:
+        path: Directory holding the store's files.
+        dtype: Configured storage dtype (an existing matrix keeps its own).
+    """
+
+    def __init__(self, config: RAGConfig):
+        """
+        Open (or create) the store for the configured collection.
+
+        Args:
+            config: RAG configuration (chroma_path, collection_name, vector_dtype).
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError(
+                "numpy is required for the numpy vector backend. "
+                "Install with: pip install numpy"
+            )
+        self.config = config
+        self.dtype = np.dtype(config.vector_dtype)
+        self.path = os.path.join(config.chroma_path, f"{config.collection_name}.vectors")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_key = None
+
+        os.makedirs(self.path, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(self.path, "index.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                idx INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        stored_dtype = self._meta("dtype")
+        if stored_dtype and stored_dtype != self.dtype.name:
+            logger.warning(
+                f"Vector store {self.path} holds {stored_dtype} vectors; "
+                f"ignoring vector_dtype={self.dtype.name} until it is cleared"
+            )
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _generation(self) -> int:
+        return int(self._meta("generation") or 0)
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"vectors-{generation}.bin")
+
+    def _rows(self) -> int:
+        """Row count from SQLite, the source of truth (rows are contiguous from 0)."""
+        row = self._conn.execute("SELECT MAX(idx) FROM chunks").fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _current_matrix(self):
+        """The memory-mapped matrix, re-mapped if rows were added or the store cleared since."""
+        with self._lock:
+            rows = self._rows()
+            if rows == 0:
+                return None
+            key = (self._generation(), rows)
+            if self._matrix is None or key != self._matrix_key:
+                self._matrix = np.memmap(
+                    self._vectors_path(key[0]),
+                    dtype=np.dtype(self._meta("dtype")),
+                    mode="r",
+                    shape=(rows, int(self._meta("dims")))
+                )
+                self._matrix_key = key
+            return self._matrix
+
+    def count(self) -> int:
+        with self._lock:
+            return self._rows()
+
+    def _idx_by_id(self, ids: Sequence[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        ids = list(ids)
+        for i in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[i:i + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT id, idx FROM chunks WHERE id IN ({placeholders})", batch
+            ).fetchall())
+        return found
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        with self._lock:
+            return set(self._idx_by_id(ids))
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("upsert needs one embedding per id")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        with self._lock:
+            dims = self._meta("dims")
+            if dims is None:
+                dtype = self.dtype
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('dims', ?)", (str(vectors.shape[1]),))
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('dtype', ?)", (dtype.name,))
+            elif int(dims) != vectors.shape[1]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store ({dims})")
+            else:
+                dtype = np.dtype(self._meta("dtype"))
+            vectors = vectors.astype(dtype)
+            row_bytes = vectors.shape[1] * dtype.itemsize
+            vectors_path = self._vectors_path(self._generation())
+
+            # Later duplicates of an id in the same call win
+            positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+            existing = self._idx_by_id(list(positions))
+            rows = self._rows()
+            assigned = {}
+            for chunk_id in positions:
+                if chunk_id in existing:
+                    assigned[chunk_id] = existing[chunk_id]
+                else:
+                    assigned[chunk_id] = rows
+                    rows += 1
+
+            # Vectors first, then the rows that make them visible; bytes past
+            # the committed rows (from an interrupted write) are overwritten
+            mode = "r+b" if os.path.exists(vectors_path) else "w+b"
+            with open(vectors_path, mode) as f:
+                for chunk_id, idx in sorted(assigned.items(), key=lambda item: item[1]):
+                    f.seek(idx * row_bytes)
+                    f.write(vectors[positions[chunk_id]].tobytes())
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (idx, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (idx, chunk_id, documents[positions[chunk_id]],
+                     json.dumps(metadatas[positions[chunk_id]] or {}))
+                    for chunk_id, idx in assigned.items()
+                ]
+            )
+            self._conn.commit()
+
+    def _filter_rows(self, where: Dict[str, Any]):
+        clauses, params = [], []
+        for key, value in where.items():
+            if isinstance(value, dict):
+                if set(value) != {"$eq"}:
+                    raise ValueError("The numpy vector backend only supports equality filters")
+                value = value["$eq"]
+            if key.startswith("$"):
+                raise ValueError("The numpy vector backend only supports equality filters")
+            clauses.append("json_extract(metadata, ?) = ?")
+            params.extend([f'$."{key}"', value])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT idx FROM chunks WHERE {' AND '.join(clauses)}", params
+            ).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def _scores(self, matrix, query, candidates=None):
+        """Cosine similarities (rows are unit vectors), in blocks of SCORE_BLOCK_ROWS."""
+        total = matrix.shape[0] if candidates is None else len(candidates)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, total)
+            block = matrix[start:end] if candidates is None else matrix[candidates[start:end]]
+            scores[start:end] = block.astype(np.float32, copy=False) @ query
+        return scores
+
+    def query(self, embedding, k, where=None) -> List[VectorMatch]:
+        matrix = self._current_matrix()
+        if matrix is None or k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        # Not in place: asarray hands back the caller's array when it's already float32
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        candidates = self._filter_rows(where) if where else None
+        if candidates is not None:
+            candidates = candidates[candidates < matrix.shape[0]]
+            if not len(candidates):
+                return []
+
+        # The matrix product releases the GIL, so concurrent queries overlap here
+        scores = self._scores(matrix, query, candidates)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+
+        with self._lock:
+            placeholders = ",".join("?" * len(rows))
+            stored = {
+                idx: (chunk_id, document, metadata)
+                for idx, chunk_id, document, metadata in self._conn.execute(
+                    f"SELECT idx, id, document, metadata FROM chunks WHERE idx IN ({placeholders})",
+                    [int(row) for row in rows]
+                )
+            }
+
+        return [
+            VectorMatch(
+                id=stored[int(row)][0],
+                document=stored[int(row)][1],
+                metadata=json.loads(stored[int(row)][2]),
+                distance=float(1.0 - score)
+            )
+            for row, score in zip(rows, scores[top])
+            if int(row) in stored
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            old_path = self._vectors_path(self._generation())
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM meta WHERE key IN ('dims', 'dtype')")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                (str(self._generation() + 1),)
+            )
+            self._conn.commit()
+            self._matrix = None
+            try:
+                os.remove(old_path)
+            except OSError:
+                # Missing, or still mapped by another process on Windows
+                pass
+
+
+def create_vector_store(config: RAGConfig) -> VectorStore:
+    """
+    Create the vector store selected by ``config.vector_backend``.
+
+    Args:
+        config: RAG configuration.
+
+    Returns:
+        A ChromaVectorStore or NumpyVectorStore.
+    """
+    if config.vector_backend == "numpy":
+        return NumpyVectorStore(config)
+    return ChromaVectorStore(config)
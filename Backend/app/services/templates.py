@@ -1,15 +1,19 @@
 from datetime import datetime
+from typing import Optional
+
 import httpx
 from fastapi import HTTPException
 
+from app.services.graph_api import GraphAPIClient, get_graph_client
 from config import settings
 from models import TemplateRequest
 
 
-async def fetch_header_image_url(template_id: str, client: httpx.AsyncClient) -> str:
+async def fetch_header_image_url(template_id: str, client: Optional[GraphAPIClient] = None) -> str:
     """Fetch the example header image URL for a template from Meta."""
 
-    url = f"https://graph.facebook.com/{settings.WHATSAPP_API_VERSION}/{template_id}"
+    client = client or get_graph_client()
+    url = f"/{settings.WHATSAPP_API_VERSION}/{template_id}"
     headers = {"Authorization": f"Bearer {settings.WHATSAPP_ACCESS_TOKEN}"}
     params = {"phone_number_id": settings.WHATSAPP_PHONE_NUMBER_ID}
 
@@ -34,151 +38,152 @@ async def fetch_header_image_url(template_id: str, client: httpx.AsyncClient) ->
     raise HTTPException(status_code=400, detail="Template header image URL not found")
 
 
-async def send_template_message(req: TemplateRequest, db=None, user_id=None):
+async def send_template_message(req: TemplateRequest, db=None, user_id=None, client: Optional[GraphAPIClient] = None):
+    client = client or get_graph_client()
+
     if not req.phone or not req.template_name:
         raise HTTPException(status_code=400, detail="Phone and template name are required")
 
-    url = f"https://graph.facebook.com/{settings.WHATSAPP_API_VERSION}/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"/{settings.WHATSAPP_API_VERSION}/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
     headers = {
         "Authorization": f"Bearer {settings.WHATSAPP_ACCESS_TOKEN}",
         "Content-Type": "application/json",
     }
 
-    async with httpx.AsyncClient() as client:
-        components = []
-
-        if req.header_type:
-            header_params = []
-            header_type = req.header_type.upper()
-
-            if header_type == "TEXT":
-                header_params = [{"type": "text", "text": p} for p in req.header_parameters]
-            elif header_type == "IMAGE":
-                if not req.template_id:
-                    raise HTTPException(status_code=400, detail="template_id is required for IMAGE headers")
-                
-                # Check if user provided a specific image (URL or ID)
-                if req.header_parameters:
-                    param = req.header_parameters[0]
-                    if param.startswith("http"):
-                        header_params.append({"type": "image", "image": {"link": param}})
-                    else:
-                        # Assume it's a media ID
-                        header_params.append({"type": "image", "image": {"id": param}})
-                else:
-                    # Fallback to example image from template definition
-                    image_url = await fetch_header_image_url(req.template_id, client)
-                    header_params.append({"type": "image", "image": {"link": image_url}})
-            elif header_type == "VIDEO" and req.header_parameters:
-                param = req.header_parameters[0]
-                if param.startswith("http"):
-                    header_params.append({"type": "video", "video": {"link": param}})
-                else:
-                    header_params.append({"type": "video", "video": {"id": param}})
-            elif header_type == "DOCUMENT" and req.header_parameters:
+    components = []
+
+    if req.header_type:
+        header_params = []
+        header_type = req.header_type.upper()
+
+        if header_type == "TEXT":
+            header_params = [{"type": "text", "text": p} for p in req.header_parameters]
+        elif header_type == "IMAGE":
+            if not req.template_id:
+                raise HTTPException(status_code=400, detail="template_id is required for IMAGE headers")
+            
+            # Check if user provided a specific image (URL or ID)
+            if req.header_parameters:
                 param = req.header_parameters[0]
                 if param.startswith("http"):
-                    header_params.append({"type": "document", "document": {"link": param}})
+                    header_params.append({"type": "image", "image": {"link": param}})
                 else:
-                    header_params.append({"type": "document", "document": {"id": param}})
-
-            if header_params:
-                components.append({"type": "header", "parameters": header_params})
-
-        if req.body_parameters:
-            body_params = [{"type": "text", "text": p} for p in req.body_parameters]
-            components.append({"type": "body", "parameters": body_params})
-
-        payload = {
-            "messaging_product": "whatsapp",
-            "recipient_type": "individual",
-            "to": req.phone,
-            "type": "template",
-            "template": {
-                "name": req.template_name,
-                "language": {"code": req.language_code},
-                "components": components,
-            },
-        }
-
-        try:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            whatsapp_response = response.json()
+                    # Assume it's a media ID
+                    header_params.append({"type": "image", "image": {"id": param}})
+            else:
+                # Fallback to example image from template definition
+                image_url = await fetch_header_image_url(req.template_id, client)
+                header_params.append({"type": "image", "image": {"link": image_url}})
+        elif header_type == "VIDEO" and req.header_parameters:
+            param = req.header_parameters[0]
+            if param.startswith("http"):
+                header_params.append({"type": "video", "video": {"link": param}})
+            else:
+                header_params.append({"type": "video", "video": {"id": param}})
+        elif header_type == "DOCUMENT" and req.header_parameters:
+            param = req.header_parameters[0]
+            if param.startswith("http"):
+                header_params.append({"type": "document", "document": {"link": param}})
+            else:
+                header_params.append({"type": "document", "document": {"id": param}})
+
+        if header_params:
+            components.append({"type": "header", "parameters": header_params})
+
+    if req.body_parameters:
+        body_params = [{"type": "text", "text": p} for p in req.body_parameters]
+        components.append({"type": "body", "parameters": body_params})
+
+    payload = {
+        "messaging_product": "whatsapp",
+        "recipient_type": "individual",
+        "to": req.phone,
+        "type": "template",
+        "template": {
+            "name": req.template_name,
+            "language": {"code": req.language_code},
+            "components": components,
+        },
+    }
+
+    try:
+        response = await client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        whatsapp_response = response.json()
+        
+        # Save template message to database
+        if db is not None:
+            # Build the template text preview for display
+            template_text = f"Template: {req.template_name}"
+            if req.body_parameters:
+                template_text += f" (params: {', '.join(req.body_parameters)})"
             
-            # Save template message to database
-            if db is not None:
-                # Build the template text preview for display
-                template_text = f"Template: {req.template_name}"
-                if req.body_parameters:
-                    template_text += f" (params: {', '.join(req.body_parameters)})"
-                
-                message_doc = {
-                    "chatId": req.phone,
-                    "senderId": user_id if user_id else "system",
-                    "receiverId": req.phone,
-                    "direction": "outgoing",
-                    "text": template_text,
-                    "status": "sent",
-                    "messageType": "template",
-                    "templateName": req.template_name,
-                    "createdAt": datetime.utcnow().isoformat(),
-                    "updatedAt": datetime.utcnow().isoformat(),
-                    "whatsappMessageId": whatsapp_response.get("messages", [{}])[0].get("id") if whatsapp_response.get("messages") else None,
-                }
-                
-                await db["messages"].insert_one(message_doc)
+            message_doc = {
+                "chatId": req.phone,
+                "senderId": user_id if user_id else "system",
+                "receiverId": req.phone,
+                "direction": "outgoing",
+                "text": template_text,
+                "status": "sent",
+                "messageType": "template",
+                "templateName": req.template_name,
+                "createdAt": datetime.utcnow().isoformat(),
+                "updatedAt": datetime.utcnow().isoformat(),
+                "whatsappMessageId": whatsapp_response.get("messages", [{}])[0].get("id") if whatsapp_response.get("messages") else None,
+            }
             
-            return {"success": True, "whatsapp_response": whatsapp_response}
-        except httpx.HTTPStatusError as e:
-            print(f"Error sending template: {e.response.text}")
+            await db["messages"].insert_one(message_doc)
+        
+        return {"success": True, "whatsapp_response": whatsapp_response}
+    except httpx.HTTPStatusError as e:
+        print(f"Error sending template: {e.response.text}")
+        
+        # Save failed template message to database
+        if db is not None:
+            template_text = f"Template: {req.template_name}"
+            if req.body_parameters:
+                template_text += f" (params: {', '.join(req.body_parameters)})"
             
-            # Save failed template message to database
-            if db is not None:
-                template_text = f"Template: {req.template_name}"
-                if req.body_parameters:
-                    template_text += f" (params: {', '.join(req.body_parameters)})"
-                
-                message_doc = {
-                    "chatId": req.phone,
-                    "senderId": user_id if user_id else "system",
-                    "receiverId": req.phone,
-                    "direction": "outgoing",
-                    "text": template_text,
-                    "status": "failed",
-                    "messageType": "template",
-                    "templateName": req.template_name,
-                    "createdAt": datetime.utcnow().isoformat(),
-                    "updatedAt": datetime.utcnow().isoformat(),
-                    "whatsappMessageId": None,
-                }
-                
-                await db["messages"].insert_one(message_doc)
+            message_doc = {
+                "chatId": req.phone,
+                "senderId": user_id if user_id else "system",
+                "receiverId": req.phone,
+                "direction": "outgoing",
+                "text": template_text,
+                "status": "failed",
+                "messageType": "template",
+                "templateName": req.template_name,
+                "createdAt": datetime.utcnow().isoformat(),
+                "updatedAt": datetime.utcnow().isoformat(),
+                "whatsappMessageId": None,
+            }
             
-            return {"success": False, "error": "Failed to send template", "details": e.response.json()}
-        except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            await db["messages"].insert_one(message_doc)
+        
+        return {"success": False, "error": "Failed to send template", "details": e.response.json()}
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        
+        # Save failed template message to database
+        if db is not None:
+            template_text = f"Template: {req.template_name}"
+            if req.body_parameters:
+                template_text += f" (params: {', '.join(req.body_parameters)})"
             
-            # Save failed template message to database
-            if db is not None:
-                template_text = f"Template: {req.template_name}"
-                if req.body_parameters:
-                    template_text += f" (params: {', '.join(req.body_parameters)})"
-                
-                message_doc = {
-                    "chatId": req.phone,
-                    "senderId": user_id if user_id else "system",
-                    "receiverId": req.phone,
-                    "direction": "outgoing",
-                    "text": template_text,
-                    "status": "failed",
-                    "messageType": "template",
-                    "templateName": req.template_name,
-                    "createdAt": datetime.utcnow().isoformat(),
-                    "updatedAt": datetime.utcnow().isoformat(),
-                    "whatsappMessageId": None,
-                }
-                
-                await db["messages"].insert_one(message_doc)
+            message_doc = {
+                "chatId": req.phone,
+                "senderId": user_id if user_id else "system",
+                "receiverId": req.phone,
+                "direction": "outgoing",
+                "text": template_text,
+                "status": "failed",
+                "messageType": "template",
+                "templateName": req.template_name,
+                "createdAt": datetime.utcnow().isoformat(),
+                "updatedAt": datetime.utcnow().isoformat(),
+                "whatsappMessageId": None,
+            }
             
-            return {"success": False, "error": "Unexpected error", "details": {"message": str(e)}}
+            await db["messages"].insert_one(message_doc)
+        
+        return {"success": False, "error": "Unexpected error", "details": {"message": str(e)}}
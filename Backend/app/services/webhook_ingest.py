@@ -0,0 +1,285 @@
+"""
+Webhook ingestion pipeline
+The webhook route only parses Meta's payload into events and queues them,
+so it can ack immediately. A single consumer coalesces queued events over a
+short window and writes each batch with one bulk_write for incoming messages
+and one for status receipts, then emits the socket events.
+Incoming messages are upserted on whatsappMessageId, backed by a unique
+index, so a payload Meta redelivers (after a 503 that left part of it
+queued, or its usual at-least-once retries) is not stored or emitted twice.
+Receipts for the same message are collapsed to the highest-ranked status and
+written conditionally, so statuses never move backwards.
+
+The queue is bounded. When it is full the route waits up to
+WEBHOOK_ENQUEUE_TIMEOUT_SECONDS for space and then answers 503, so Meta
+redelivers later instead of events being dropped.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.sockets import get_socket_for_user, sio
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# ("message", incoming message doc) or ("status", {"whatsappMessageId", "status", "timestamp"})
+WebhookEvent = Tuple[str, Dict[str, Any]]
+
+# Message statuses only move forward through these ranks; Meta often delivers receipts out of order
+STATUS_RANKS = {"sending": 0, "sent": 1, "delivered": 2, "read": 3, "failed": 4}
+
+
+def status_rank(status: Optional[str]) -> int:
+    """Rank of a status; unknown statuses rank below every known one."""
+    return STATUS_RANKS.get(status, -1)
+
+
+def statuses_at_or_above(status: str) -> List[str]:
+    rank = status_rank(status)
+    return [name for name, other in STATUS_RANKS.items() if other >= rank]
+
+
+def reduce_status_updates(updates: List[dict]) -> List[dict]:
+    """
+    Collapse receipts for the same whatsappMessageId into the highest-ranked one.
+
+    Ties keep the later receipt, so a repeated status carries its newest timestamp.
+    """
+    reduced: Dict[str, dict] = {}
+    for update in updates:
+        current = reduced.get(update["whatsappMessageId"])
+        if current is None or status_rank(update["status"]) >= status_rank(current["status"]):
+            reduced[update["whatsappMessageId"]] = update
+    return list(reduced.values())
+
+
+class WebhookQueueFullError(Exception):
+    """Raised when the ingestion queue stayed full for the whole enqueue timeout"""
+    pass
+
+
+class WebhookIngestor:
+    """Bounded in-process queue plus a batching consumer for webhook events"""
+
+    def __init__(self, db):
+        self.db = db
+        self.batch_size = settings.WEBHOOK_BATCH_SIZE
+        self.batch_window = settings.WEBHOOK_BATCH_WINDOW_MS / 1000
+        self.enqueue_timeout = settings.WEBHOOK_ENQUEUE_TIMEOUT_SECONDS
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WEBHOOK_QUEUE_MAXSIZE)
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "enqueued": 0,
+            "processed": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_queue_depth": 0,
+            "backpressure_waits": 0,
+            "backpressure_wait_seconds": 0.0,
+            "rejected": 0,
+            "duplicate_messages": 0,
+            "status_receipts": 0,
+            "status_writes": 0,
+            "write_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume(), name="webhook-ingestor")
+
+    async def stop(self) -> None:
+        """Stop the consumer after writing everything already queued."""
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, events: List[WebhookEvent]) -> None:
+        """Queue events, waiting for space when the queue is full."""
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.metrics["backpressure_waits"] += 1
+                started = time.perf_counter()
+                try:
+                    await asyncio.wait_for(self.queue.put(event), timeout=self.enqueue_timeout)
+                except asyncio.TimeoutError:
+                    self.metrics["rejected"] += 1
+                    raise WebhookQueueFullError("Webhook ingestion queue is full")
+                finally:
+                    self.metrics["backpressure_wait_seconds"] += time.perf_counter() - started
+            self.metrics["enqueued"] += 1
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], self.queue.qsize())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "queue_depth": self.queue.qsize(),
+            "queue_maxsize": self.queue.maxsize,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _next_batch(self) -> List[WebhookEvent]:
+        """Block for one event, then gather more until the batch is full or the window closes."""
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _consume(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            started = time.perf_counter()
+            try:
+                await self._write_batch(batch)
+            except Exception as exc:
+                self.metrics["write_errors"] += 1
+                logger.error(f"Error writing webhook batch of {len(batch)}: {str(exc)}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            self.metrics["processed"] += len(batch)
+            self.metrics["batches"] += 1
+            self.metrics["last_batch_size"] = len(batch)
+            self.metrics["last_flush_ms"] = (time.perf_counter() - started) * 1000
+
+    async def _write_batch(self, batch: List[WebhookEvent]) -> None:
+        messages = [payload for kind, payload in batch if kind == "message"]
+        statuses = [payload for kind, payload in batch if kind == "status"]
+        if messages:
+            await self._write_messages(messages)
+        if statuses:
+            await self._write_statuses(statuses)
+
+    async def _write_messages(self, docs: List[dict]) -> None:
+        # Upsert on whatsappMessageId: a message already stored by an earlier delivery matches and is skipped
+        ops = []
+        op_docs: List[dict] = []
+        seen = set()
+        for doc in docs:
+            message_id = doc.get("whatsappMessageId")
+            if message_id is None:
+                ops.append(InsertOne(doc))
+            elif message_id in seen:
+                continue
+            else:
+                seen.add(message_id)
+                ops.append(
+                    UpdateOne(
+                        {"whatsappMessageId": message_id, "direction": "incoming"},
+                        {"$setOnInsert": doc},
+                        upsert=True,
+                    )
+                )
+            op_docs.append(doc)
+
+        failed = set()
+        errors = []
+        try:
+            result = await self.db["messages"].bulk_write(ops, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as exc:
+            upserted = {item["index"]: item["_id"] for item in exc.details.get("upserted", [])}
+            write_errors = exc.details.get("writeErrors", [])
+            failed = {error["index"] for error in write_errors}
+            # A duplicate key means another worker stored the same redelivered message first
+            errors = [error for error in write_errors if error.get("code") != 11000]
+            if errors:
+                self.metrics["write_errors"] += 1
+                logger.error(f"Some incoming messages were not stored: {errors}")
+        for index, _id in upserted.items():
+            op_docs[index]["_id"] = _id
+
+        # InsertOne sets _id on its doc even when the insert fails; matched upserts leave it unset
+        stored = [doc for index, doc in enumerate(op_docs) if "_id" in doc and index not in failed]
+        self.metrics["duplicate_messages"] += len(docs) - len(stored) - len(errors)
+        for doc in stored:
+            event = {**doc, "id": str(doc["_id"])}
+            event.pop("_id")
+            await sio.emit("new_message", event)
+        logger.info(f"📨 Stored and emitted {len(stored)} incoming message(s)")
+
+    async def _write_statuses(self, updates: List[dict]) -> None:
+        reduced = reduce_status_updates(updates)
+        self.metrics["status_receipts"] += len(updates)
+        self.metrics["status_writes"] += len(reduced)
+
+        now = datetime.utcnow().isoformat()
+        ops = [
+            UpdateOne(
+                # Only move forward: a late "delivered" after "read" matches nothing
+                {"whatsappMessageId": update["whatsappMessageId"], "status": {"$nin": statuses_at_or_above(update["status"])}},
+                {"$set": {"status": update["status"], "updatedAt": now}},
+            )
+            for update in reduced
+        ]
+        await self.db["messages"].bulk_write(ops, ordered=False)
+
+        # One lookup for the whole batch to route status events to each sender's socket
+        ids = [update["whatsappMessageId"] for update in reduced]
+        cursor = self.db["messages"].find(
+            {"whatsappMessageId": {"$in": ids}}, {"senderId": 1, "whatsappMessageId": 1, "status": 1}
+        )
+        stored = {doc["whatsappMessageId"]: doc async for doc in cursor}
+
+        for update in reduced:
+            doc = stored.get(update["whatsappMessageId"])
+            # Skip receipts the stored status has already moved past
+            if not doc or doc.get("status") != update["status"]:
+                continue
+            sender_socket = get_socket_for_user(doc.get("senderId"))
+            if sender_socket:
+                await sio.emit(
+                    "message_status_update",
+                    {
+                        "messageId": str(doc["_id"]),
+                        "whatsappMessageId": update["whatsappMessageId"],
+                        "status": update["status"],
+                        "timestamp": update.get("timestamp"),
+                    },
+                    to=sender_socket,
+                )
+
+
+# Singleton instance, started in the app lifespan
+_webhook_ingestor: Optional[WebhookIngestor] = None
+
+
+async def start_webhook_ingestor(db) -> WebhookIngestor:
+    global _webhook_ingestor
+    if _webhook_ingestor is None:
+        _webhook_ingestor = WebhookIngestor(db)
+        _webhook_ingestor.start()
+    return _webhook_ingestor
+
+
+async def stop_webhook_ingestor() -> None:
+    global _webhook_ingestor
+    if _webhook_ingestor is not None:
+        await _webhook_ingestor.stop()
+        _webhook_ingestor = None
+
+
+def get_webhook_ingestor() -> Optional[WebhookIngestor]:
+    return _webhook_ingestor
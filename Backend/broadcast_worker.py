@@ -0,0 +1,66 @@
+"""
+Standalone broadcast worker.
+
+Runs broadcast job workers without the API, so sending capacity scales by
+starting more of these processes:
+
+    python broadcast_worker.py            # BROADCAST_WORKERS workers (at least 1)
+    python broadcast_worker.py --workers 4
+
+Set BROADCAST_WORKERS=0 on the API processes to keep all sending here.
+Note that the token bucket is per process, so split
+BROADCAST_RATE_LIMIT_PER_SECOND across processes sending from the same number.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.indexes import ensure_indexes
+from app.services.broadcast_worker import start_broadcast_workers, stop_broadcast_workers
+from app.services.graph_api import close_graph_client, start_graph_client
+from config import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("broadcast_worker")
+
+
+async def main(worker_count: int):
+    mongo_client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = mongo_client[settings.MONGODB_DB_NAME]
+    await ensure_indexes(db)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await start_graph_client()
+    workers = await start_broadcast_workers(db, count=worker_count)
+    logger.info(f"Started {len(workers)} broadcast worker(s)")
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Shutting down broadcast workers")
+        await stop_broadcast_workers(workers)
+        await close_graph_client()
+        mongo_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run broadcast job workers")
+    parser.add_argument("--workers", type=int, default=max(settings.BROADCAST_WORKERS, 1))
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     WHATSAPP_ACCESS_TOKEN: str
@@ -16,6 +16,16 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRES_IN_MINUTES: int = 600
+    # Cache of authenticated users per process (size 0 disables it)
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    # Read-only routes build the user from the signed token claims without a lookup;
+    # a deleted user keeps read access until the token expires
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    # Password hashing runs in its own thread pool so logins don't block the event loop;
+    # hashes waiting beyond the queue limit are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 200
     # Cookie settings - for GitHub Codespaces (HTTPS), set COOKIE_SECURE=true and COOKIE_SAMESITE=none
     COOKIE_SECURE: bool = True
     COOKIE_SAMESITE: str = "none"
@@ -27,6 +37,62 @@ class Settings(BaseSettings):
     # Gemini AI API Key for Chatbot
     GEMINI_API_KEY: Optional[str] = None
 
+    # Chatbot reply cache; semantic lookup embeds each missed question to match paraphrases
+    CHAT_CACHE_SIZE: int = 1000
+    CHAT_CACHE_TTL_SECONDS: float = 3600.0
+    CHAT_CACHE_HISTORY_TURNS: int = 2
+    CHAT_CACHE_SEMANTIC: bool = False
+    CHAT_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    CHAT_CACHE_EMBEDDING_MODEL: str = "gemini-embedding-001"
+    # Chatbot history budget (estimated tokens); older turns are folded into a cached rolling summary
+    CHAT_HISTORY_TOKEN_BUDGET: int = 2000
+    CHAT_HISTORY_MAX_TURNS: int = 200
+    CHAT_SUMMARY_STEP_TURNS: int = 6
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    CHAT_SUMMARY_CACHE_SIZE: int = 1000
+    CHAT_SUMMARY_CACHE_TTL_SECONDS: float = 21600.0
+    # Graph API base URL - override to point at a local stub for load testing (OAuth exchanges always use graph.facebook.com)
+    GRAPH_API_BASE_URL: str = "https://graph.facebook.com"
+    # Shared Graph API client - HTTP/2 needs the h2 package (pip install "httpx[http2]")
+    GRAPH_API_HTTP2: bool = False
+    GRAPH_API_MAX_CONNECTIONS: int = 100
+    GRAPH_API_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    GRAPH_API_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    GRAPH_API_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GRAPH_API_READ_TIMEOUT_SECONDS: float = 30.0
+    GRAPH_API_MAX_RETRIES: int = 3
+    GRAPH_API_BACKOFF_SECONDS: float = 0.5
+    # Broadcast dispatch - Meta's default throughput tier is 80 messages/second per phone number.
+    # Per phone number overrides are a JSON object, e.g. BROADCAST_PHONE_RATE_LIMITS='{"1234567890": 250}'
+    BROADCAST_RATE_LIMIT_PER_SECOND: float = 80.0
+    BROADCAST_RATE_LIMIT_BURST: int = 80
+    BROADCAST_PHONE_RATE_LIMITS: Dict[str, float] = {}
+    BROADCAST_MAX_CONCURRENCY: int = 50
+    # Broadcast job workers started inside each API process (0 = run them only via broadcast_worker.py)
+    BROADCAST_WORKERS: int = 1
+    BROADCAST_LEASE_SECONDS: int = 60
+    BROADCAST_POLL_INTERVAL_SECONDS: float = 2.0
+    # Recipient results are written to broadcast_recipients in bulk batches of this size (or every flush interval)
+    BROADCAST_RESULT_BATCH_SIZE: int = 500
+    BROADCAST_RESULT_FLUSH_SECONDS: float = 1.0
+
+    # List routes: page size when the client passes no limit, and the cap on any limit
+    PAGE_DEFAULT_LIMIT: int = 500
+    PAGE_MAX_LIMIT: int = 1000
+
+    # Rows per bulk_write during POST /contacts/import (clients may ask for up to the max)
+    CONTACT_IMPORT_BATCH_SIZE: int = 1000
+    CONTACT_IMPORT_MAX_BATCH_SIZE: int = 10000
+    # Documents per cursor batch during GET /contacts/export
+    CONTACT_EXPORT_BATCH_SIZE: int = 1000
+
+    # Webhook ingestion queue: events are written in batches of up to WEBHOOK_BATCH_SIZE,
+    # gathered over WEBHOOK_BATCH_WINDOW_MS; a full queue answers 503 after the enqueue timeout
+    WEBHOOK_QUEUE_MAXSIZE: int = 10000
+    WEBHOOK_BATCH_SIZE: int = 500
+    WEBHOOK_BATCH_WINDOW_MS: int = 50
+    WEBHOOK_ENQUEUE_TIMEOUT_SECONDS: float = 2.0
+
     class Config:
         env_file = ".env"
 
@@ -5,6 +5,10 @@ from contextlib import asynccontextmanager
 from app.api.routes import auth, broadcasts, media, messages, templates, webhook, onboarding, profile
 from app.api.routes import contacts, contact_lists, chatbot
 from app.db.mongo import close_mongo, connect_to_mongo
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.services.graph_api import close_graph_client, start_graph_client
+from app.services.broadcast_worker import start_broadcast_workers, stop_broadcast_workers
+from app.services.webhook_ingest import start_webhook_ingestor, stop_webhook_ingestor
 from app.sockets import create_socket_app
 from config import settings
 
@@ -23,8 +27,14 @@ logger = logging.getLogger("api")
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo(app)
+    await start_graph_client()
+    await start_webhook_ingestor(app.state.db)
+    app.state.broadcast_workers = await start_broadcast_workers(app.state.db)
     yield
     # Shutdown
+    await stop_broadcast_workers(app.state.broadcast_workers)
+    await stop_webhook_ingestor()
+    await close_graph_client()
     await close_mongo(app)
 
 app = FastAPI(lifespan=lifespan)
@@ -64,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -81,7 +92,10 @@ app.include_router(chatbot.router)
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
+    index_errors = getattr(request.app.state, "index_errors", [])
+    if index_errors:
+        return {"status": "degraded", "service": "whatsapp-backend", "index_errors": index_errors}
     return {"status": "ok", "service": "whatsapp-backend"}
 
 
@@ -1,5 +1,5 @@
 from typing import List, Optional, Literal, Any
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 
 
@@ -92,9 +92,19 @@ class TemplateRequest(BaseModel):
     location_name: Optional[str] = None
     location_address: Optional[str] = None
 
+class BroadcastSegment(BaseModel):
+    """Filters applied to contacts when a broadcast targets lists (or all contacts)"""
+    exclude_list_ids: List[str] = []
+    created_after: Optional[str] = None  # ISO timestamp, compared against contact created_at
+    created_before: Optional[str] = None
+
+
 class BroadcastRequest(BaseModel):
     name: str
-    phones: List[str]
+    phones: List[str] = []
+    # Contacts in any of these lists are resolved on the server by the broadcast worker
+    list_ids: List[str] = []
+    segment: Optional[BroadcastSegment] = None
     template_name: str
     template_id: Optional[str] = None
     language_code: str = "en"
@@ -172,3 +182,23 @@ class ChatbotResponse(BaseModel):
     response: str
     success: bool = True
     error: Optional[str] = None
+
+
+class RAGChatbotRequest(BaseModel):
+    """Request model for the knowledge-base (RAG) chatbot endpoint"""
+    message: str
+    top_k: Optional[int] = Field(default=None, ge=1, le=20)
+
+
+class RAGSource(BaseModel):
+    """Knowledge-base chunk an answer was grounded on"""
+    source: str
+    score: float
+
+
+class RAGChatbotResponse(BaseModel):
+    """Response model for the knowledge-base (RAG) chatbot endpoint"""
+    response: str
+    sources: List[RAGSource] = []
+    success: bool = True
+    error: Optional[str] = None
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Query Plan Audit
+================
+
+Runs `explain()` on the query shape behind each hot route and fails if any
+winning plan contains a COLLSCAN. Use it after changing a query or an index
+in app/db/indexes.py.
+
+Usage:
+------
+    # From Backend directory (uses MONGODB_URI / MONGODB_DB_NAME from .env):
+    python scripts/audit_query_plans.py
+    python scripts/audit_query_plans.py --ensure-indexes   # create declared indexes first
+
+Exit code is 1 if any query does a collection scan. A collection that does
+not exist yet explains as EOF and is reported as skipped.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.indexes import ensure_indexes
+from app.services.webhook_ingest import statuses_at_or_above
+from config import settings
+
+USER_OID = ObjectId()
+LIST_OID = ObjectId()
+
+# (route, collection, filter, sort) - placeholder values, shapes match the routes
+QUERY_SHAPES = [
+    ("POST /webhook (status)", "messages",
+     {"whatsappMessageId": "wamid.audit", "status": {"$nin": statuses_at_or_above("delivered")}}, None),
+    ("GET /messages?chatId", "messages", {"chatId": "15550000000"}, [("createdAt", -1), ("_id", -1)]),
+    ("GET /messages", "messages", {}, [("createdAt", -1), ("_id", -1)]),
+    ("GET /contacts", "contacts", {"user_id": USER_OID}, [("created_at", -1), ("_id", -1)]),
+    ("GET /contacts?list_id", "contacts", {"user_id": USER_OID, "list_ids": LIST_OID}, [("created_at", -1), ("_id", -1)]),
+    ("GET /contacts/lists", "contact_lists", {"user_id": USER_OID}, [("created_at", -1), ("_id", -1)]),
+    ("POST /contacts/lists", "contact_lists", {"user_id": USER_OID, "name": "audit"}, None),
+    ("GET /broadcasts", "broadcasts", {"user_id": str(USER_OID)}, [("created_at", -1), ("_id", -1)]),
+    ("broadcast worker claim", "broadcasts",
+     {"status": {"$in": ["queued", "sending"]},
+      "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": datetime.utcnow()}}]},
+     [("created_at", 1)]),
+    ("broadcast worker recipients", "broadcast_recipients",
+     {"broadcast_id": "audit", "status": "pending", "seq": {"$gt": 0}}, [("seq", 1)]),
+    ("GET /broadcasts/{id} recipients", "broadcast_recipients",
+     {"broadcast_id": "audit", "seq": {"$gt": 0}}, [("seq", 1)]),
+    ("POST /templates/sync", "templates", {"meta_id": "audit"}, None),
+    ("POST /auth/login", "users", {"email": "audit@example.com"}, None),
+    ("POST /auth/facebook/callback", "users", {"facebook_id": "audit"}, None),
+    ("GET /onboarding/whatsapp/status", "whatsapp_credentials", {"user_id": str(USER_OID)}, None),
+]
+
+
+def plan_stages(plan: dict):
+    """Yield every stage name in a (possibly nested) winning plan."""
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure-indexes", action="store_true", help="create declared indexes before auditing")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.MONGODB_DB_NAME]
+    if args.ensure_indexes:
+        await ensure_indexes(db)
+
+    failures = 0
+    try:
+        for route, collection, query, sort in QUERY_SHAPES:
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            explain = await cursor.explain()
+            stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+
+            if "COLLSCAN" in stages:
+                failures += 1
+                verdict = "FAIL"
+            elif stages == ["EOF"]:
+                verdict = "SKIP"
+            else:
+                verdict = "ok"
+            print(f"{verdict:<5} {route:<34} {collection:<22} {' > '.join(filter(None, stages))}")
+    finally:
+        client.close()
+
+    print(f"\n{len(QUERY_SHAPES)} query shapes, {failures} collection scan(s)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
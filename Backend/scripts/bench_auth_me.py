@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Auth Benchmark
+==============
+
+Requests per second on GET /auth/me, served in-process through the real auth
+router, in three modes:
+
+    no cache        - users lookup in MongoDB on every request (the old behaviour)
+    user cache      - TTL/LRU cache of UserPublic in front of the lookup
+    trusted claims  - AUTH_TRUST_TOKEN_CLAIMS: user built from the JWT, no lookup
+
+Usage:
+------
+    # From Backend directory (uses MONGODB_URI / MONGODB_DB_NAME from .env):
+    python scripts/bench_auth_me.py
+    python scripts/bench_auth_me.py --requests 5000 --concurrency 50
+
+    # Without a MongoDB server (needs: pip install mongomock-motor);
+    # this hides network latency, so the gap is smaller than against a real server:
+    python scripts/bench_auth_me.py --in-memory
+
+A throwaway bench user is inserted and removed again.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy settings so config.py loads without a .env
+if not os.path.exists(".env"):
+    for _key in (
+        "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_WABA_ID", "WHATSAPP_APP_ID",
+        "WHATSAPP_APP_SECRET", "VERIFY_TOKEN", "META_BUSINESS_ID", "JWT_SECRET_KEY",
+    ):
+        os.environ.setdefault(_key, "bench")
+    os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+import httpx
+from fastapi import FastAPI
+
+# Optional: in-memory MongoDB for running without a server
+try:
+    from mongomock_motor import AsyncMongoMockClient
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+
+async def run_mode(app: FastAPI, label: str, token: str, requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(requests))
+    failures = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def worker():
+            nonlocal failures
+            for _ in remaining:
+                response = await client.get("/auth/me")
+                if response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{label:<16} {requests:>6} req  {elapsed:>7.2f}s  {requests / elapsed:>9.1f} req/s  failures={failures}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGODB_URI")
+    args = parser.parse_args()
+
+    from app.api.routes import auth
+    from app.core import security
+    from app.core.cache import TTLCache
+    from config import settings
+
+    if args.in_memory:
+        if not MONGOMOCK_AVAILABLE:
+            sys.exit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.MONGODB_DB_NAME]
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.state.db = db
+
+    created_at = datetime.utcnow().isoformat()
+    result = await db["users"].insert_one(
+        {"email": f"bench-{uuid4().hex[:8]}@example.com", "created_at": created_at, "hashed_password": ""}
+    )
+    user = await db["users"].find_one({"_id": result.inserted_id})
+    token = security.create_access_token(str(user["_id"]), user["email"], created_at)
+
+    try:
+        settings.AUTH_TRUST_TOKEN_CLAIMS = False
+        security._user_cache = TTLCache(0, 0)
+        await run_mode(app, "no cache", token, args.requests, args.concurrency)
+
+        security._user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE or 10000, settings.AUTH_USER_CACHE_TTL_SECONDS or 60)
+        await run_mode(app, "user cache", token, args.requests, args.concurrency)
+        print(f"{'':<16} cache stats: {security.get_user_cache_stats()}")
+
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        await run_mode(app, "trusted claims", token, args.requests, args.concurrency)
+    finally:
+        await db["users"].delete_one({"_id": result.inserted_id})
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Embedding Benchmark
+===================
+
+Measures ingestion embedding throughput (chunks/second) through
+`BatchEmbedder` against a fake Gemini embedding backend, so no API key or
+network access is needed.
+
+The fake answers each `embed_content` call after `--latency-ms` plus
+`--per-text-ms` for every text in the request, and rejects a
+`--rate-limit-ratio` share of calls with a 429 so the retry path is
+exercised. Results are printed for:
+
+    per-text serial     - one text per request, one request at a time (the old behaviour)
+    batched             - `--batch-size` texts per request, one request at a time
+    batched concurrent  - batched, with `--concurrency` requests in flight
+
+Usage:
+------
+    # From Backend directory:
+    python scripts/bench_embeddings.py
+    python scripts/bench_embeddings.py --chunks 5000 --batch-size 100 --concurrency 8
+    python scripts/bench_embeddings.py --latency-ms 300 --rate-limit-ratio 0.1
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy settings so config.py loads without a .env
+if not os.path.exists(".env"):
+    for _key in (
+        "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_WABA_ID", "WHATSAPP_APP_ID",
+        "WHATSAPP_APP_SECRET", "VERIFY_TOKEN", "META_BUSINESS_ID", "MONGODB_URI", "JWT_SECRET_KEY",
+    ):
+        os.environ.setdefault(_key, "bench")
+
+
+class FakeRateLimitError(Exception):
+    """Shaped like the SDK's API error: carries the HTTP status in `code`"""
+    code = 429
+
+
+class FakeEmbeddingModels:
+    def __init__(self, latency: float, per_text: float, rate_limit_ratio: float, dims: int):
+        self.latency = latency
+        self.per_text = per_text
+        self.rate_limit_ratio = rate_limit_ratio
+        self.dims = dims
+        self.calls = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def embed_content(self, model: str, contents):
+        texts = [contents] if isinstance(contents, str) else list(contents)
+        with self._lock:
+            self.calls += 1
+            rejected = random.random() < self.rate_limit_ratio
+            if rejected:
+                self.rejected += 1
+        if rejected:
+            time.sleep(self.latency / 4)
+            raise FakeRateLimitError("429 RESOURCE_EXHAUSTED")
+        time.sleep(self.latency + self.per_text * len(texts))
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[float(len(t) % 7)] * self.dims) for t in texts]
+        )
+
+
+def run_case(label: str, args, texts, batch_size: int, concurrency: int):
+    from app.services.rag.embeddings import BatchEmbedder
+
+    models = FakeEmbeddingModels(
+        args.latency_ms / 1000, args.per_text_ms / 1000, args.rate_limit_ratio, args.dims
+    )
+    embedder = BatchEmbedder(
+        SimpleNamespace(models=models),
+        "fake-embedding",
+        batch_size=batch_size,
+        concurrency=concurrency,
+        max_retries=args.max_retries,
+        retry_base_delay=args.retry_base_delay
+    )
+    updates = []
+
+    start = time.perf_counter()
+    vectors = embedder.embed(texts, progress_callback=lambda done, total: updates.append(done))
+    elapsed = time.perf_counter() - start
+
+    assert len(vectors) == len(texts) and updates[-1] == len(texts)
+    print(
+        f"{label:<20} {len(texts):>6} chunks  {elapsed:>7.2f}s  {len(texts) / elapsed:>9.1f} chunks/s  "
+        f"requests={models.calls} 429s={models.rejected} retries={embedder.retries}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fixed cost per request")
+    parser.add_argument("--per-text-ms", type=float, default=1.0, help="extra cost per text in a request")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.05, help="share of requests answered 429")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--retry-base-delay", type=float, default=0.05)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--serial-chunks", type=int, default=100, help="chunks for the slow per-text baseline")
+    args = parser.parse_args()
+
+    # Retries are counted in the results; skip the per-retry warnings
+    logging.getLogger("app.services.rag.embeddings").setLevel(logging.ERROR)
+
+    texts = [f"chunk {i}: " + "lorem ipsum " * 40 for i in range(args.chunks)]
+    print(
+        f"latency {args.latency_ms:.0f} ms + {args.per_text_ms:.1f} ms/text, "
+        f"{args.rate_limit_ratio:.0%} of requests rate limited\n"
+    )
+
+    run_case("per-text serial", args, texts[:args.serial_chunks], 1, 1)
+    run_case("batched", args, texts, args.batch_size, 1)
+    run_case("batched concurrent", args, texts, args.batch_size, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
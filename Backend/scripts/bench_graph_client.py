@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Graph API Client Benchmark
+==========================
+
+Compares per-message latency of the old pattern (a new httpx.AsyncClient,
+and so a new connection, for every call) with the shared pooled
+GraphAPIClient.
+
+Usage:
+------
+    # From Backend directory - against a local stub (no credentials needed):
+    python scripts/bench_graph_client.py
+    python scripts/bench_graph_client.py --requests 500 --latency-ms 20
+
+    # Against a real HTTPS endpoint, to include TCP+TLS handshakes
+    # (the request is an unauthenticated GET, so Meta answers with an error body):
+    python scripts/bench_graph_client.py --url https://graph.facebook.com --path /v20.0/me
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy settings so config.py loads without a .env
+for _key in (
+    "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_WABA_ID", "WHATSAPP_APP_ID",
+    "WHATSAPP_APP_SECRET", "VERIFY_TOKEN", "META_BUSINESS_ID", "MONGODB_URI", "JWT_SECRET_KEY",
+):
+    os.environ.setdefault(_key, "bench")
+
+import httpx
+
+from graph_api_stub import GraphAPIStub
+
+
+def report(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<26} n={len(samples):<5} mean={statistics.mean(samples):7.2f} ms  "
+        f"p50={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms"
+    )
+
+
+async def per_call_client(base_url: str, path: str, n: int):
+    """The previous pattern: `async with httpx.AsyncClient() as client` around every call."""
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def shared_client(base_url: str, path: str, n: int, http2: bool):
+    from app.services.graph_api import GraphAPIClient
+
+    client = GraphAPIClient(base_url=base_url, http2=http2, max_retries=0)
+    samples = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            await client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        await client.aclose()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="stub latency (local mode only)")
+    parser.add_argument("--url", help="benchmark a real base URL instead of the local stub")
+    parser.add_argument("--path", default="/v20.0/messages")
+    parser.add_argument("--http2", action="store_true", help="enable HTTP/2 on the shared client (needs h2)")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        stub = GraphAPIStub(latency=args.latency_ms / 1000)
+        server = await stub.start()
+        base_url = stub.base_url
+        print(f"Graph API stub on {base_url} (latency {args.latency_ms:.0f} ms)\n")
+    else:
+        print(f"Target {base_url}{args.path}\n")
+
+    try:
+        report("client per call (before)", await per_call_client(base_url, args.path, args.requests))
+        report("shared client (after)", await shared_client(base_url, args.path, args.requests, args.http2))
+    finally:
+        if server is not None:
+            server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Vector Store Benchmark
+======================
+
+Compares the RAG vector store backends (ChromaDB and the NumPy memmap
+index) on random unit vectors at several collection sizes:
+
+    build       - time to upsert all vectors through the VectorStore API
+    open        - time for a fresh process to import the backend and open the store
+    first query - latency of the first search (cold pages / index load)
+    p50 / p95   - search latency over --queries random queries, top --top-k
+    RSS         - resident memory of the querying process after the searches
+
+Each build and each query phase runs in its own subprocess, so import cost
+and memory are measured from a cold start and backends don't share memory.
+
+Usage:
+------
+    # From Backend directory:
+    python scripts/bench_vector_store.py
+    python scripts/bench_vector_store.py --sizes 10000,100000 --backends numpy
+    python scripts/bench_vector_store.py --dims 3072 --dtype float16
+
+The default sizes include 1M vectors; building that in ChromaDB takes a long
+time, so start with --sizes 10000,100000. Stores are written under a
+temporary directory (or --dir) and removed afterwards unless --keep is given.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy settings so config.py loads without a .env
+if not os.path.exists(".env"):
+    for _key in (
+        "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_WABA_ID", "WHATSAPP_APP_ID",
+        "WHATSAPP_APP_SECRET", "VERIFY_TOKEN", "META_BUSINESS_ID", "MONGODB_URI", "JWT_SECRET_KEY",
+    ):
+        os.environ.setdefault(_key, "bench")
+
+BUILD_BATCH_SIZE = 5000
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process, in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def make_config(args):
+    from app.services.rag.config import RAGConfig
+
+    return RAGConfig(
+        gemini_api_key="bench",
+        chroma_path=os.path.join(args.dir, f"{args.backend}-{args.size}"),
+        collection_name="bench",
+        vector_backend=args.backend,
+        vector_dtype=args.dtype,
+        embedding_cache_path=""
+    )
+
+
+def worker_build(args) -> dict:
+    import numpy as np
+    from app.services.rag.vector_store import create_vector_store
+
+    store = create_vector_store(make_config(args))
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    for offset in range(0, args.size, BUILD_BATCH_SIZE):
+        n = min(BUILD_BATCH_SIZE, args.size - offset)
+        store.upsert(
+            ids=[f"chunk-{offset + i}" for i in range(n)],
+            embeddings=rng.standard_normal((n, args.dims), dtype=np.float32),
+            documents=[f"chunk {offset + i}" for i in range(n)],
+            metadatas=[{"source": f"doc-{(offset + i) % 100}"} for i in range(n)]
+        )
+    return {"build_s": time.perf_counter() - start, "count": store.count()}
+
+
+def worker_query(args) -> dict:
+    start = time.perf_counter()
+    import numpy as np
+    from app.services.rag.vector_store import create_vector_store
+
+    store = create_vector_store(make_config(args))
+    open_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.standard_normal((args.queries + 1, args.dims), dtype=np.float32)
+
+    start = time.perf_counter()
+    store.query(queries[0].tolist(), args.top_k)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for query in queries[1:]:
+        start = time.perf_counter()
+        matches = store.query(query.tolist(), args.top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    assert len(matches) == min(args.top_k, args.size)
+
+    latencies.sort()
+    return {
+        "open_s": open_s,
+        "first_ms": first_ms,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+        "rss_mb": rss_mb(),
+    }
+
+
+def run_worker(args, phase: str, backend: str, size: int) -> dict:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--worker", phase,
+        "--backend", backend, "--size", str(size), "--dir", args.dir,
+        "--dims", str(args.dims), "--dtype", args.dtype, "--queries", str(args.queries),
+        "--top-k", str(args.top_k), "--seed", str(args.seed),
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{phase} {backend} {size} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--backends", default="numpy,chroma")
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"], help="numpy backend matrix dtype")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dir", help="where to build the stores (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="keep the built stores")
+    # Internal: run one phase in this process and print JSON
+    parser.add_argument("--worker", choices=["build", "query"], help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = worker_build(args) if args.worker == "build" else worker_query(args)
+        print(json.dumps(result))
+        return
+
+    created_dir = args.dir is None
+    args.dir = args.dir or tempfile.mkdtemp(prefix="bench-vectors-")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = [backend.strip() for backend in args.backends.split(",")]
+
+    print(f"{args.dims} dims, {args.dtype} (numpy), top-{args.top_k}, {args.queries} queries\n")
+    print(
+        f"{'backend':<8} {'vectors':>9} {'build':>9} {'open':>8} {'first query':>12} "
+        f"{'p50':>9} {'p95':>9} {'RSS':>9}"
+    )
+    try:
+        for size in sizes:
+            for backend in backends:
+                try:
+                    build = run_worker(args, "build", backend, size)
+                    query = run_worker(args, "query", backend, size)
+                except RuntimeError as e:
+                    print(f"{backend:<8} {size:>9}  failed: {e}")
+                    continue
+                print(
+                    f"{backend:<8} {size:>9} {build['build_s']:>8.1f}s {query['open_s']:>7.2f}s "
+                    f"{query['first_ms']:>10.1f}ms {query['p50_ms']:>7.2f}ms {query['p95_ms']:>7.2f}ms "
+                    f"{query['rss_mb']:>7.0f}MB"
+                )
+                if not args.keep:
+                    shutil.rmtree(os.path.join(args.dir, f"{backend}-{size}"), ignore_errors=True)
+    finally:
+        if created_dir and not args.keep:
+            shutil.rmtree(args.dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Local Graph API stub for benchmarks.
+
+A minimal HTTP/1.1 keep-alive server that answers every request after a
+fixed latency with a Graph API style send response. Used by the bench_*
+scripts so they run without Meta credentials or network access.
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+
+class GraphAPIStub:
+    """Imitates POST /{version}/{phone_number_id}/messages (any path works)"""
+
+    def __init__(self, latency: float = 0.08):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.base_url: Optional[str] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, host, port)
+        bound_port = server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return server
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                await asyncio.sleep(self.latency)
+                self.requests += 1
+                body = json.dumps({
+                    "messaging_product": "whatsapp",
+                    "messages": [{"id": f"wamid.bench{self.requests}"}],
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Login Storm Load Test
+=====================
+
+Fires concurrent POST /auth/login requests at the real auth router
+in-process while a probe task measures event-loop lag (how late a 10 ms
+sleep wakes up). Runs twice:
+
+    inline hashing  - pbkdf2 verify on the event loop (the old behaviour)
+    hash executor   - verify_password_async on the bounded hashing pool
+
+With inline hashing the loop stalls for every verify, so lag grows with the
+storm; with the executor it should stay near zero.
+
+Usage:
+------
+    # From Backend directory (uses MONGODB_URI / MONGODB_DB_NAME from .env):
+    python scripts/load_login_storm.py
+    python scripts/load_login_storm.py --logins 400 --concurrency 100
+
+    # Without a MongoDB server (needs: pip install mongomock-motor):
+    python scripts/load_login_storm.py --in-memory
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy settings so config.py loads without a .env
+if not os.path.exists(".env"):
+    for _key in (
+        "WHATSAPP_ACCESS_TOKEN", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_WABA_ID", "WHATSAPP_APP_ID",
+        "WHATSAPP_APP_SECRET", "VERIFY_TOKEN", "META_BUSINESS_ID", "JWT_SECRET_KEY",
+    ):
+        os.environ.setdefault(_key, "bench")
+    os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+import httpx
+from fastapi import FastAPI
+
+# Optional: in-memory MongoDB for running without a server
+try:
+    from mongomock_motor import AsyncMongoMockClient
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+PROBE_INTERVAL = 0.010
+
+
+async def probe_loop_lag(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def run_storm(app: FastAPI, label: str, email: str, password: str, logins: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(logins))
+    statuses = {}
+    lag = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.post("/auth/login", json={"email": email, "password": password})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        probe = asyncio.create_task(probe_loop_lag(lag, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    lag.sort()
+    p99 = lag[max(int(len(lag) * 0.99) - 1, 0)] if lag else 0.0
+    print(
+        f"{label:<15} {logins / elapsed:>7.1f} logins/s  loop lag mean={statistics.mean(lag or [0]):7.2f} ms  "
+        f"p99={p99:7.2f} ms  max={max(lag or [0]):7.2f} ms  statuses={statuses}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGODB_URI")
+    args = parser.parse_args()
+
+    from app.api.routes import auth
+    from app.core import security
+    from config import settings
+
+    if args.in_memory:
+        if not MONGOMOCK_AVAILABLE:
+            sys.exit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.MONGODB_DB_NAME]
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.state.db = db
+
+    email = f"storm-{uuid4().hex[:8]}@example.com"
+    password = "storm-password"
+    result = await db["users"].insert_one(
+        {"email": email, "hashed_password": security.hash_password(password), "created_at": datetime.utcnow().isoformat()}
+    )
+    print(f"{args.logins} logins, concurrency {args.concurrency}, {settings.PASSWORD_HASH_WORKERS} hash workers\n")
+
+    executor_verify = security.verify_password_async
+
+    async def inline_verify(password, hashed_password):
+        return security.verify_password(password, hashed_password)
+
+    try:
+        security.verify_password_async = inline_verify
+        await run_storm(app, "inline hashing", email, password, args.logins, args.concurrency)
+
+        security.verify_password_async = executor_verify
+        await run_storm(app, "hash executor", email, password, args.logins, args.concurrency)
+        print(f"\nhash pool stats: {security.get_password_hash_stats()}")
+    finally:
+        security.verify_password_async = executor_verify
+        await db["users"].delete_one({"_id": result.inserted_id})
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Contact Phone Migration
+=======================
+
+One-off migration for databases holding contacts saved before phones were
+normalized. It rewrites every stored phone into the digits-only form the
+app now uses ("+91 98765-43210" -> "919876543210") and merges contacts that
+end up sharing a phone: list memberships are combined into the oldest
+contact, which keeps the first non-empty name, and the others are deleted.
+Afterwards the unique (user_id, phone) index can be built (the app does
+that on its next start, or pass --ensure-indexes).
+
+The run is claimed atomically in the `migrations` collection, so starting
+it twice (or from two machines) runs it once. Every merge is written to the
+audit file with the kept contact and the full removed ones, so deleted
+contacts can be reviewed or restored.
+
+Usage:
+------
+    # From Backend directory (uses MONGODB_URI / MONGODB_DB_NAME from .env):
+    python scripts/migrate_contact_phones.py
+    python scripts/migrate_contact_phones.py --audit-file merges.jsonl --ensure-indexes
+
+Exit code is 1 if the migration is already running or done, or fails; a
+failed run releases its claim so it can be retried.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+# Add Backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+
+from app.db.indexes import ensure_indexes
+from app.services.contacts import normalize_stored_phones
+from config import settings
+
+MIGRATION_ID = "contacts_normalize_phones"
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("migrate_contact_phones")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--audit-file",
+        default=f"contact_phone_merges-{datetime.utcnow():%Y%m%d%H%M%S}.jsonl",
+        help="where to write one JSON line per merge",
+    )
+    parser.add_argument("--ensure-indexes", action="store_true", help="create declared indexes afterwards")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.MONGODB_DB_NAME]
+    try:
+        try:
+            await db.migrations.insert_one(
+                {"_id": MIGRATION_ID, "status": "running", "started_at": datetime.utcnow().isoformat()}
+            )
+        except DuplicateKeyError:
+            claim = await db.migrations.find_one({"_id": MIGRATION_ID})
+            logger.error(f"Migration {MIGRATION_ID} is already {claim.get('status')} (started {claim.get('started_at')})")
+            return 1
+
+        with open(args.audit_file, "a") as audit:
+            def record(merge: dict) -> None:
+                audit.write(json.dumps(merge) + "\n")
+                audit.flush()
+
+            try:
+                counts = await normalize_stored_phones(db, on_merge=record)
+            except BaseException:
+                # Release the claim so the migration can be retried
+                await db.migrations.delete_one({"_id": MIGRATION_ID, "status": "running"})
+                raise
+
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {
+                "status": "completed",
+                "completed_at": datetime.utcnow().isoformat(),
+                "result": counts,
+                "audit_file": os.path.abspath(args.audit_file),
+            }},
+        )
+        print(f"Normalized {counts['normalized']}, merged {counts['merged']}, left {counts['invalid']} invalid")
+        print(f"Merge audit: {os.path.abspath(args.audit_file)}")
+
+        if args.ensure_indexes:
+            errors = await ensure_indexes(db)
+            for error in errors:
+                print(error)
+            return 1 if errors else 0
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
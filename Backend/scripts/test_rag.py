@@ -182,6 +182,8 @@ def show_stats():
     print(f"  Embedding Model: {stats['embedding_model']}")
     print(f"  Chunk Size: {stats['chunk_size']}")
     print(f"  Chunk Overlap: {stats['chunk_overlap']}")
+    if stats['keyword_index']:
+        print(f"  Keyword Index: {stats['keyword_index']['chunks']} chunks, {stats['keyword_index']['terms']} terms")
 
 
 def health_check():
@@ -201,7 +203,7 @@ def health_check():
     print("\nChecking components...")
     health = rag.health_check()
     
-    print(f"\n  ChromaDB:   {'✓ OK' if health['chromadb'] else '✗ FAIL'}")
+    print(f"\n  Vectors:    {'✓ OK' if health['vector_store'] else '✗ FAIL'}")
     print(f"  Embeddings: {'✓ OK' if health['embeddings'] else '✗ FAIL'}")
     print(f"  Gemini:     {'✓ OK' if health['gemini'] else '✗ FAIL'}")
     
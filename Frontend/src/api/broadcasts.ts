@@ -1,8 +1,12 @@
+import { fetchAllPages } from './pagination';
+
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
 export interface BroadcastCreateRequest {
     name: string;
     phones: string[];
+    // Contacts in these lists are resolved on the server, so large lists needn't be loaded here
+    list_ids?: string[];
     template_name: string;
     template_id?: string;
     language_code?: string;
@@ -26,11 +30,7 @@ export const createBroadcast = async (data: BroadcastCreateRequest) => {
 };
 
 export const getBroadcasts = async () => {
-    const response = await fetch(`${BACKEND_URL}/broadcasts`, {
-        credentials: 'include',
-    });
-    if (!response.ok) throw new Error('Failed to fetch broadcasts');
-    return response.json();
+    return fetchAllPages<any>(new URL(`${BACKEND_URL}/broadcasts`), 'Failed to fetch broadcasts');
 };
 
 export const getBroadcast = async (id: string) => {
@@ -1,3 +1,5 @@
+import { fetchAllPages } from './pagination';
+
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
 export interface ContactList {
@@ -8,9 +10,12 @@ export interface ContactList {
 }
 
 export const getContactLists = async (): Promise<{ lists: ContactList[] }> => {
-    const response = await fetch(`${BACKEND_URL}/contacts/lists`, { credentials: 'include' });
-    if (!response.ok) throw new Error('Failed to fetch lists');
-    return response.json();
+    const lists = await fetchAllPages<ContactList>(
+        new URL(`${BACKEND_URL}/contacts/lists`),
+        'Failed to fetch lists',
+        (body) => body.lists,
+    );
+    return { lists };
 };
 
 export const createContactList = async (name: string): Promise<ContactList> => {
@@ -54,7 +59,5 @@ export const deleteContactList = async (id: string): Promise<{ success: boolean
 };
 
 export const getContactsInList = async (id: string): Promise<Array<{ id: string; name: string; phone: string; created_at: string }>> => {
-    const response = await fetch(`${BACKEND_URL}/contacts/lists/${id}/contacts`, { credentials: 'include' });
-    if (!response.ok) throw new Error('Failed to fetch list contacts');
-    return response.json();
+    return fetchAllPages(new URL(`${BACKEND_URL}/contacts/lists/${id}/contacts`), 'Failed to fetch list contacts');
 };
@@ -1,3 +1,5 @@
+import { fetchAllPages } from './pagination';
+
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
 export interface Contact {
@@ -23,9 +25,7 @@ export interface ContactUpdateRequest {
 export const getContacts = async (listId?: string): Promise<Contact[]> => {
     const url = new URL(`${BACKEND_URL}/contacts`);
     if (listId) url.searchParams.set('list_id', listId);
-    const response = await fetch(url.toString(), { credentials: 'include' });
-    if (!response.ok) throw new Error('Failed to fetch contacts');
-    return response.json();
+    return fetchAllPages<Contact>(url, 'Failed to fetch contacts');
 };
 
 export const getContactStats = async (): Promise<{ total: number }> => {
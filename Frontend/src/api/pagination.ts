@@ -0,0 +1,20 @@
+// List routes return one page per request; the cursor for the next page comes in this header
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+
+// Fetch every page of a list route by following X-Next-Cursor until the last page
+export const fetchAllPages = async <T>(
+    url: URL,
+    errorMessage: string,
+    items: (body: any) => T[] = (body) => body,
+): Promise<T[]> => {
+    const results: T[] = [];
+    let after: string | null = null;
+    do {
+        if (after) url.searchParams.set('after', after);
+        const response = await fetch(url.toString(), { credentials: 'include' });
+        if (!response.ok) throw new Error(errorMessage);
+        results.push(...items(await response.json()));
+        after = response.headers.get(NEXT_CURSOR_HEADER);
+    } while (after);
+    return results;
+};
@@ -84,7 +84,7 @@ export default function NewBroadcastPage() {
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
-        if (!name || !selectedTemplate || listContacts.length === 0) {
+        if (!name || !selectedTemplate || !selectedListId || listContacts.length === 0) {
             alert('Please provide a name, select a contact list with contacts, and choose a template');
             return;
         }
@@ -128,7 +128,8 @@ export default function NewBroadcastPage() {
 
             const payload = {
                 name,
-                phones: listContacts.map((c) => c.phone),
+                phones: [],
+                list_ids: [selectedListId],
                 template_name: selectedTemplate.name,
                 template_id: selectedTemplate.id,
                 language_code: selectedTemplate.language,